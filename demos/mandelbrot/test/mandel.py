@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+## Project F: Mandelbrot Set Reference (NumPy)
+## (C)2023 Will Green, open source software released under the MIT License
+## Learn more at https://projectf.io/posts/mandelbrot-set-verilog/
+
+# Iteration counts for every pixel of render_mandel.sv with the same
+# fixed-point arithmetic: mul.sv products rounded half to even, sums wrapping
+# at FP_WIDTH bits, and the escape test on the integer bits of x^2 + y^2. Every
+# sample in a tile iterates together as NumPy arrays, dropping samples as they
+# escape, and tiles of rows run across a process pool.
+#
+#   python3 mandel.py                                  # the demo's starting view
+#   python3 mandel.py -x -0.7436 -y 0.1318 -s 0.00002 -o seahorse.png
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+
+TILE = 16  # rows per tile of work
+
+@dataclass(frozen=True)
+class Params:
+    """render_mandel parameters that change the image."""
+    FB_WIDTH: int = 320
+    FB_HEIGHT: int = 180
+    CIDXW: int = 8
+    FP_WIDTH: int = 25
+    FP_INT: int = 4
+    ITER_MAX: int = 255
+    SUPERSAMPLE: int = 1
+
+    @property
+    def fbits(self):
+        return self.FP_WIDTH - self.FP_INT
+
+    @property
+    def iterw(self):
+        return self.ITER_MAX.bit_length()  # $clog2(ITER_MAX+1)
+
+    def fixed(self, value):
+        """Fixed-point value nearest a real number."""
+        return wrap(round(value * (1 << self.fbits)), self.FP_WIDTH)
+
+    def real(self, value):
+        return value / (1 << self.fbits)
+
+def wrap(value, width):
+    """Signed value of the low width bits, as a Verilog signed register holds it."""
+    half = 1 << (width - 1)
+    return ((value + half) & ((half << 1) - 1)) - half
+
+def mul(a, b, p):
+    """mul.sv: fixed-point product rounded half to even, keeping the low FP_WIDTH bits."""
+    prod = a * b
+    trunc = prod >> p.fbits
+    rbits = prod & ((1 << p.fbits) - 1)
+    half = 1 << (p.fbits - 1)
+    up = (rbits >= half) & ~((trunc & 1 == 0) & (rbits == half))
+    return wrap(trunc + up, p.FP_WIDTH)
+
+def iterations(re, im, p):
+    """mandelbrot.sv: iterations for each coordinate (arrays of fixed-point values) up to ITER_MAX."""
+    assert p.FP_WIDTH <= 31, "products must fit in int64"
+    shape = np.shape(re)
+    x0, y0 = np.ravel(re).astype(np.int64), np.ravel(im).astype(np.int64)
+    count = np.full(x0.size, p.ITER_MAX, np.int64)
+    live = np.arange(x0.size)
+    x, y, x2, y2 = (np.zeros_like(x0) for _ in range(4))
+    for i in range(p.ITER_MAX):
+        # STEP1: carry on while the integer bits of x2 + y2, wrapped to FP_WIDTH, are at most 4 unsigned
+        keep = (((x2 + y2) >> p.fbits) & ((1 << p.FP_INT) - 1)) <= 4
+        if not keep.all():
+            count[live[~keep]] = i
+            live, x0, y0, x, y, x2, y2 = (a[keep] for a in (live, x0, y0, x, y, x2, y2))
+            if not live.size:
+                break
+        xy = mul(x, y, p)
+        x = wrap(x2 - y2 + x0, p.FP_WIDTH)
+        y = wrap(2 * xy + y0, p.FP_WIDTH)
+        x2, y2 = mul(x, x, p), mul(y, y, p)
+    return count.reshape(shape)
+
+def _tile(args):
+    """Iterations for rows [top, bottom) of a frame."""
+    x_start, y_start, step, top, bottom, p = args
+    fx = wrap(x_start + np.arange(p.FB_WIDTH, dtype=np.int64) * step, p.FP_WIDTH)
+    fy = wrap(y_start + np.arange(top, bottom, dtype=np.int64) * step, p.FP_WIDTH)
+    quarter = step >> 2
+    left, right = wrap(fx - quarter, p.FP_WIDTH), wrap(fx + quarter, p.FP_WIDTH)
+    upper, lower = wrap(fy - quarter, p.FP_WIDTH), wrap(fy + quarter, p.FP_WIDTH)
+    samples = [(left, upper), (left, lower), (right, lower), (right, upper)] if p.SUPERSAMPLE else [(left, upper)]
+    re, im = np.broadcast_arrays(np.array([s[0] for s in samples])[:, None, :], np.array([s[1] for s in samples])[:, :, None])
+    return iterations(re, im, p).sum(axis=0) // len(samples)  # mean of four samples with SUPERSAMPLE
+
+def frame(x_start, y_start, step, p, jobs=None):
+    """Iterations for every pixel of a frame as a (FB_HEIGHT, FB_WIDTH) array; coordinates are fixed-point.
+
+    Tiles of TILE rows run across jobs processes (default: one per CPU), or in this process if jobs is 1."""
+    tiles = [(x_start, y_start, step, top, min(top + TILE, p.FB_HEIGHT), p) for top in range(0, p.FB_HEIGHT, TILE)]
+    jobs = jobs or os.cpu_count()
+    if jobs == 1 or len(tiles) == 1:
+        return np.concatenate([_tile(t) for t in tiles])
+    with ProcessPoolExecutor(min(jobs, len(tiles))) as pool:
+        return np.concatenate(list(pool.map(_tile, tiles)))
+
+def colours(iters, p):
+    """render_mandel colour index for iteration counts: 0 in the set, else the top CIDXW bits (at least 1)."""
+    colr = iters >> (p.iterw - p.CIDXW)
+    return np.where(iters == p.ITER_MAX, 0, np.where(colr == 0, 1, colr))
+
+def main():
+    parser = argparse.ArgumentParser(description='Render_mandel iteration counts for a view, as the hardware computes them.')
+    parser.add_argument('-x', type=float, default=-3.5, help='left x-coordinate (default: -3.5)')
+    parser.add_argument('-y', type=float, default=-1.5, help='top y-coordinate (default: -1.5)')
+    parser.add_argument('-s', '--step', type=float, default=1/64, help='coordinate step (default: 1/64)')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count(), help='worker processes')
+    parser.add_argument('-o', '--output', help='write colour indices as a greyscale PNG')
+    for name, value in Params().__dict__.items():
+        parser.add_argument(f'--{name.lower().replace("_", "-")}', dest=name, type=int, default=value)
+    args = parser.parse_args()
+    p = Params(**{name: getattr(args, name) for name in Params.__dataclass_fields__})
+
+    x_start, y_start, step = p.fixed(args.x), p.fixed(args.y), p.fixed(args.step)
+    t = time.perf_counter()
+    iters = frame(x_start, y_start, step, p, args.jobs)
+    t = time.perf_counter() - t
+    print(f'{p.FB_WIDTH}x{p.FB_HEIGHT} from ({p.real(x_start)}, {p.real(y_start)}) step {p.real(step)}: '
+          f'{t:.2f} s with {args.jobs} processes; mean {iters.mean():.1f} iterations, '
+          f'{(iters == p.ITER_MAX).mean():.1%} in the set')
+    if args.output:
+        sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..', 'lib', 'res'))
+        from fmem import write_png
+        cidx = colours(iters, p) << max(0, 8 - p.CIDXW)
+        write_png(args.output, p.FB_WIDTH, p.FB_HEIGHT, cidx[:, :, None], 1)
+
+if __name__ == '__main__':
+    main()
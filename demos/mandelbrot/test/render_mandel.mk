@@ -0,0 +1,29 @@
+## Project F: render_mandel cocotb Test Bench Makefile
+## (C)2023 Will Green, open source software released under the MIT License
+## Learn more at https://projectf.io/posts/mandelbrot-set-verilog/
+
+SIM ?= icarus
+TOPLEVEL_LANG ?= verilog
+
+DUT = render_mandel
+VERILOG_SOURCES += $(PWD)/../${DUT}.sv $(PWD)/../mandelbrot.sv $(PWD)/../../../lib/maths/mul.sv
+VERILOG_SOURCES += $(PWD)/${DUT}_tb.sv
+TOPLEVEL = ${DUT}_tb
+MODULE = ${DUT}
+
+# Verilog module parameters (passed to the simulator by lib/params.mk)
+PARAMS = FB_WIDTH=80 FB_HEIGHT=45 FP_WIDTH=25 FP_INT=4 ITER_MAX=255 SUPERSAMPLE=1
+
+# each test Makefile needs its own build dir and results file
+COCOTB_RESULTS_FILE = results_${DUT}.xml
+SIM_BUILD = sim_build_${DUT}_${SIM}
+
+# the wrapper drives the clock with a delay
+ifeq ($(SIM),verilator)
+    COMPILE_ARGS += --timing
+endif
+
+include ../../../lib/params.mk
+
+# include cocotb's make rules to take care of the simulator setup
+include $(shell cocotb-config --makefiles)/Makefile.sim
@@ -0,0 +1,116 @@
+## Project F: render_mandel Test Bench (cocotb)
+## (C)2023 Will Green, open source software released under the MIT License
+## Learn more at https://projectf.io/posts/mandelbrot-set-verilog/
+
+# Renders views of the Mandelbrot set and compares the iteration count and
+# colour of every pixel with the NumPy reference (mandel.py), which repeats
+# the fixed-point arithmetic exactly, so any change to precision or the
+# iteration logic that changes the image fails. The clock runs in the Verilog
+# wrapper (render_mandel_tb.sv) and the bench only wakes as pixels are drawn.
+
+import os
+import random
+import time
+
+import cocotb
+import numpy as np
+from cocotb.triggers import ReadOnly, RisingEdge, with_timeout
+from cocotb.utils import get_sim_time
+
+import mandel
+
+VIEWS = int(os.environ.get('VIEWS', 2))  # random views to render
+JOBS = int(os.environ.get('JOBS', os.cpu_count()))  # processes for the reference
+CLK_NS = 2  # clock period in the wrapper
+
+def params(dut):
+    """Read the image parameters from render_mandel."""
+    inst = dut.render_mandel_inst
+    return mandel.Params(*(int(getattr(inst, name).value) for name in mandel.Params.__dataclass_fields__))
+
+async def reset_dut(dut):
+    dut.start.value = 0
+    dut.rst.value = 1
+    await RisingEdge(dut.clk)
+    await RisingEdge(dut.clk)
+    dut.rst.value = 0
+
+async def watch(dut, pixels):
+    """Record (x, y, iterations, cidx) of each pixel as drawing rises."""
+    inst = dut.render_mandel_inst
+    while True:
+        await RisingEdge(dut.drawing)
+        await ReadOnly()
+        pixels.append((dut.x.value.signed_integer, dut.y.value.signed_integer, int(inst.iter.value), int(dut.cidx.value)))
+
+async def render(dut, p, cx, cy, step):
+    """Render the view centred on (cx, cy) and check every pixel against the reference."""
+    step = max(p.fixed(step), 1)
+    x_start = p.fixed(cx) - p.FB_WIDTH // 2 * step
+    y_start = p.fixed(cy) - p.FB_HEIGHT // 2 * step
+    await reset_dut(dut)
+
+    t = time.perf_counter()
+    want = mandel.frame(x_start, y_start, step, p, JOBS)
+    model_s = time.perf_counter() - t
+
+    pixels = []
+    monitor = cocotb.start_soon(watch(dut, pixels))
+    dut.x_start.value = x_start
+    dut.y_start.value = y_start
+    dut.step.value = step
+    dut.start.value = 1
+    await RisingEdge(dut.clk)
+    dut.start.value = 0
+    start = get_sim_time('ns')
+    t = time.perf_counter()
+    limit = p.FB_WIDTH * p.FB_HEIGHT * (p.ITER_MAX + 1) * 20 * CLK_NS  # generous: about 15 cycles an iteration
+    await with_timeout(RisingEdge(dut.done), limit, 'ns')
+    sim_s = time.perf_counter() - t
+    cycles = int(get_sim_time('ns') - start) // CLK_NS
+    monitor.kill()
+
+    view = f'view ({p.real(x_start)}, {p.real(y_start)}) step {p.real(step)}'
+    x, y, iters, cidx = np.array(pixels, np.int64).reshape(-1, 4).T
+    rows, cols = np.divmod(np.arange(p.FB_WIDTH * p.FB_HEIGHT), p.FB_WIDTH)
+    assert len(x) == len(rows) and (x == cols).all() and (y == rows).all(), \
+        f"{view}: drew {len(x)} pixels, expected {len(rows)} in raster order!"
+
+    got = iters.reshape(want.shape)
+    bad = np.argwhere(got != want)
+    for py, px in bad[:8].tolist():
+        dut._log.error(f'pixel ({px},{py}): {got[py, px]} iterations, expected {want[py, px]}')
+    assert not len(bad), f"{view}: {len(bad)} of {got.size} pixels don't match reference iterations!"
+    bad = np.flatnonzero(cidx != mandel.colours(iters, p))
+    assert not len(bad), f"{view}: {len(bad)} pixels have the wrong colour for their iterations!"
+
+    dut._log.info(f'{view}: {got.size} pixels match, mean {want.mean():.1f} iterations; '
+                  f'{cycles} cycles in {sim_s:.1f} s, reference {model_s:.2f} s')
+
+
+# the demo's starting view
+@cocotb.test()
+async def start_1(dut):
+    """Test the demo's starting view, -3.5-1.5i to 1.5+1.3i, scaled to the framebuffer"""
+    p = params(dut)
+    scale = 320 / p.FB_WIDTH  # cover the same area whatever the framebuffer size
+    await render(dut, p, -3.5 + 160 / 64, -1.5 + 90 / 64, scale / 64)
+
+
+# deep zoom, where rounding and precision matter most
+@cocotb.test()
+async def zoom_1(dut):
+    """Test a deep zoom into Seahorse Valley at four times the smallest step"""
+    p = params(dut)
+    await render(dut, p, -0.7436, 0.1318, 4 / (1 << p.fbits))
+
+
+# random views near the edge of the set
+@cocotb.test()
+async def random_1(dut):
+    """Test random views of random size near the edge of the set"""
+    p = params(dut)
+    for _ in range(VIEWS):
+        angle = random.uniform(0, 2 * np.pi)  # edge of the main cardioid
+        edge = (np.exp(1j * angle) / 2 - np.exp(2j * angle) / 4)
+        await render(dut, p, edge.real, edge.imag, 2.0 ** -random.randint(6, p.fbits - 2))
@@ -0,0 +1,48 @@
+// Project F: Render Mandelbrot Set cocotb Test Bench Wrapper
+// (C)2023 Will Green, open source hardware released under the MIT License
+// Learn more at https://projectf.io/posts/mandelbrot-set-verilog/
+
+`default_nettype none
+`timescale 1ns / 1ps
+
+// Generates the clock in Verilog, so cocotb only wakes as each pixel is drawn
+// rather than on every step of the iteration.
+
+module render_mandel_tb #(
+    parameter CORDW=16,       // signed coordinate width (bits)
+    parameter FB_WIDTH=320,   // framebuffer width in pixels
+    parameter FB_HEIGHT=180,  // framebuffer height in pixels
+    parameter CIDXW=8,        // colour index width (bits)
+    parameter FP_WIDTH=25,    // total width of fixed-point number: integer + fractional bits
+    parameter FP_INT=4,       // integer bits in fixed-point number
+    parameter ITER_MAX=255,   // maximum number of interations
+    parameter SUPERSAMPLE=1   // combine multiple samples for each coordinate
+    ) (
+    output      logic clk,                            // clock (2 ns period)
+    input  wire logic rst,                            // reset
+    input  wire logic start,                          // start drawing
+    input  wire logic signed [FP_WIDTH-1:0] x_start,  // left x-coordinate
+    input  wire logic signed [FP_WIDTH-1:0] y_start,  // top y-coordinate
+    input  wire logic signed [FP_WIDTH-1:0] step,     // coordinate step
+    output      logic signed [CORDW-1:0] x,           // horizontal draw position
+    output      logic signed [CORDW-1:0] y,           // vertical draw position
+    output      logic [CIDXW-1:0] cidx,               // pixel colour
+    output      logic drawing,                        // actively drawing
+    output      logic busy,                           // render in progress
+    output      logic done                            // drawing is complete (high for one tick)
+    );
+
+    initial clk = 0;
+    always #1 clk = ~clk;
+
+    render_mandel #(
+        .CORDW(CORDW),
+        .FB_WIDTH(FB_WIDTH),
+        .FB_HEIGHT(FB_HEIGHT),
+        .CIDXW(CIDXW),
+        .FP_WIDTH(FP_WIDTH),
+        .FP_INT(FP_INT),
+        .ITER_MAX(ITER_MAX),
+        .SUPERSAMPLE(SUPERSAMPLE)
+    ) render_mandel_inst (.*);
+endmodule
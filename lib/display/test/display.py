@@ -0,0 +1,108 @@
+## Project F Library - Display Timings Test Bench (cocotb)
+## (C)2023 Will Green, open source software released under the MIT License
+## Learn more at https://projectf.io/verilog-lib/
+
+# The pixel clock runs in the Verilog wrapper (display_tb.sv), and the bench
+# only wakes when a display signal changes, recording when. After FRAMES whole
+# frames, the recorded edges of hsync, vsync, de, frame, and line are compared
+# with the edges worked out from the timing parameters (timing.py), and the
+# screen position is checked at the start of each frame, line, and active video.
+
+import os
+
+import cocotb
+import numpy as np
+from cocotb.triggers import Edge, ReadOnly, RisingEdge, Timer
+from cocotb.utils import get_sim_time
+
+import timing
+
+FRAMES = int(os.environ.get('FRAMES', 3))  # whole frames to check
+CLK_PS = 2000  # pixel clock period in the wrapper
+SIGNALS = ('hsync', 'vsync', 'de', 'frame', 'line')
+
+def params(dut):
+    """Read timing parameters from the display module."""
+    inst = dut.display_inst
+    return timing.Mode(*(int(getattr(inst, name).value) for name in timing.Mode.__dataclass_fields__))
+
+async def reset_dut(dut):
+    dut.rst_pix.value = 1
+    await RisingEdge(dut.clk_pix)
+    await RisingEdge(dut.clk_pix)
+    dut.rst_pix.value = 0
+
+async def watch(signal, times, values, check=None):
+    """Record the time and new value of every change of a 1-bit signal, calling check() as it rises."""
+    while True:
+        await Edge(signal)
+        times.append(get_sim_time('ps'))
+        values.append(int(signal.value))
+        if check and signal.value:
+            await ReadOnly()  # the position registers update on the same clock edge
+            check()
+
+
+# standard timings
+@cocotb.test()
+async def mode_1(dut):
+    """Test the timing parameters match the standard for the resolution"""
+    mode = params(dut)
+
+    standard = timing.STANDARD.get((mode.H_RES, mode.V_RES))
+    if standard is None:
+        dut._log.info(f'{mode.H_RES}x{mode.V_RES} is a test display without standard timings')
+        return
+    assert mode == standard, f"{mode} doesn't match the standard {standard}!"
+
+
+# full frames: every edge of the display signals against the timing model
+@cocotb.test()
+async def frames_1(dut):
+    """Test every edge of hsync, vsync, de, frame, and line over FRAMES frames"""
+    mode = params(dut)
+
+    recorded = {name: ([], []) for name in SIGNALS}
+    errors = []
+
+    def position(name, reg, want):
+        """Check for the screen position at the start of a frame, line, or active video."""
+        def check():
+            got = getattr(dut, reg).value.signed_integer
+            if got != want:
+                errors.append(f'{reg} at {name} start is {got}, expected {want} ({get_sim_time("ns")} ns)')
+        return check
+    checks = {'frame': position('frame', 'sy', mode.v_sta), 'line': position('line', 'sx', mode.h_sta),
+              'de': position('active video', 'sx', 0)}
+
+    await reset_dut(dut)
+    for name in SIGNALS:
+        cocotb.start_soon(watch(getattr(dut, name), *recorded[name], checks.get(name)))
+
+    # the first frame starts from reset, so check from the start of the second
+    await RisingEdge(dut.frame)
+    await RisingEdge(dut.frame)
+    start = int(get_sim_time('ps'))
+    end = start + FRAMES * mode.frame_total * CLK_PS
+    await Timer(end - start, units='ps')
+
+    expect = timing.frames(mode, FRAMES)
+    for name in SIGNALS:
+        times, values = (np.array(x, np.int64) for x in recorded[name])
+        keep = (times >= start) & (times < end)
+        got = ((times[keep] - start) // CLK_PS, values[keep])
+        want = expect[name]
+        n = min(len(got[0]), len(want[0]))
+        bad = np.flatnonzero((got[0][:n] != want[0][:n]) | (got[1][:n] != want[1][:n]))
+        if len(bad) or len(got[0]) != len(want[0]):
+            i = int(bad[0]) if len(bad) else n
+            show = lambda e: f'{e[1][i]} at cycle {e[0][i]}' if i < len(e[0]) else 'nothing'
+            errors.append(f'{name}: {len(got[0])} edges, expected {len(want[0])}; '
+                          f'edge {i} is {show(got)}, expected {show(want)}')
+        else:
+            dut._log.info(f'{name}: {len(got[0])} edges match')
+
+    for error in errors[:16]:
+        dut._log.error(error)
+    assert not errors, f"{len(errors)} timing errors in {FRAMES} frames of {mode.H_RES}x{mode.V_RES}!"
+    dut._log.info(f'{FRAMES} frames of {mode.frame_total} cycles ({mode.h_total}x{mode.v_total}) match')
@@ -0,0 +1,29 @@
+## Project F Library - display_24x18 cocotb Test Bench Makefile
+## (C)2023 Will Green, open source software released under the MIT License
+## Learn more at https://projectf.io/verilog-lib/
+
+SIM ?= icarus
+TOPLEVEL_LANG ?= verilog
+
+DUT = display_24x18
+VERILOG_SOURCES += $(PWD)/../${DUT}.sv $(PWD)/display_tb.sv
+TOPLEVEL = display_tb
+MODULE = display
+
+# Verilog module parameters (passed to the simulator by lib/params.mk)
+PARAMS = CORDW=16
+
+# each test Makefile needs its own build dir and results file
+COCOTB_RESULTS_FILE = results_${DUT}.xml
+SIM_BUILD = sim_build_${DUT}_${SIM}
+
+# the wrapper instantiates DISPLAY and drives the clock with a delay
+COMPILE_ARGS += -DDISPLAY=${DUT}
+ifeq ($(SIM),verilator)
+    COMPILE_ARGS += --timing
+endif
+
+include ../../params.mk
+
+# include cocotb's make rules to take care of the simulator setup
+include $(shell cocotb-config --makefiles)/Makefile.sim
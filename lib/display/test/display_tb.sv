@@ -0,0 +1,30 @@
+// Project F Library - Display Timings cocotb Test Bench Wrapper
+// (C)2023 Will Green, open source hardware released under the MIT License
+// Learn more at https://projectf.io/verilog-lib/
+
+`default_nettype none
+`timescale 1ns / 1ps
+
+// Generates the pixel clock in Verilog, so cocotb only wakes on the edges of
+// the display signals rather than twice per pixel. DISPLAY names the display
+// module to test, for example: -DDISPLAY=display_480p
+
+module display_tb #(
+    parameter CORDW=16  // signed coordinate width (bits)
+    ) (
+    output      logic clk_pix,  // pixel clock (2 ns period)
+    input  wire logic rst_pix,  // reset in pixel clock domain
+    output      logic hsync,    // horizontal sync
+    output      logic vsync,    // vertical sync
+    output      logic de,       // data enable (low in blanking interval)
+    output      logic frame,    // high at start of frame
+    output      logic line,     // high at start of line
+    output      logic signed [CORDW-1:0] sx,  // horizontal screen position
+    output      logic signed [CORDW-1:0] sy   // vertical screen position
+    );
+
+    initial clk_pix = 0;
+    always #1 clk_pix = ~clk_pix;
+
+    `DISPLAY #(.CORDW(CORDW)) display_inst (.*);
+endmodule
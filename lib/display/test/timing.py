@@ -0,0 +1,91 @@
+## Project F Library - Display Timing Model (NumPy)
+## (C)2023 Will Green, open source software released under the MIT License
+## Learn more at https://projectf.io/verilog-lib/
+
+# Edges of the display signals over a frame, worked out from the timing
+# parameters rather than simulated pixel by pixel. Positions count pixel clock
+# cycles from the start of the frame: the cycle where frame is high and the
+# screen position is the top left of the blanking interval (H_STA, V_STA).
+#
+# Each signal's edges are a pair of arrays (position, new value), in order.
+
+from dataclasses import dataclass
+
+import numpy as np
+
+@dataclass(frozen=True)
+class Mode:
+    """Display timing parameters, as named in the display modules."""
+    H_RES: int
+    V_RES: int
+    H_FP: int
+    H_SYNC: int
+    H_BP: int
+    V_FP: int
+    V_SYNC: int
+    V_BP: int
+    H_POL: int
+    V_POL: int
+
+    @property
+    def h_total(self):
+        return self.H_FP + self.H_SYNC + self.H_BP + self.H_RES
+
+    @property
+    def v_total(self):
+        return self.V_FP + self.V_SYNC + self.V_BP + self.V_RES
+
+    @property
+    def frame_total(self):
+        return self.h_total * self.v_total
+
+    @property
+    def h_sta(self):
+        return -self.H_FP - self.H_SYNC - self.H_BP
+
+    @property
+    def v_sta(self):
+        return -self.V_FP - self.V_SYNC - self.V_BP
+
+# standard timings (VGA and CEA-861) by resolution: the display modules' defaults should match
+STANDARD = {
+    (640, 480):   Mode(640, 480, 16, 96, 48, 10, 2, 33, 0, 0),
+    (1280, 720):  Mode(1280, 720, 110, 40, 220, 5, 5, 20, 1, 1),
+    (1920, 1080): Mode(1920, 1080, 88, 44, 148, 4, 5, 36, 1, 1),
+}
+
+def position(mode, sx, sy):
+    """Cycles from the start of the frame to screen position (sx, sy)."""
+    return (np.asarray(sy) - mode.v_sta) * mode.h_total + (np.asarray(sx) - mode.h_sta)
+
+def _edges(mode, on, off, value=1):
+    """Edges of a signal that is value from positions on until off, wrapping at the end of the frame."""
+    pos = np.concatenate([np.asarray(on).ravel(), np.asarray(off).ravel()]) % mode.frame_total
+    new = np.concatenate([np.full(np.size(on), value), np.full(np.size(off), 1 - value)])
+    order = np.argsort(pos, kind='stable')
+    return pos[order], new[order]
+
+def edges(mode):
+    """Edges of hsync, vsync, de, frame, and line in one frame: {signal: (positions, values)}."""
+    lines = np.arange(mode.v_sta, mode.V_RES)
+    active = np.arange(mode.V_RES)
+    hs_sta = mode.h_sta + mode.H_FP
+    vs_sta = mode.v_sta + mode.V_FP
+    return {
+        # sync is asserted from the end of the front porch for the sync width, in each polarity
+        'hsync': _edges(mode, position(mode, hs_sta, lines), position(mode, hs_sta + mode.H_SYNC, lines), mode.H_POL),
+        'vsync': _edges(mode, position(mode, mode.h_sta, vs_sta),
+                        position(mode, mode.h_sta, vs_sta + mode.V_SYNC), mode.V_POL),
+        # de covers the active pixels of the active lines, ending the cycle after the last one
+        'de': _edges(mode, position(mode, 0, active), position(mode, mode.H_RES - 1, active) + 1),
+        'frame': _edges(mode, [0], [1]),
+        'line': _edges(mode, position(mode, mode.h_sta, lines), position(mode, mode.h_sta, lines) + 1),
+    }
+
+def frames(mode, count):
+    """Edges over count frames, positions counted from the start of the first."""
+    out = {}
+    for name, (pos, new) in edges(mode).items():
+        offsets = np.repeat(np.arange(count) * mode.frame_total, len(pos))
+        out[name] = (np.tile(pos, count) + offsets, np.tile(new, count))
+    return out
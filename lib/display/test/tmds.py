@@ -0,0 +1,80 @@
+## Project F Library - TMDS Encoder Model (NumPy)
+## (C)2023 Will Green, open source software released under the MIT License
+## Learn more at https://projectf.io/verilog-lib/
+
+# TMDS encoding from the DVI 1.0 specification (figure 3-5), computed once
+# for all 256 data values under every running disparity into lookup tables.
+# Checking a stream is then a table lookup per symbol rather than the whole
+# algorithm. The running disparity (cnt in the spec) is the ones minus zeros
+# sent since the last control period, where it's reset to 0.
+
+import numpy as np
+
+CTRL = np.array([0b1101010100, 0b0010101011, 0b0101010100, 0b1010101011])  # control symbols by {c1, c0}
+DISPARITY = np.arange(-16, 16)  # running disparity states in the table (5-bit signed, as tmds_encoder_dvi.sv)
+PROBE = [0x3E, 0x05, 0x04, 0x3F, 0x1E, 0x2F, 0x1F, 0x08]  # data whose symbols differ for every starting disparity
+
+def _ones(x, bits):
+    return sum((x >> i) & 1 for i in range(bits))
+
+def _tables():
+    """Encoded symbols and next disparity, indexed [disparity + 16, data]."""
+    d = np.arange(256)
+    n1d = _ones(d, 8)
+    use_xnor = (n1d > 4) | ((n1d == 4) & (d & 1 == 0))
+    q_m = d & 1
+    for i in range(1, 8):
+        bit = ((q_m >> (i-1)) & 1) ^ ((d >> i) & 1) ^ use_xnor  # XNOR is XOR inverted
+        q_m = q_m | bit << i
+    q_m8 = (~use_xnor).astype(int)
+    n1 = _ones(q_m, 8)
+    n0 = 8 - n1
+    inv = q_m ^ 0xFF
+
+    cnt = DISPARITY[:, None]
+    same = (cnt == 0) | (n1 == n0)
+    invert = ((cnt > 0) & (n1 > n0)) | ((cnt < 0) & (n0 > n1))
+    symbol = np.where(same, (1 - q_m8) << 9 | q_m8 << 8 | np.where(q_m8 == 1, q_m, inv),
+                      np.where(invert, 1 << 9 | q_m8 << 8 | inv, q_m8 << 8 | q_m))
+    nxt = np.where(same, cnt + np.where(q_m8 == 1, n1 - n0, n0 - n1),
+                   np.where(invert, cnt + 2*q_m8 + (n0 - n1), cnt - 2*(1 - q_m8) + (n1 - n0)))
+    return symbol, (nxt + 16) % 32 - 16  # unreachable states wrap like the 5-bit register
+
+SYMBOL, NEXT = _tables()
+
+def disparity(symbol):
+    """Ones minus zeros of 10-bit symbols."""
+    return 2 * _ones(np.asarray(symbol), 10) - 10
+
+def reachable():
+    """Running disparities reachable from 0 with the shortest data sequence to each: {disparity: [data, ...]}."""
+    paths, todo = {0: []}, [0]
+    while todo:
+        cnt = todo.pop(0)
+        for data in range(256):
+            nxt = int(NEXT[cnt + 16, data])
+            if nxt not in paths:
+                paths[nxt] = paths[cnt] + [data]
+                todo.append(nxt)
+    return paths
+
+def identifies(values):
+    """True if the symbols for a data sequence differ for every starting disparity in the table."""
+    cnt, out = DISPARITY, []
+    for data in values:
+        out.append(SYMBOL[cnt + 16, data])
+        cnt = NEXT[cnt + 16, data]
+    return len(set(zip(*out))) == len(DISPARITY)
+
+def encode(data, de, ctrl):
+    """Symbols for a stream of (data, de, ctrl) values, starting after a control period."""
+    out = np.zeros(len(data), np.int64)
+    cnt = 0
+    for i, (d, e, c) in enumerate(zip(data.tolist(), de.tolist(), ctrl.tolist())):
+        if e:
+            out[i] = SYMBOL[cnt + 16, d]
+            cnt = int(NEXT[cnt + 16, d])
+        else:
+            out[i] = CTRL[c]
+            cnt = 0
+    return out
@@ -0,0 +1,23 @@
+## Project F Library - tmds_encoder_dvi cocotb Test Bench Makefile
+## (C)2023 Will Green, open source software released under the MIT License
+## Learn more at https://projectf.io/verilog-lib/
+
+SIM ?= icarus
+TOPLEVEL_LANG ?= verilog
+
+DUT = tmds_encoder_dvi
+VERILOG_SOURCES += $(PWD)/../${DUT}.sv
+TOPLEVEL = ${DUT}
+MODULE = ${DUT}
+
+# Verilog module parameters (passed to the simulator by lib/params.mk)
+PARAMS =
+
+# each test Makefile needs its own build dir and results file
+COCOTB_RESULTS_FILE = results_${DUT}.xml
+SIM_BUILD = sim_build_${DUT}_${SIM}
+
+include ../../params.mk
+
+# include cocotb's make rules to take care of the simulator setup
+include $(shell cocotb-config --makefiles)/Makefile.sim
@@ -0,0 +1,143 @@
+## Project F Library - tmds_encoder_dvi Test Bench (cocotb)
+## (C)2023 Will Green, open source software released under the MIT License
+## Learn more at https://projectf.io/verilog-lib/
+
+# Expected symbols come from lookup tables built once from the DVI algorithm
+# (tmds.py). The exhaustive test puts the encoder in every reachable running
+# disparity and encodes all 256 data values from each, following each with a
+# probe sequence to check the disparity it leaves; the stream tests check
+# long random streams symbol by symbol and for DC balance: the running
+# disparity of the symbols sent must stay bounded over any data period.
+
+import os
+import random
+
+import cocotb
+import numpy as np
+from cocotb.clock import Clock
+from cocotb.triggers import RisingEdge
+
+import tmds
+
+SYMBOLS = int(os.environ.get('SYMBOLS', 100000))  # symbols per random stream
+LINE = 64  # random streams blank for up to LINE cycles between data periods of up to 4*LINE
+
+def rng():
+    """NumPy generator seeded from cocotb's random seed, so RANDOM_SEED repeats a test."""
+    return np.random.default_rng(random.getrandbits(32))
+
+async def start_dut(dut):
+    """Start the clock and reset the DUT, leaving it in a control period."""
+    cocotb.start_soon(Clock(dut.clk_pix, 1, units="ns").start())
+    dut.data_in.value = 0
+    dut.ctrl_in.value = 0
+    dut.de.value = 0
+    dut.rst_pix.value = 1
+    await RisingEdge(dut.clk_pix)
+    await RisingEdge(dut.clk_pix)
+    dut.rst_pix.value = 0
+    await RisingEdge(dut.clk_pix)
+
+async def encode(dut, data, de, ctrl):
+    """Drive a stream of (data, de, ctrl), one per cycle, and return the symbol for each."""
+    data_in, ctrl_in, de_in, tmds_out = dut.data_in, dut.ctrl_in, dut.de, dut.tmds
+    out = []
+    for d, e, c in zip(data.tolist() + [0], de.tolist() + [0], ctrl.tolist() + [0]):
+        data_in.value = d
+        de_in.value = e
+        ctrl_in.value = c
+        await RisingEdge(dut.clk_pix)
+        out.append(int(tmds_out.value))  # read before this edge updates tmds: the symbol for the last input
+    return np.array(out[1:], np.int64)
+
+def running(symbols, de):
+    """Running disparity after each symbol, restarting from 0 at each control period."""
+    disp = np.where(de == 1, tmds.disparity(symbols), 0)
+    total = np.cumsum(disp)
+    period = np.maximum.accumulate(np.where(de == 0, np.arange(len(de)), 0))  # index of the last control symbol
+    return total - total[period] * (de[period] == 0)
+
+def check_stream(dut, data, de, ctrl, got):
+    """Compare symbols with the model and check the running disparity stays within the reachable states."""
+    want = tmds.encode(data, de, ctrl)
+    bad = np.flatnonzero(got != want)
+    for i in bad[:8].tolist():
+        dut._log.error(f'symbol {i}: data_in={data[i]:#04x} de={de[i]} ctrl_in={ctrl[i]}: '
+                       f'tmds={got[i]:010b}, expected {want[i]:010b}')
+    assert not len(bad), f"{len(bad)} of {len(got)} symbols don't match model!"
+
+    bound = max(abs(cnt) for cnt in tmds.reachable())
+    rd = running(got, de)
+    worst = int(np.abs(rd).max(initial=0))
+    assert worst <= bound, f"running disparity reached {worst}, beyond {bound}: stream isn't DC balanced!"
+    active = int(de.sum())
+    dut._log.info(f'{len(got)} symbols ({active} data) match; running disparity within +/-{worst}, '
+                  f'mean {np.where(de == 1, tmds.disparity(got), 0).sum() / max(active, 1):+.4f} per data symbol')
+
+def stream(gen, n, values=None):
+    """Random stream of n (data, de, ctrl) with data periods and blanking of random length."""
+    runs = []
+    while sum(len(r) for r in runs) < n:
+        runs.append(np.zeros(gen.integers(1, LINE + 1), np.int64))
+        runs.append(np.ones(gen.integers(1, 4*LINE + 1), np.int64))
+    de = np.concatenate(runs)[:n]
+    data = gen.choice(values, n) if values is not None else gen.integers(0, 256, n)
+    ctrl = gen.integers(0, 4, n)
+    return data, de, ctrl
+
+
+# control periods
+@cocotb.test()
+async def control_1(dut):
+    """Test reset and all four control symbols"""
+    await start_dut(dut)
+    assert int(dut.tmds.value) == tmds.CTRL[0], f"tmds after reset is {int(dut.tmds.value):010b}, expected {tmds.CTRL[0]:010b}!"
+
+    # each control symbol, then data from zero disparity, so control periods must reset it
+    ctrl = np.repeat(np.arange(4), 3)
+    de = np.tile([0, 1, 1], 4)
+    data = np.tile([0, 0x10, 0xFF], 4)
+    check_stream(dut, data, de, ctrl, await encode(dut, data, de, ctrl))
+
+
+# every data value in every reachable running disparity
+@cocotb.test()
+async def exhaustive_1(dut):
+    """Test all 256 data values in every reachable running disparity"""
+    await start_dut(dut)
+
+    # after each value, the probe's symbols show the disparity the encoder was left with
+    assert tmds.identifies(tmds.PROBE), "probe doesn't identify every running disparity!"
+    paths = tmds.reachable()
+    data, de = [], []
+    for path in paths.values():
+        for value in range(256):
+            seq = path + [value] + tmds.PROBE  # from a control period, the path to the disparity
+            data += [0] + seq
+            de += [0] + [1] * len(seq)
+    data, de = np.array(data, np.int64), np.array(de, np.int64)
+    ctrl = np.zeros_like(data)
+
+    check_stream(dut, data, de, ctrl, await encode(dut, data, de, ctrl))
+    dut._log.info(f'all 256 data values checked in running disparities {sorted(paths)}')
+
+
+# long random streams
+@cocotb.test()
+async def stream_1(dut):
+    """Test a long random stream of data and blanking"""
+    await start_dut(dut)
+    data, de, ctrl = stream(rng(), SYMBOLS)
+    check_stream(dut, data, de, ctrl, await encode(dut, data, de, ctrl))
+
+@cocotb.test()
+async def balance_1(dut):
+    """Test DC balance with a long stream of the least balanced data values"""
+    await start_dut(dut)
+    # data values whose transition-minimized form is furthest from balanced
+    skew = np.abs(tmds.disparity(tmds.SYMBOL[16]))
+    values = np.flatnonzero(skew == skew.max())
+    data, de, ctrl = stream(rng(), SYMBOLS, values)
+    de[:] = 1  # one long data period
+    de[0] = 0
+    check_stream(dut, data, de, ctrl, await encode(dut, data, de, ctrl))
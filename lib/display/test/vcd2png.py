@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+## Project F Library - Waveform to Frame Images
+## (C)2023 Will Green, open source software released under the MIT License
+## Learn more at https://projectf.io/verilog-lib/
+
+# Rebuilds the frames a display simulation drew from its waveform dump and
+# writes each as a PNG. Like the Verilator sims, it samples the signals after
+# each rising edge of the pixel clock: a pixel while de is high, and a new line
+# each time de rises. A frame ends when the frame signal is high or, without
+# one, when blanking lasts longer than a line of pixels. The dump streams
+# through in blocks, keeping only the frame being drawn and the values of the
+# signals it follows, so memory stays the same however large the dump. FST
+# dumps stream through fst2vcd from GTKWave.
+#
+#   python3 vcd2png.py sim.vcd -o frames
+#   python3 vcd2png.py sim.fst --de de --frame '' --red vga_r --green vga_g --blue vga_b -o frames
+#   python3 vcd2png.py sim.vcd --skip 1 --compare golden  # exits 1 if any frame differs
+
+import argparse
+import gzip
+import os
+import re
+import subprocess
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'res'))
+from fmem import read_png, write_png  # noqa: E402
+
+CHUNK = 1 << 22  # bytes of dump read at a time
+UNKNOWN = bytes.maketrans(b'xXzZ', b'0000')  # x and z read as 0
+
+def open_dump(path):
+    """Binary stream of VCD text, with the fst2vcd process for FST dumps: plain, gzipped, or FST."""
+    if path == '-':
+        return sys.stdin.buffer, None
+    if path.endswith('.fst'):
+        proc = subprocess.Popen(['fst2vcd', path], stdout=subprocess.PIPE)
+        return proc.stdout, proc
+    return (gzip.open if path.endswith('.gz') else open)(path, 'rb'), None
+
+def header(stream):
+    """Read declarations up to $enddefinitions: return {hierarchical name: (id, width)} and the bytes after."""
+    scope, signals, text = [], {}, b''
+    while b'$enddefinitions' not in text:
+        block = stream.read(CHUNK)
+        if not block:
+            raise ValueError('no $enddefinitions in dump')
+        text += block
+    decls, _, rest = text.partition(b'$enddefinitions')
+    for line in decls.split(b'\n'):
+        words = line.split()
+        if not words:
+            continue
+        if words[0] == b'$scope':
+            scope.append(words[2].decode())
+        elif words[0] == b'$upscope':
+            scope.pop()
+        elif words[0] == b'$var':
+            signals.setdefault('.'.join(scope + [words[4].decode()]), (words[3], int(words[2])))
+    return signals, rest.partition(b'\n')[2]
+
+def find(signals, name):
+    """The (id, width) of a signal by hierarchical name or the end of one, preferring the top-most."""
+    matches = [s for s in signals if s == name or s.endswith('.' + name)]
+    if not matches:
+        raise ValueError(f"no signal '{name}' in dump")
+    return signals[min(matches, key=lambda s: s.count('.'))]
+
+def samples(stream, rest, clk, followed):
+    """Values of the followed signals ({id: index}) after each rising edge of clk, as a list.
+
+    A regular expression picks out time steps and changes to clk and the followed signals, so the
+    changes of other signals, usually most of a dump, are skipped without a Python step each."""
+    ids = b'|'.join(re.escape(id) for id in [clk, *followed])
+    changes = re.compile(rb'^(?:#\d+|([01xzXZ])(' + ids + rb')|[bB]([01xzXZ]+) (' + ids + rb'))\r?$', re.M)
+    state = [0] * (max(followed.values(), default=-1) + 1)
+    level, rose = 0, False
+    block = rest
+    while True:
+        more = stream.read(CHUNK)
+        text = block + more
+        cut = len(text) if not more else text.rfind(b'\n') + 1
+        for m in changes.finditer(text, 0, cut):
+            value, id = (m[1], m[2]) if m[2] is not None else (m[3], m[4])
+            if id is None:  # a new time step, so the last one is complete
+                if rose:
+                    yield state
+                    rose = False
+            elif id == clk:
+                bit = value[-1:] == b'1'
+                rose = rose or (bit and not level)
+                level = bit
+            else:
+                state[followed[id]] = int(value.translate(UNKNOWN), 2)
+        if not more:
+            break
+        block = text[cut:]
+    if rose:
+        yield state
+
+def frames(stream, rest, clk, de, frame, colour):
+    """Frames drawn in a dump as (height, width, 3) uint8 arrays, leaving out a frame the dump ends part way through.
+
+    clk, de, and frame are signal ids (frame may be None); colour is [(id, width)] for red, green, and blue."""
+    followed = {de: 0, **{id: 1 + i for i, (id, _) in enumerate(colour)}}
+    if frame is not None:
+        followed[frame] = 4
+    widths = np.array([w for _, w in colour])
+    scale = 255 / ((1 << widths) - 1)
+    rows, row, gap = [], [], 0
+    height = None
+    for s in samples(stream, rest, clk, followed):
+        if not s[0] and row:  # end of line: before the frame check, as frame can rise with de falling
+            rows.append(row)
+            row = []
+        if frame is not None and s[4] and rows:
+            yield _image(rows, scale)
+            rows, height = [], len(rows)
+        if s[0]:
+            if not row and frame is None and rows and gap > len(rows[-1]):
+                yield _image(rows, scale)  # blanking longer than a line: vertical blanking
+                rows, height = [], len(rows)
+            row.append(s[1:4])
+            gap = 0
+        else:
+            gap += 1
+    if row:
+        rows.append(row)
+    if rows and len(rows) == (height or len(rows)):  # ended in blanking, or the only frame
+        yield _image(rows, scale)
+
+def _image(rows, scale):
+    """Frame image from rows of channel values, padding short rows (such as where the dump starts) with black."""
+    image = np.zeros((len(rows), max(len(r) for r in rows), 3), np.uint8)
+    for y, r in enumerate(rows):
+        image[y, :len(r)] = np.rint(np.array(r) * scale)
+    return image
+
+def compare(image, path):
+    """Pixels that differ from a reference PNG, or None if it's missing or a different size."""
+    if not os.path.exists(path):
+        return None
+    width, height, palette, rows = read_png(path)
+    if (height, width) != image.shape[:2]:
+        return None
+    diff = 0
+    for y, row in enumerate(rows):
+        ref = palette[row[:, 0]] if palette is not None else row
+        ref = ref[:, :3] if ref.shape[1] >= 3 else np.repeat(ref[:, :1], 3, 1)
+        diff += int(np.any(ref != image[y], axis=1).sum())
+    return diff
+
+def main():
+    parser = argparse.ArgumentParser(description='Write the frames drawn in a display simulation dump as PNGs.')
+    parser.add_argument('dump', help='VCD, gzipped VCD, or FST dump (- for VCD on stdin)')
+    parser.add_argument('-o', '--output', help='folder to write frame_NNNN.png to')
+    parser.add_argument('--clk', default='clk_pix', help='pixel clock (default: clk_pix)')
+    parser.add_argument('--de', default='sdl_de', help='data enable (default: sdl_de)')
+    parser.add_argument('--frame', default='sdl_frame', help="high at start of frame, '' for none (default: sdl_frame)")
+    parser.add_argument('--red', default='sdl_r', help='red channel (default: sdl_r)')
+    parser.add_argument('--green', default='sdl_g', help='green channel (default: sdl_g)')
+    parser.add_argument('--blue', default='sdl_b', help='blue channel (default: sdl_b)')
+    parser.add_argument('--skip', type=int, default=0, help='frames to skip, such as the first after reset')
+    parser.add_argument('--count', type=int, help='frames to write (default: all)')
+    parser.add_argument('--compare', help='folder of reference frame_NNNN.png: exit 1 if any frame differs')
+    args = parser.parse_args()
+    if not args.output and not args.compare:
+        parser.error('give --output, --compare, or both')
+
+    stream, proc = open_dump(args.dump)
+    signals, rest = header(stream)
+    colour = [find(signals, name) for name in (args.red, args.green, args.blue)]
+    frame = find(signals, args.frame)[0] if args.frame else None
+    if args.output:
+        os.makedirs(args.output, exist_ok=True)
+
+    written, failed = 0, 0
+    for i, image in enumerate(frames(stream, rest, find(signals, args.clk)[0], find(signals, args.de)[0], frame, colour)):
+        if i < args.skip:
+            continue
+        name = f'frame_{written:04d}.png'
+        height, width = image.shape[:2]
+        if args.output:
+            write_png(os.path.join(args.output, name), width, height, image, 3)
+        note = ''
+        if args.compare:
+            diff = compare(image, os.path.join(args.compare, name))
+            note = ': no reference of this size' if diff is None else f': {diff} pixels differ' if diff else ': matches'
+            failed += diff != 0
+        print(f'{name} {width}x{height}{note}')
+        written += 1
+        if written == args.count:
+            break
+    if proc:
+        proc.kill()
+    if args.compare:
+        print(f'{written - failed} of {written} frames match {args.compare}')
+    sys.exit(1 if failed or not written else 0)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+## Project F Library - Waveform to Frame Images Check
+## (C)2023 Will Green, open source software released under the MIT License
+## Learn more at https://projectf.io/verilog-lib/
+
+# Checks vcd2png.py rebuilds frames exactly from synthetic dumps laid out like
+# display_480p: blanking at the start of each line and frame, active video at
+# the end, and frame high for the first (blank) pixel of a frame, so the pixel
+# after the last active one has de low and frame high together. Each dump ends
+# part way through a frame, which must be left out. Both ways of ending a frame
+# are checked: on the frame signal and on vertical blanking.
+#
+#   python3 vcd2png_check.py
+
+import io
+import sys
+
+import numpy as np
+
+from vcd2png import find, frames, header
+
+H_BLANK, H_ACTIVE = 4, 6  # pixels per line
+V_BLANK, V_ACTIVE = 2, 3  # lines per frame
+FRAMES = 3
+
+def pixel(f, y, x):
+    """Colour of a pixel: each channel tells frame, line, and column apart."""
+    return 16*f + 1, 16*y + 2, 16*x + 3
+
+def dump():
+    """VCD of FRAMES frames, then the blanking and first active line of another."""
+    lines = ['$scope module top $end',
+             '$var wire 1 ! clk_pix $end', '$var wire 1 " sdl_de $end', '$var wire 1 # sdl_frame $end',
+             '$var wire 8 $ sdl_r $end', '$var wire 8 % sdl_g $end', '$var wire 8 & sdl_b $end',
+             '$upscope $end', '$enddefinitions $end']
+    t = 0
+    for f in range(FRAMES + 1):
+        for sy in range(V_BLANK + V_ACTIVE if f < FRAMES else V_BLANK + 1):
+            for sx in range(H_BLANK + H_ACTIVE):
+                x, y = sx - H_BLANK, sy - V_BLANK
+                de = x >= 0 and y >= 0
+                r, g, b = pixel(f, y, x) if de else (0, 0, 0)
+                lines += [f'#{t}', '1!', f'{int(de)}"', f'{int(sx == 0 and sy == 0)}#',
+                          f'b{r:b} $', f'b{g:b} %', f'b{b:b} &', f'#{t + 1}', '0!']
+                t += 2
+    return io.BytesIO('\n'.join(lines).encode() + b'\n')
+
+def check(name, frame):
+    """Rebuild the frames of the dump, ending each on frame (signal name) or blanking (''): return errors."""
+    stream = dump()
+    signals, rest = header(stream)
+    colour = [find(signals, n) for n in ('sdl_r', 'sdl_g', 'sdl_b')]
+    images = list(frames(stream, rest, find(signals, 'clk_pix')[0], find(signals, 'sdl_de')[0],
+                         find(signals, frame)[0] if frame else None, colour))
+    errors = [] if len(images) == FRAMES else [f'{name}: {len(images)} frames, not {FRAMES}']
+    for f, image in enumerate(images[:FRAMES]):
+        want = np.array([[pixel(f, y, x) for x in range(H_ACTIVE)] for y in range(V_ACTIVE)], np.uint8)
+        if image.shape != want.shape:
+            errors.append(f'{name}: frame {f} is {image.shape[1]}x{image.shape[0]}, not {H_ACTIVE}x{V_ACTIVE}')
+        elif (image != want).any():
+            errors.append(f'{name}: frame {f} has {int((image != want).any(axis=2).sum())} pixels wrong')
+    return errors
+
+def main():
+    errors = check('frame signal', 'sdl_frame') + check('vertical blanking', '')
+    for e in errors:
+        print(e)
+    print(f'vcd2png: {"FAIL" if errors else "PASS"}')
+    return 1 if errors else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,162 @@
+## Project F Library - Drawing Test Bench Driver (cocotb)
+## (C)2023 Will Green, open source software released under the MIT License
+## Learn more at https://projectf.io/verilog-lib/
+
+# Drives the graphics drawing cores with a start/done handshake, starting each
+# shape on the cycle after the last one is done, and collects every (x, y)
+# the core outputs while 'drawing' is high. The pixels are compared with the
+# reference rasterizer (raster.py) in a framebuffer, and shape by shape, with
+# each pixel counted: a pixel drawn twice must be drawn twice by the model.
+#
+# Every bench has the same random tests, made here by random_tests from a
+# shape generator and the model: random_1 draws SHAPES random shapes, and oe_1
+# a quarter as many with output enable low half the time.
+
+import os
+import random
+
+import cocotb
+import numpy as np
+from cocotb.clock import Clock
+from cocotb.triggers import RisingEdge
+
+SHAPES = int(os.environ.get('SHAPES', 1000))  # random shapes per test
+SHAPE_SIZE = int(os.environ.get('SHAPE_SIZE', 32))  # largest random shape in pixels (width and height)
+FB_WIDTH, FB_HEIGHT = 320, 240  # random shapes lie in this framebuffer, centred on (0,0)
+
+def rng():
+    """NumPy generator seeded from cocotb's random seed, so RANDOM_SEED repeats a test."""
+    return np.random.default_rng(random.getrandbits(32))
+
+def vertices(gen, n, k, size=SHAPE_SIZE):
+    """k random vertices for each of n shapes, inside one size x size box per shape: rows of (x0, y0, x1, y1, ...)."""
+    x = gen.integers(-FB_WIDTH//2, FB_WIDTH//2 - size, n)  # top-left corner of the box
+    y = gen.integers(-FB_HEIGHT//2, FB_HEIGHT//2 - size, n)
+    cols = []
+    for _ in range(k):
+        cols += [x + gen.integers(0, size, n), y + gen.integers(0, size, n)]
+    return np.stack(cols, axis=1)
+
+def random_vertices(k):
+    """Shape generator: n shapes of k random vertices each."""
+    return lambda n: vertices(rng(), n, k)
+
+def random_circles(n):
+    """n random circles up to SHAPE_SIZE pixels across: rows of (x0, y0, r0)."""
+    gen = rng()
+    return np.column_stack([vertices(gen, n, 1), gen.integers(0, SHAPE_SIZE // 2, n)])
+
+def random_spans(n):
+    """n random lines left to right, up to SHAPE_SIZE pixels long: rows of (x0, x1)."""
+    gen = rng()
+    x0 = vertices(gen, n, 1)[:, 0]
+    return np.stack([x0, x0 + gen.integers(0, SHAPE_SIZE, n)], axis=1)
+
+def budget(pixels, oe=1.0):
+    """Cycles allowed for shapes of so many pixels: at least one every 16 cycles, after 64 to start."""
+    return ((16 * np.asarray(pixels) + 64) / oe).astype(np.int64)
+
+async def start_dut(dut):
+    """Start the clock and reset the DUT, leaving start low and oe high."""
+    cocotb.start_soon(Clock(dut.clk, 1, units="ns").start())
+    dut.start.value = 0
+    dut.oe.value = 1
+    dut.rst.value = 1
+    await RisingEdge(dut.clk)
+    await RisingEdge(dut.clk)
+    dut.rst.value = 0
+    await RisingEdge(dut.clk)
+
+async def draw_shapes(dut, inputs, rows, budgets, oe=1.0):
+    """Draw rows of input values back-to-back: return pixels (shape, x, y) and cycles per shape.
+
+    With oe below 1.0, output enable is high on that fraction of cycles, at random."""
+    ports = [getattr(dut, name) for name in inputs]
+    drawing, done, x = dut.drawing, dut.done, dut.x
+    y = getattr(dut, 'y', None)  # draw_line_1d has no y
+    shape, xs, ys = [], [], []
+    cycles = []
+    for i, (row, limit) in enumerate(zip(rows, budgets)):
+        for port, v in zip(ports, row):
+            port.value = int(v)
+        dut.start.value = 1
+
+        await RisingEdge(dut.clk)
+        dut.start.value = 0
+        taken = 1  # edge that sampled start
+        while not done.value:
+            assert taken < limit, f"watchdog: shape {i} {dict(zip(inputs, map(int, row)))} not done within {limit} cycles!"
+            if oe < 1.0:
+                dut.oe.value = random.random() < oe
+            await RisingEdge(dut.clk)
+            taken += 1
+            if drawing.value:
+                shape.append(i)
+                xs.append(x.value.signed_integer)
+                ys.append(y.value.signed_integer if y is not None else 0)
+        cycles.append(taken)
+    dut.oe.value = 1
+    return (np.array(shape, np.int64), np.array(xs, np.int64), np.array(ys, np.int64)), np.array(cycles)
+
+def framebuffer(pixels, origin, size):
+    """Count of draws of each pixel in a (height, width) framebuffer with origin (x, y) at [0, 0]."""
+    _, x, y = pixels
+    fb = np.zeros(size, np.int32)
+    np.add.at(fb, (y - origin[1], x - origin[0]), 1)
+    return fb
+
+def _sorted(pixels):
+    shape, x, y = pixels
+    order = np.lexsort((x, y, shape))
+    return shape[order], x[order], y[order]
+
+def check_shapes(dut, inputs, rows, got, want, cycles):
+    """Compare DUT pixels with the reference in a framebuffer and shape by shape, then log throughput."""
+    xs, ys = np.concatenate([got[1], want[1]]), np.concatenate([got[2], want[2]])
+    origin = (int(xs.min(initial=0)), int(ys.min(initial=0)))
+    size = (int(ys.max(initial=0)) - origin[1] + 1, int(xs.max(initial=0)) - origin[0] + 1)
+    diff = np.count_nonzero(framebuffer(got, origin, size) != framebuffer(want, origin, size))
+
+    # shapes whose pixels differ: by count, then pixel by pixel
+    n = len(rows)
+    bad = set(np.flatnonzero(np.bincount(got[0], minlength=n) != np.bincount(want[0], minlength=n)).tolist())
+    if not bad:
+        g, w = _sorted(got), _sorted(want)
+        bad = set(g[0][(g[1] != w[1]) | (g[2] != w[2])].tolist())
+    for i in sorted(bad)[:8]:
+        mine = set(zip(got[1][got[0] == i].tolist(), got[2][got[0] == i].tolist()))
+        ref = set(zip(want[1][want[0] == i].tolist(), want[2][want[0] == i].tolist()))
+        dut._log.error(f'shape {i} {dict(zip(inputs, map(int, rows[i])))}: '
+                       f'{int((got[0] == i).sum())} pixels drawn, model {int((want[0] == i).sum())}; '
+                       f'missing {sorted(ref - mine)[:8]}, extra {sorted(mine - ref)[:8]}')
+    assert not bad and diff == 0, f"{len(bad)} of {n} shapes don't match model ({diff} framebuffer pixels differ)!"
+
+    pixels = len(got[0])
+    dut._log.info(f'{n} shapes, {pixels} pixels in {int(cycles.sum())} cycles: '
+                  f'{cycles.sum() / max(pixels, 1):.2f} cycles/pixel '
+                  f'(shapes take {int(cycles.min())} to {int(cycles.max())} cycles)')
+
+async def draw_check(dut, inputs, rows, model, oe=1.0, **kwargs):
+    """Draw rows of inputs and check them against model(*columns, **kwargs)."""
+    rows = np.asarray(rows, np.int64).reshape(-1, len(inputs))
+    want = model(*rows.T, **kwargs)
+    budgets = budget(np.bincount(want[0], minlength=len(rows)), oe)
+    got, cycles = await draw_shapes(dut, inputs, rows, budgets, oe)
+    check_shapes(dut, inputs, rows, got, want, cycles)
+
+def random_tests(module, name, inputs, shapes, model, **kwargs):
+    """Make a bench's random_1 and oe_1 tests: shapes(n) gives n rows of inputs, and each
+    of kwargs is a function of the DUT giving a model keyword argument (e.g. edges=edges)."""
+    async def random_1(dut):
+        await start_dut(dut)
+        await draw_check(dut, inputs, shapes(SHAPES), model, **{k: f(dut) for k, f in kwargs.items()})
+
+    async def oe_1(dut):
+        await start_dut(dut)
+        await draw_check(dut, inputs, shapes(SHAPES // 4), model, oe=0.5, **{k: f(dut) for k, f in kwargs.items()})
+
+    random_1.__doc__ = f"Test random {name} against the reference rasterizer"
+    oe_1.__doc__ = f"Test random {name} with output enable low half the time"
+    for test in (random_1, oe_1):
+        test.__qualname__, test.__module__ = test.__name__, module  # as if defined in the bench
+    return cocotb.test()(random_1), cocotb.test()(oe_1)
@@ -0,0 +1,22 @@
+## Project F Library - draw_circle Test Bench (cocotb)
+## (C)2023 Will Green, open source software released under the MIT License
+## Learn more at https://projectf.io/verilog-lib/
+
+import cocotb
+
+import raster
+from draw import draw_check, random_circles, random_tests, start_dut
+
+INPUTS = ('x0', 'y0', 'r0')
+
+
+# directed tests: the cases of the Vivado test bench (xc7/draw_circle_tb.sv)
+@cocotb.test()
+async def directed_1(dut):
+    """Test radius 0, 1, and 4, a negative centre, and a large circle"""
+    await start_dut(dut)
+    await draw_check(dut, INPUTS, [(0, 0, 4), (2, 2, 1), (2, 2, 0), (-8, 0, 19), (0, 0, 255)], raster.circle)
+
+
+# random tests: SHAPES circles back-to-back
+random_1, oe_1 = random_tests(__name__, 'circles', INPUTS, random_circles, raster.circle)
@@ -0,0 +1,30 @@
+## Project F Library - draw_line Test Bench (cocotb)
+## (C)2023 Will Green, open source software released under the MIT License
+## Learn more at https://projectf.io/verilog-lib/
+
+import cocotb
+
+import raster
+from draw import draw_check, random_tests, random_vertices, start_dut
+
+INPUTS = ('x0', 'y0', 'x1', 'y1')
+
+
+# directed tests: the cases of the Vivado test bench (xc7/draw_line_tb.sv)
+@cocotb.test()
+async def directed_1(dut):
+    """Test points, lines in each octant both ways, negative coordinates, and long lines"""
+    await start_dut(dut)
+    await draw_check(dut, INPUTS, [
+        (0, 0, 0, 0), (32, 17, 32, 17), (255, 255, 255, 255),  # points
+        (0, 1, 6, 4), (6, 4, 0, 1),  # not steep, down
+        (1, 0, 4, 6), (4, 6, 1, 0),  # steep, down
+        (0, 4, 6, 1), (6, 1, 0, 4),  # not steep, up
+        (4, 0, 1, 6), (1, 6, 4, 0),  # steep, up
+        (-4, 0, -1, -6), (-1, -6, -4, 0),  # negative coordinates
+        (70, 180, 180, 50), (0, 0, 255, 0), (0, 0, 0, 255), (255, 255, 0, 0)],  # long
+        raster.line)
+
+
+# random tests: SHAPES lines back-to-back
+random_1, oe_1 = random_tests(__name__, 'lines', INPUTS, random_vertices(2), raster.line)
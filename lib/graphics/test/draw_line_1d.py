@@ -0,0 +1,26 @@
+## Project F Library - draw_line_1d Test Bench (cocotb)
+## (C)2023 Will Green, open source software released under the MIT License
+## Learn more at https://projectf.io/verilog-lib/
+
+import cocotb
+
+import raster
+from draw import draw_check, random_spans, random_tests, start_dut
+
+INPUTS = ('x0', 'x1')
+
+
+# directed tests: the cases of the Vivado test bench (xc7/draw_line_1d_tb.sv)
+@cocotb.test()
+async def directed_1(dut):
+    """Test points, short lines either side of zero, minimum, and long lines"""
+    await start_dut(dut)
+    await draw_check(dut, INPUTS, [
+        (0, 0), (32, 32), (255, 255),  # points
+        (0, 6), (-6, -1), (-6, 9),  # small
+        (-256, -254), (0, 255)],  # minimum (for CORDW=9) and long
+        raster.line_1d)
+
+
+# random tests: SHAPES lines back-to-back
+random_1, oe_1 = random_tests(__name__, 'lines', INPUTS, random_spans, raster.line_1d)
@@ -0,0 +1,27 @@
+## Project F Library - draw_rectangle_fill Test Bench (cocotb)
+## (C)2023 Will Green, open source software released under the MIT License
+## Learn more at https://projectf.io/verilog-lib/
+
+import cocotb
+
+import raster
+from draw import draw_check, random_tests, random_vertices, start_dut
+
+INPUTS = ('x0', 'y0', 'x1', 'y1')
+
+
+# directed tests: the cases of the Vivado test bench (xc7/draw_rectangle_fill_tb.sv), then degenerate rectangles
+@cocotb.test()
+async def directed_1(dut):
+    """Test rectangles from each corner, points, lines, and negative coordinates"""
+    await start_dut(dut)
+    await draw_check(dut, INPUTS, [
+        (10, 8, 20, 15), (20, 15, 10, 8),
+        (60, 10, 10, 40), (10, 40, 60, 10), (60, 40, 10, 10),  # other corners
+        (5, 5, 5, 5), (0, 0, 20, 0), (0, 20, 0, 0),  # point, horizontal, vertical
+        (-20, -10, -5, -30)],  # negative coordinates
+        raster.rectangle_fill)
+
+
+# random tests: SHAPES rectangles back-to-back
+random_1, oe_1 = random_tests(__name__, 'rectangles', INPUTS, random_vertices(2), raster.rectangle_fill)
@@ -0,0 +1,28 @@
+## Project F Library - draw_triangle Test Bench (cocotb)
+## (C)2023 Will Green, open source software released under the MIT License
+## Learn more at https://projectf.io/verilog-lib/
+
+import cocotb
+
+import raster
+from draw import draw_check, random_tests, random_vertices, start_dut
+
+INPUTS = ('x0', 'y0', 'x1', 'y1', 'x2', 'y2')
+
+
+# directed tests: the cases of the Vivado test bench (xc7/draw_triangle_tb.sv)
+@cocotb.test()
+async def directed_1(dut):
+    """Test small, negative, right-angle, obtuse, and acute triangles"""
+    await start_dut(dut)
+    await draw_check(dut, INPUTS, [
+        (2, 2, 6, 2, 4, 6), (4, 6, 6, 2, 2, 2),  # small
+        (-2, 2, -6, -2, -4, 6),  # negative
+        (10, 10, 10, 40, 60, 40),  # right-angle
+        (10, 10, 20, 40, 60, 40),  # obtuse
+        (30, 10, 10, 40, 60, 40)],  # acute
+        raster.triangle)
+
+
+# random tests: SHAPES triangles back-to-back
+random_1, oe_1 = random_tests(__name__, 'triangles', INPUTS, random_vertices(3), raster.triangle)
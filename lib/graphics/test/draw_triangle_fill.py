@@ -0,0 +1,40 @@
+## Project F Library - draw_triangle_fill Test Bench (cocotb)
+## (C)2023 Will Green, open source software released under the MIT License
+## Learn more at https://projectf.io/verilog-lib/
+
+# Where draw_triangle_fill starts drawing depends on where its edge line cores
+# stopped on the triangle before, so the model is given their positions
+# before each test's first triangle.
+
+import cocotb
+
+import raster
+from draw import draw_check, random_tests, random_vertices, start_dut
+
+INPUTS = ('x0', 'y0', 'x1', 'y1', 'x2', 'y2')
+
+def edges(dut):
+    """Positions of the edge line cores (xa, ya, xb, yb), or None if unknown (X since reset)."""
+    try:
+        return tuple(h.value.signed_integer for h in (
+            dut.draw_edge_a.x, dut.draw_edge_a.y, dut.draw_edge_b.x, dut.draw_edge_b.y))
+    except ValueError:
+        return None
+
+
+# directed tests: the cases of the Vivado test bench (xc7/draw_triangle_fill_tb.sv)
+@cocotb.test()
+async def directed_1(dut):
+    """Test flat top and bottom, negative, steep, and thin triangles"""
+    await start_dut(dut)
+    await draw_check(dut, INPUTS, [
+        (2, 2, 6, 2, 4, 6), (4, 6, 6, 2, 2, 2),  # small: flat top
+        (-2, 2, -6, -2, -4, 6),  # negative
+        (13, 9, 9, 15, 13, 19), (9, 5, 13, 9, 9, 15), (19, 5, 13, 9, 23, 9),  # flat bottom
+        (8, 1, 7, 7, 1, 8), (1, 1, 2, 7, 8, 8),  # steep
+        (1, 3, 6, 2, 3, 4), (1, 2, 6, 3, 3, 4)],  # thin
+        raster.triangle_fill, edges=edges(dut))
+
+
+# random tests: SHAPES triangles back-to-back
+random_1, oe_1 = random_tests(__name__, 'triangles', INPUTS, random_vertices(3), raster.triangle_fill, edges=edges)
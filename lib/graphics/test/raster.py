@@ -0,0 +1,253 @@
+## Project F Library - Graphics Reference Rasterizer (NumPy)
+## (C)2023 Will Green, open source software released under the MIT License
+## Learn more at https://projectf.io/verilog-lib/
+
+# Expected pixels of the drawing cores for whole arrays of shapes at once.
+# Each model steps every shape together with the same rules as the RTL
+# (Bresenham lines and midpoint circles after Alois Zingl, horizontal spans
+# for filled shapes), so a pixel drawn twice by the core is listed twice.
+#
+# Each model returns (shape, x, y): one entry per pixel, shape being the index
+# of its shape in the input arrays. Pixels of a shape are in drawing order.
+
+import copy
+
+import numpy as np
+
+def _ints(*args):
+    return tuple(np.atleast_1d(np.asarray(a, dtype=np.int64)) for a in args)
+
+def _gather(steps):
+    """Join per-step (shape, x, y) arrays, grouping pixels by shape in drawing order."""
+    shape, x, y = (np.concatenate(col) if steps else np.zeros(0, np.int64) for col in zip(*steps))
+    order = np.argsort(shape, kind='stable')
+    return shape[order], x[order], y[order]
+
+def _spans(shape, y, xa, xb):
+    """Pixels of horizontal spans from xa to xb inclusive, drawn left to right."""
+    n = xb - xa + 1
+    first = np.repeat(np.cumsum(n) - n, n)
+    x = np.repeat(xa, n) + np.arange(n.sum()) - first
+    return np.repeat(shape, n), x, np.repeat(y, n)
+
+def line(x0, y0, x1, y1):
+    """draw_line.sv: swap so y increases, then step x and/or y on the error term."""
+    x0, y0, x1, y1 = _ints(x0, y0, x1, y1)
+    swap = y0 > y1
+    xa, ya = np.where(swap, x1, x0), np.where(swap, y1, y0)
+    xb, yb = np.where(swap, x0, x1), np.where(swap, y0, y1)
+    step = np.where(xa < xb, 1, -1)
+    dx, dy = np.abs(xb - xa), ya - yb  # dy = -abs(yb - ya)
+    err, x, y = dx + dy, xa, ya
+    count = np.maximum(dx, -dy) + 1  # one pixel per step on the major axis
+    shapes, steps = np.arange(len(x0)), []
+    for i in range(int(count.max(initial=0))):
+        live = i < count
+        steps.append((shapes[live], x[live], y[live]))
+        movx, movy = 2*err >= dy, 2*err <= dx
+        x = x + movx * step
+        y = y + movy
+        err = err + movx * dy + movy * dx
+    return _gather(steps)
+
+def line_1d(x0, x1):
+    """draw_line_1d.sv: x0 to x1 (x1 >= x0) with y = 0."""
+    x0, x1 = _ints(x0, x1)
+    return _spans(np.arange(len(x0)), np.zeros_like(x0), x0, x1)
+
+def _circle_steps(r0):
+    """Midpoint circle iterations: list of (live, xa, ya) with xa <= 0 and ya >= 0."""
+    xa, ya, err = -r0, np.zeros_like(r0), 2 - 2*r0
+    live, steps = np.ones(len(r0), bool), []
+    while live.any():
+        steps.append((live, xa, ya))
+        live = live & (xa != 0)  # the RTL draws the xa == 0 points too, then stops
+        err_tmp = err
+        movy = err <= ya  # CALC_Y
+        err = err + movy * (2*ya + 3)
+        ya = ya + movy
+        movx = (err_tmp > xa) | (err > ya)  # CALC_X, with the new ya and err
+        err = err + movx * (2*xa + 3)
+        xa = xa + movx
+    return steps
+
+def circle(x0, y0, r0):
+    """draw_circle.sv: four points, one per quadrant, on each midpoint step."""
+    x0, y0, r0 = _ints(x0, y0, r0)
+    shapes, steps = np.arange(len(x0)), []
+    for live, xa, ya in _circle_steps(r0):
+        for x, y in ((x0-xa, y0+ya), (x0+xa, y0+ya), (x0+xa, y0-ya), (x0-xa, y0-ya)):
+            steps.append((shapes[live], x[live], y[live]))
+    return _gather(steps)
+
+def circle_fill(x0, y0, r0):
+    """draw_circle_fill.sv: spans below then above the centre on each midpoint step."""
+    x0, y0, r0 = _ints(x0, y0, r0)
+    shapes, steps = np.arange(len(x0)), []
+    for live, xa, ya in _circle_steps(r0):
+        for y in (y0+ya, y0-ya):
+            steps.append(_spans(shapes[live], y[live], (x0+xa)[live], (x0-xa)[live]))
+    return _gather(steps)
+
+def rectangle(x0, y0, x1, y1):
+    """draw_rectangle.sv: four lines clockwise from (x0,y0); corners are drawn twice."""
+    x0, y0, x1, y1 = _ints(x0, y0, x1, y1)
+    sides = [(x0, y0, x1, y0), (x1, y0, x1, y1), (x1, y1, x0, y1), (x0, y1, x0, y0)]
+    return _gather([line(*side) for side in sides])
+
+def rectangle_fill(x0, y0, x1, y1):
+    """draw_rectangle_fill.sv: a span per row, top to bottom."""
+    x0, y0, x1, y1 = _ints(x0, y0, x1, y1)
+    rows = np.abs(y1 - y0) + 1
+    shape = np.repeat(np.arange(len(x0)), rows)
+    y = np.repeat(np.minimum(y0, y1), rows) + np.arange(rows.sum()) - np.repeat(np.cumsum(rows) - rows, rows)
+    return _spans(shape, y, np.repeat(np.minimum(x0, x1), rows), np.repeat(np.maximum(x0, x1), rows))
+
+def triangle(x0, y0, x1, y1, x2, y2):
+    """draw_triangle.sv: lines 0-1, 1-2, and 2-0; vertices are drawn twice."""
+    x0, y0, x1, y1, x2, y2 = _ints(x0, y0, x1, y1, x2, y2)
+    return _gather([line(x0, y0, x1, y1), line(x1, y1, x2, y2), line(x2, y2, x0, y0)])
+
+
+# draw_triangle_fill.sv depends on the timing of its three line cores: it draws
+# each span once both edges have left a row, from where they entered it, and
+# its first check reads the edges' positions before they load new ones. So it's
+# modelled cycle by cycle, with every triangle stepped at once.
+
+class _Line:
+    """Registers of draw_line.sv for each shape."""
+    IDLE, INIT_0, INIT_1, DRAW = range(4)
+
+    def __init__(self, n, x=None, y=None):
+        z = np.zeros(n, np.int64)
+        self.state, self.right, self.dx, self.dy, self.err = z, z, z, z, z
+        self.x = z if x is None else x
+        self.y = z if y is None else y
+        self.x_end, self.y_end, self.busy = z, z, np.zeros(n, bool)
+
+    def step(self, start, oe, x0, y0, x1, y1):
+        """Registers after the next clock edge."""
+        swap = y0 > y1
+        xa, ya = np.where(swap, x1, x0), np.where(swap, y1, y0)
+        xb, yb = np.where(swap, x0, x1), np.where(swap, y0, y1)
+        s, n = self.state, copy.copy(self)
+
+        go = (s == self.IDLE) & start
+        n.state = np.where(go, self.INIT_0, s)
+        n.right = np.where(go, xa < xb, self.right)
+        n.busy = self.busy | go
+
+        init0 = s == self.INIT_0
+        n.state = np.where(init0, self.INIT_1, n.state)
+        n.dx = np.where(init0, np.where(self.right, xb - xa, xa - xb), self.dx)
+        n.dy = np.where(init0, ya - yb, self.dy)
+
+        init1 = s == self.INIT_1
+        n.state = np.where(init1, self.DRAW, n.state)
+        n.err = np.where(init1, self.dx + self.dy, self.err)
+        n.x, n.y = np.where(init1, xa, self.x), np.where(init1, ya, self.y)
+        n.x_end, n.y_end = np.where(init1, xb, self.x_end), np.where(init1, yb, self.y_end)
+
+        draw = (s == self.DRAW) & oe
+        end = draw & (self.x == self.x_end) & (self.y == self.y_end)
+        n.state = np.where(end, self.IDLE, n.state)
+        n.busy = n.busy & ~end
+        movx = draw & ~end & (2*self.err >= self.dy)
+        movy = draw & ~end & (2*self.err <= self.dx)
+        n.x = n.x + movx * np.where(self.right, 1, -1)
+        n.y = n.y + movy
+        n.err = np.where(draw & ~end, self.err + movx * self.dy + movy * self.dx, n.err)
+        return n
+
+def triangle_fill(x0, y0, x1, y1, x2, y2, edges=None):
+    """draw_triangle_fill.sv: spans between edge a (vertex 0 to 2) and edge b (0 to 1, then 1 to 2).
+
+    edges is the (x, y) of the edge cores before the first triangle, as
+    (xa, ya, xb, yb), or None if unknown; later triangles start where the
+    one before left them."""
+    x0, y0, x1, y1, x2, y2 = _ints(x0, y0, x1, y1, x2, y2)
+    n = len(x0)
+    (SORT_0, SORT_1, SORT_2, INIT_A, INIT_B0, INIT_B1, START_A, START_B,
+        START_H, EDGE, H_LINE, DONE, IDLE) = range(13)
+
+    # sorted vertices, as the three SORT states leave them
+    swap = y0 > y2
+    x0s, y0s, x2s, y2s = (np.where(swap, p, q) for p, q in ((x2, x0), (y2, y0), (x0, x2), (y0, y2)))
+    swap = y0s > y1
+    x0s, y0s, x1s, y1s = np.where(swap, x1, x0s), np.where(swap, y1, y0s), np.where(swap, x0s, x1), np.where(swap, y0s, y1)
+    swap = y1s > y2s
+    x1s, y1s, x2s, y2s = np.where(swap, x2s, x1s), np.where(swap, y2s, y1s), np.where(swap, x1s, x2s), np.where(swap, y1s, y2s)
+
+    # edges stop at their last vertex: edge b at vertex 1 if there was no second b edge
+    xa0, ya0 = np.roll(x2s, 1), np.roll(y2s, 1)
+    last_b = y1s < y2s
+    xb0, yb0 = np.roll(np.where(last_b, x2s, x1s), 1), np.roll(np.where(last_b, y2s, y1s), 1)
+    unknown = np.zeros(n, bool)
+    if edges is None:
+        unknown[:1] = True  # X in simulation: compares are false until the edges load
+    elif n:
+        xa0[0], ya0[0], xb0[0], yb0[0] = edges
+    a, b = _Line(n, xa0, ya0), _Line(n, xb0, yb0)
+    unknown_a, unknown_b = unknown.copy(), unknown.copy()
+    h_state, h_x, h_busy = np.zeros(n, bool), np.zeros(n, np.int64), np.zeros(n, bool)
+
+    state = np.full(n, SORT_0)  # SORT states only take their cycles: the vertices are sorted above
+    x0a = y0a = x1a = y1a = x0b = y0b = x1b = y1b = x0h = x1h = np.zeros(n, np.int64)
+    prev_y = prev_xa = prev_xb = np.zeros(n, np.int64)
+    b_edge = np.zeros(n, bool)
+    shapes, steps = np.arange(n), []
+    while (state != IDLE).any():
+        # pixel out: the h-line draws (xh, prev_y), registered to the outputs on this edge
+        steps.append((shapes[h_state], h_x[h_state], prev_y[h_state]))
+
+        a_away = ~unknown_a & (a.y != prev_y) | ~a.busy
+        b_away = ~unknown_b & (b.y != prev_y) | ~b.busy
+        oe_a = (state == EDGE) & ~unknown_a & (a.y == prev_y)
+        oe_b = (state == EDGE) & ~unknown_b & (b.y == prev_y)
+        a_next = a.step(state == START_A, oe_a, x0a, y0a, x1a, y1a)
+        b_next = b.step(state == START_B, oe_b, x0b, y0b, x1b, y1b)
+        unknown_a &= a.state != _Line.INIT_1
+        unknown_b &= b.state != _Line.INIT_1
+
+        # draw_line_1d h-line with oe high
+        h_start = ~h_state & (state == START_H)
+        h_end = h_state & (h_x == x1h)
+        h_x_next = np.where(h_start, x0h, np.where(h_state & ~h_end, h_x + 1, h_x))
+        h_state_next = (h_state & ~h_end) | h_start
+        h_busy_next = (h_busy & ~h_end) | h_start
+
+        nxt = np.where((state == SORT_0) | (state == SORT_1), state + 1, state)
+        nxt = np.where(state == SORT_2, INIT_A, nxt)
+        init_a = state == INIT_A
+        x0a, y0a = np.where(init_a, x0s, x0a), np.where(init_a, y0s, y0a)
+        x1a, y1a = np.where(init_a, x2s, x1a), np.where(init_a, y2s, y1a)
+        prev_xa, prev_xb = np.where(init_a, x0s, prev_xa), np.where(init_a, x0s, prev_xb)
+        nxt = np.where(init_a, INIT_B0, nxt)
+        for init, first, (bx0, by0, bx1, by1), py in (
+                (state == INIT_B0, False, (x0s, y0s, x1s, y1s), y0s),
+                (state == INIT_B1, True, (x1s, y1s, x2s, y2s), y1s)):
+            b_edge = np.where(init, first, b_edge)
+            x0b, y0b = np.where(init, bx0, x0b), np.where(init, by0, y0b)
+            x1b, y1b = np.where(init, bx1, x1b), np.where(init, by1, y1b)
+            prev_y = np.where(init, py, prev_y)
+        nxt = np.where(state == INIT_B0, START_A, nxt)
+        nxt = np.where(state == INIT_B1, START_B, nxt)
+        nxt = np.where(state == START_A, START_B, nxt)
+        nxt = np.where(state == START_B, EDGE, nxt)
+
+        edge = (state == EDGE) & a_away & b_away
+        x0h = np.where(edge, np.minimum(prev_xa, prev_xb), x0h)
+        x1h = np.where(edge, np.maximum(prev_xa, prev_xb), x1h)
+        nxt = np.where(edge, START_H, nxt)
+        nxt = np.where(state == START_H, H_LINE, nxt)
+
+        h_done = (state == H_LINE) & ~h_busy
+        prev_y = np.where(h_done, b.y, prev_y)
+        prev_xa, prev_xb = np.where(h_done, a.x, prev_xa), np.where(h_done, b.x, prev_xb)
+        last = np.where(a.busy & ~b_edge, INIT_B1, DONE)
+        nxt = np.where(h_done, np.where(b.busy, EDGE, last), nxt)
+        nxt = np.where(state == DONE, IDLE, nxt)
+
+        state, a, b = nxt, a_next, b_next
+        h_state, h_x, h_busy = h_state_next, h_x_next, h_busy_next
+    return _gather(steps)
@@ -83,7 +83,7 @@ module div #(
             end
             SIGN: begin  // adjust quotient sign if non-zero and input signs differ
                 state <= IDLE;
-                if (quo != 0) val <= (sig_diff) ? {1'b1, -quo} : {1'b0, quo};
+                val <= (sig_diff && quo != 0) ? {1'b1, -quo} : {1'b0, quo};
                 busy <= 0;
                 done <= 1;
                 valid <= 1;
@@ -125,12 +125,4 @@ module div #(
             val <= 0;
         end
     end
-
-    // generate waveform file with cocotb
-    `ifdef COCOTB_SIM
-    initial begin
-        $dumpfile($sformatf("%m.vcd"));
-        $dumpvars;
-    end
-    `endif
 endmodule
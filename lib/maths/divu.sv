@@ -84,12 +84,4 @@ module divu #(
             val <= 0;
         end
     end
-
-    // generate waveform file with cocotb
-    `ifdef COCOTB_SIM
-    initial begin
-        $dumpfile($sformatf("%m.vcd"));
-        $dumpvars;
-    end
-    `endif
 endmodule
@@ -72,12 +72,4 @@ module divu_int #(parameter WIDTH=5) ( // width of numbers in bits
             rem <= 0;
         end
     end
-
-    // generate waveform file with cocotb
-    `ifdef COCOTB_SIM
-    initial begin
-        $dumpfile($sformatf("%m.vcd"));
-        $dumpvars;
-    end
-    `endif
 endmodule
@@ -23,20 +23,23 @@ module mul #(
 
     // for selecting result
     localparam IBITS = WIDTH - FBITS;
-    localparam MSB = 2*WIDTH - IBITS - 1;
     localparam LSB = WIDTH - IBITS;
+    localparam TBITS = 2*WIDTH - LSB;  // truncated product width (including overflow bits)
 
     // for rounding
     localparam HALF = {1'b1, {FBITS-1{1'b0}}};
 
-    logic sig_diff;  // signs difference of inputs
     logic signed [WIDTH-1:0] a1, b1;  // copy of inputs
-    logic signed [WIDTH-1:0] prod_t;  // unrounded, truncated product
+    logic signed [TBITS-1:0] prod_t;  // unrounded, truncated product
+    logic signed [TBITS-1:0] prod_r;  // rounded, truncated product
     logic signed [2*WIDTH-1:0] prod;  // full product
     logic [FBITS-1:0] rbits;          // rounding bits
     logic round;  // rounding required
     logic even;   // even number
 
+    // Gaussian rounding
+    always_comb prod_r = (round && !(even && rbits == HALF)) ? prod_t + 1 : prod_t;
+
     // calculation state machine
     enum {IDLE, CALC, TRUNC, ROUND} state;
     always_ff @(posedge clk) begin
@@ -47,9 +50,9 @@ module mul #(
                 prod <= a1 * b1;
             end
             TRUNC: begin
-                // need to check for overflow (need to look at MSB)
+                // keep bits above result to check for overflow after rounding
                 state <= ROUND;
-                prod_t <= prod[MSB:LSB];
+                prod_t <= prod[2*WIDTH-1:LSB];
                 rbits  <= prod[FBITS-1:0];
                 round  <= prod[FBITS-1+:1];
                 even  <= ~prod[FBITS+:1];
@@ -59,13 +62,10 @@ module mul #(
                 busy <= 0;
                 done <= 1;
 
-                // Gaussian rounding
-                val <= (round && !(even && rbits == HALF)) ? prod_t + 1 : prod_t;
+                val <= prod_r[WIDTH-1:0];
 
-                // overflow
-                if (sig_diff == prod_t[WIDTH-1+:1] &&  // compare input and answer sign
-                    (prod[2*WIDTH-1:MSB+1] == '0 || prod[2*WIDTH-1:MSB+1] == '1)  // overflow bits
-                ) begin
+                // overflow: bits above result sign must match it
+                if (prod_r[TBITS-1:WIDTH-1] == '0 || prod_r[TBITS-1:WIDTH-1] == '1) begin
                     valid <= 1;
                     ovf <= 0;
                 end else begin
@@ -78,7 +78,6 @@ module mul #(
                     state <= CALC;
                     a1 <= a;  // register input a
                     b1 <= b;  // register input b
-                    sig_diff <= (a[WIDTH-1+:1] ^ b[WIDTH-1+:1]);  // register input sign difference
                     busy <= 1;
                     ovf <= 0;
                 end
@@ -93,12 +92,4 @@ module mul #(
             val <= 0;
         end
     end
-
-    // generate waveform file with cocotb
-    `ifdef COCOTB_SIM
-    initial begin
-        $dumpfile($sformatf("%m.vcd"));
-        $dumpvars;
-    end
-    `endif
 endmodule
@@ -0,0 +1,111 @@
+## Project F Library - Maths Test Bench Helpers (cocotb)
+## (C)2023 Will Green, open source software released under the MIT License
+## Learn more at https://projectf.io/verilog-lib/
+
+# Shared by the maths benches: the environment variables they read, module
+# parameters and latency budgets, a fixture that starts the clock and resets
+# the DUT, and a driver for the start/done handshake (start/valid for sqrt and
+# sqrt_int, which have no done).
+#
+# Rather than waking on every clock edge to poll done, the driver sleeps until
+# done rises, with a timer as the watchdog, then takes the clock edge that
+# samples it. An operation costs the same few Python wake-ups however many
+# cycles it takes. Latency is worked out from simulation time, so it is the
+# same count as polling gave: cycles from the edge that samples start to the
+# edge that sees done, including both.
+
+import os
+
+import cocotb
+from cocotb.clock import Clock
+from cocotb.triggers import First, RisingEdge, Timer
+from cocotb.utils import get_sim_time
+
+CLK_PS = 1000  # clock period in ps
+
+STREAM_OPS = int(os.environ.get('STREAM_OPS', 10000))  # operations per streaming test
+SWEEP = os.environ.get('SWEEP') == '1'  # exhaustive operand sweep (slow)
+SHARD = int(os.environ.get('SHARD', 0))    # run this shard of the sweep...
+SHARDS = int(os.environ.get('SHARDS', 1))  # ...out of this many
+COVER_HITS = int(os.environ.get('COVER_HITS', 20))  # hits needed in each coverage bin
+
+BUDGETS = {  # core: latency budget from (WIDTH, FBITS), plus a cycle to see 'done' or 'valid'
+    'div': lambda w, f: (w-1 + f) + 5,  # ITER (WIDTHU + FBITS) iterations, IDLE, INIT, ROUND and SIGN
+    'divu': lambda w, f: (w + f) + 2,  # ITER (WIDTH + FBITS) iterations and the start cycle
+    'divu_int': lambda w, f: w + 2,  # WIDTH iterations and the start cycle
+    'mul': lambda w, f: 4 + 1,  # IDLE, CALC, TRUNC and ROUND states
+    'sqrt': lambda w, f: (w + f) // 2 + 2,  # ITER ((WIDTH+FBITS)/2) iterations and the start cycle
+    'sqrt_int': lambda w, f: w // 2 + 2,  # ITER (WIDTH/2) iterations and the start cycle
+}
+
+# directed tests use values chosen for the Makefile PARAMS; stream and sweep work with any
+def params(dut):
+    """Read module parameters from the DUT: (WIDTH, FBITS), with FBITS 0 for integer cores."""
+    return int(dut.WIDTH.value), int(dut.FBITS.value) if hasattr(dut, 'FBITS') else 0
+
+def max_cycles(dut):
+    """Latency budget of the DUT at its parameters (see BUDGETS)."""
+    return BUDGETS[dut._name](*params(dut))
+
+async def reset_dut(dut):
+    await RisingEdge(dut.clk)
+    dut.rst.value = 0
+    await RisingEdge(dut.clk)
+    dut.rst.value = 1
+    await RisingEdge(dut.clk)
+    dut.rst.value = 0
+    await RisingEdge(dut.clk)
+
+async def start_dut(dut, reset=True):
+    """Start the clock and reset the DUT (if it has a reset)."""
+    cocotb.start_soon(Clock(dut.clk, CLK_PS, units="ps").start())
+    if reset:
+        await reset_dut(dut)
+
+async def _wait_rise(dut, signal, budget):
+    """Sleep until signal rises, then until the clock edge that samples it: return latency in cycles."""
+    start = get_sim_time('ps')  # edge that sampled start
+    watchdog = Timer((2*budget - 3) * CLK_PS // 2, 'ps')  # between the last edges it may rise on and after
+    fired = await First(RisingEdge(getattr(dut, signal)), watchdog)
+    assert fired is not watchdog, f"watchdog: no '{signal}' within {budget} cycles!"
+    await RisingEdge(dut.clk)
+    return (get_sim_time('ps') - start) // CLK_PS + 1
+
+async def wait_done(dut, budget):
+    """Wait for 'done' after the start edge: return latency in cycles, failing if it exceeds budget."""
+    assert dut.done.value == 0, "done is not 0 on the start edge!"  # else its rise would be missed
+    return await _wait_rise(dut, 'done', budget)
+
+async def wait_valid(dut, budget):
+    """Wait for 'valid' on cores without 'done': return latency in cycles, failing if it exceeds budget."""
+    return await _wait_rise(dut, 'valid', budget)  # start clears valid, so it rises again with the result
+
+async def check_done(dut, **flags):
+    """Check output signals on 'done' and flags (e.g. dbz=1), then that 'done' is high for one tick."""
+    assert dut.busy.value == 0, "busy is not 0!"
+    assert dut.done.value == 1, "done is not 1!"
+    for name, value in flags.items():
+        assert getattr(dut, name).value == value, f"{name} is not {value}!"
+
+    await RisingEdge(dut.clk)
+    assert dut.done.value == 0, "done is not 0!"
+
+class Driver:
+    """Drives one operation at a time: inputs and a start pulse, then waits for the result."""
+
+    def __init__(self, dut, budget, inputs=('a', 'b')):
+        self.dut, self.budget = dut, budget
+        self.ports = [getattr(dut, name) for name in inputs]
+        self.wait = wait_done if hasattr(dut, 'done') else wait_valid
+
+    async def run(self, *operands):
+        """Start an operation on raw operands and wait for it to complete: return its latency."""
+        for port, x in zip(self.ports, operands):
+            port.value = x
+        self.dut.start.value = 1
+
+        await RisingEdge(self.dut.clk)
+        self.dut.start.value = 0
+
+        # wait for calculation to complete
+        return await self.wait(self.dut, self.budget)
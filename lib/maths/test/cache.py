@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+## Project F Library - Maths Regression Cache
+## (C)2023 Will Green, open source software released under the MIT License
+## Learn more at https://projectf.io/verilog-lib/
+
+# Skips test bench runs whose inputs haven't changed since they last passed.
+# The key is a hash of everything a run depends on: the Verilog sources and
+# test Makefile, the bench module and the local modules it imports, module
+# parameters, the environment variables the bench reads, and the simulator,
+# cocotb, NumPy, and Python versions. Passing results files are kept in
+# CACHE_DIR by key; a run with a known key copies its results file back
+# instead of simulating. Failed runs are never cached; a failed operation is
+# replayed with waveforms (see waves.py).
+#
+# Only runs that can't draw a new random seed are cached: those with
+# RANDOM_SEED set, or whose TESTCASE names only FIXED_TESTS. Otherwise a
+# passing stream, cover, or random test would be replayed with its old seed.
+#
+#   RANDOM_SEED=1 python3 cache.py div  # run the div bench unless it's unchanged
+#   python3 cache.py div                # always run (new random seed)
+
+import ast
+import functools
+import hashlib
+import os
+import platform
+import re
+import shutil
+import subprocess
+import sys
+import xml.etree.ElementTree as ET
+from importlib import metadata
+
+import waves
+
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE = os.environ.get('CACHE') != '0'  # set CACHE=0 to always run
+CACHE_DIR = os.environ.get('CACHE_DIR', os.path.join(TEST_DIR, '.cache'))  # kept by make clean
+ENV_ALWAYS = ('TESTCASE', 'RANDOM_SEED', 'COMPILE_ARGS', 'EXTRA_ARGS', 'SIM_ARGS', 'PLUSARGS')
+FIXED_TESTS = ('sweep_1',)  # tests that draw no random numbers
+
+def _read(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+def verilog_sources(bench):
+    """Verilog sources listed in a bench's test Makefile."""
+    text = _read(os.path.join(TEST_DIR, f'{bench}.mk')).decode()
+    dut = re.search(r'^DUT\s*=\s*(\S+)', text, re.M).group(1)
+    sources = []
+    for line in re.findall(r'^VERILOG_SOURCES\s*\+?=\s*(.*)$', text, re.M):
+        for word in line.split():
+            word = word.replace('$(PWD)', TEST_DIR).replace('${DUT}', dut).replace('$(DUT)', dut)
+            sources.append(os.path.normpath(word))
+    return sources
+
+def local_modules(module):
+    """A bench module and the local modules it imports, directly or not."""
+    todo, seen = [module], []
+    while todo:
+        name = todo.pop()
+        path = os.path.join(TEST_DIR, f'{name}.py')
+        if name in seen or not os.path.exists(path):
+            continue
+        seen.append(name)
+        for node in ast.walk(ast.parse(_read(path))):
+            if isinstance(node, ast.Import):
+                todo += [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom) and node.module:
+                todo.append(node.module)
+    return sorted(seen)
+
+@functools.lru_cache(maxsize=None)
+def tool_versions(sim):
+    """Simulator, cocotb, NumPy, and Python versions."""
+    cmd = ['verilator', '--version'] if sim == 'verilator' else ['iverilog', '-V']
+    try:
+        proc = subprocess.run(cmd, capture_output=True, text=True)
+        simulator = (proc.stdout or proc.stderr).splitlines()[0]
+    except (OSError, IndexError):
+        simulator = 'missing'
+    versions = [simulator, platform.python_version()]
+    for package in ('cocotb', 'numpy'):
+        try:
+            versions.append(f'{package} {metadata.version(package)}')
+        except metadata.PackageNotFoundError:
+            versions.append(f'{package} missing')
+    return tuple(versions)
+
+def fixed(env):
+    """True if a run repeats exactly: RANDOM_SEED is set or TESTCASE names only FIXED_TESTS."""
+    tests = env.get('TESTCASE', '')
+    return bool(env.get('RANDOM_SEED')) or bool(tests) and set(tests.split(',')) <= set(FIXED_TESTS)
+
+def key(bench, sim, params=None, env=None):
+    """Hash of the inputs of one bench run (None if it draws a new seed): params overrides the Makefile PARAMS."""
+    env = {**os.environ, **(env or {})}
+    if not fixed(env):
+        return None
+    h = hashlib.sha256()
+    def add(label, data):
+        h.update(f'{label}:{len(data)}:'.encode())
+        h.update(data)
+
+    files = [os.path.join(TEST_DIR, name) for name in (f'{bench}.mk', os.path.join('..', '..', 'params.mk'))]
+    text = b''.join(_read(f) for f in files).decode()
+    files += [os.path.join(TEST_DIR, name) for name in sorted(set(re.findall(r'\b(\w+\.py)\b', text)))]
+    files += verilog_sources(bench)
+    modules = local_modules(bench)
+    files += [os.path.join(TEST_DIR, f'{name}.py') for name in modules]
+    names = set(ENV_ALWAYS)
+    for path in sorted(set(files)):
+        data = _read(path)
+        add(os.path.relpath(path, TEST_DIR), data)
+        if path.endswith('.py'):  # environment variables the bench reads
+            names.update(re.findall(r"os\.environ\.get\('(\w+)'", data.decode()))
+
+    add('sim', sim.encode())
+    add('params', (params or '').encode())
+    for name in sorted(names):
+        add(f'env {name}', env.get(name, '').encode())
+    for version in tool_versions(sim):
+        add('version', version.encode())
+    return h.hexdigest()[:24]
+
+def passed(path):
+    """True if a cocotb results file exists and has tests, none failed."""
+    try:
+        root = ET.parse(path).getroot()
+    except (OSError, ET.ParseError):
+        return False
+    cases = list(root.iter('testcase'))
+    return bool(cases) and not any(case.find('failure') is not None or case.find('error') is not None
+                                   for case in cases)
+
+def lookup(k, results):
+    """Copy the cached results file for key k to results: True on a hit."""
+    if not CACHE or k is None:
+        return False
+    cached = os.path.join(CACHE_DIR, f'{k}.xml')
+    if not os.path.exists(cached):
+        return False
+    shutil.copyfile(cached, results)
+    return True
+
+def store(k, results):
+    """Keep a passing results file under key k."""
+    if CACHE and k is not None and passed(results):
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        shutil.copyfile(results, os.path.join(CACHE_DIR, f'{k}.xml'))
+
+def main():
+    if len(sys.argv) < 2:
+        print('usage: python3 cache.py BENCH [VAR=VALUE ...]', file=sys.stderr)
+        return 2
+    bench, args = sys.argv[1], sys.argv[2:]
+    overrides = dict(arg.split('=', 1) for arg in args if '=' in arg)  # make variables
+    params = overrides.pop('PARAMS', None)
+    sim = overrides.get('SIM', os.environ.get('SIM', 'icarus'))
+    results = overrides.get('COCOTB_RESULTS_FILE', f'results_{bench}.xml')
+    k = key(bench, sim, params, overrides)
+    if lookup(k, results):
+        print(f'{bench}: inputs unchanged since it passed, reusing {results} (set CACHE=0 to run)')
+        return 0
+    if os.path.exists(results):
+        os.remove(results)  # a failed build mustn't leave old results to be cached
+    name = waves.run_name(results)
+    if os.path.exists(waves.report_path(name)):
+        os.remove(waves.report_path(name))  # failures of an earlier run
+    proc = subprocess.run(['make', '-f', f'{bench}.mk', *args])
+    if proc.returncode == 0:
+        store(k, results)
+    waves.capture(name, bench, sim, args)  # replay a failed operation with waveforms
+    return proc.returncode
+
+if __name__ == '__main__':
+    sys.exit(main())
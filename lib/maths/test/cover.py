@@ -0,0 +1,255 @@
+## Project F Library - Constrained-Random Stimulus with Coverage (NumPy)
+## (C)2023 Will Green, open source software released under the MIT License
+## Learn more at https://projectf.io/verilog-lib/
+
+# Seeded random operands for div and mul, aimed at the same categories as the
+# directed tests: simple (exact), sign, rounding including ties, min, max,
+# nonbin, dbz, and overflow. Each category is a coverage bin, decided from the
+# operands and golden model results. Batches are generated for whichever bins
+# are short of hits; an operation is kept only if it hits such a bin, and
+# generation stops once every bin has been hit the requested number of times.
+#
+# Operands are raw fixed-point integers for WIDTH up to 32.
+
+import numpy as np
+
+import model
+
+EXHAUST_WIDTH = 8  # widest operands to enumerate when checking a bin is unreachable
+
+def _signed(rng, mag):
+    """Give each magnitude a random sign."""
+    return np.where(rng.integers(0, 2, len(mag)) == 1, -mag, mag)
+
+def _none():
+    """No operands: only for a bin no operands can reach with these parameters."""
+    return np.zeros(0, np.int64), np.zeros(0, np.int64)
+
+def _uniform(rng, n, width, fbits):
+    lo, hi = -2**(width-1), 2**(width-1)
+    return rng.integers(lo, hi, n), rng.integers(lo, hi, n)
+
+
+# division
+def _div_limit(width, fbits):
+    """Integer quotients from this value up overflow (FBITSW in div.sv)."""
+    return 2**(width-1-max(fbits, 1))
+
+def _div_exact(rng, n, width, fbits):
+    # dividing by a power of two no larger than 2**fbits leaves no remainder
+    a = rng.integers(-2**(width-1)+1, 2**(width-1), n)
+    return a, _signed(rng, 2**rng.integers(0, min(fbits, width-2) + 1, n))
+
+def _div_tie(rng, n, width, fbits):
+    # remainder is exactly half: |b| = g * 2**(fbits+1) and |a| an odd multiple of g
+    top = 2**(width-1) - 1
+    gmax = top >> (fbits+1)
+    if gmax < 1:
+        return _none()
+    g = rng.integers(1, gmax+1, n)
+    odd = 2 * rng.integers(0, (top // g + 1) // 2) + 1
+    return _signed(rng, odd * g), _signed(rng, g * 2**(fbits+1))
+
+def _div_min(rng, n, width, fbits):
+    # |a| small enough that the quotient rounds to at most one LSB
+    bu = rng.integers(1, 2**(width-1), n)
+    return _signed(rng, rng.integers(0, (3*bu >> (fbits+1)) + 1)), _signed(rng, bu)
+
+def _div_quotient(rng, n, width, q):
+    """Operands with integer quotient |a| // |b| == q."""
+    top = 2**(width-1) - 1
+    bmax = top // q if q else top
+    if bmax < 1:
+        return _none()
+    bu = rng.integers(1, bmax+1, n)
+    au = q*bu + rng.integers(0, bu)
+    keep = au <= top
+    return _signed(rng, au[keep]), _signed(rng, bu[keep])
+
+def _div_smallest(rng, n, width, fbits):
+    a, b = _uniform(rng, n, width, fbits)
+    first = rng.integers(0, 2, n) == 1
+    return np.where(first, -2**(width-1), a), np.where(first, b, -2**(width-1))
+
+DIV_GENS = {
+    'simple':     _div_exact,
+    'sign_pp':    _uniform,
+    'sign_pn':    _uniform,
+    'sign_np':    _uniform,
+    'sign_nn':    _uniform,
+    'round_down': _uniform,
+    'round_up':   _uniform,
+    'tie_even':   _div_tie,
+    'tie_odd':    _div_tie,
+    'min':        _div_min,
+    'max':        lambda rng, n, w, f: _div_quotient(rng, n, w, _div_limit(w, f) - 1),
+    'nonbin':     _uniform,
+    'dbz':        lambda rng, n, w, f: (_uniform(rng, n, w, f)[0], np.zeros(n, np.int64)),
+    'ovf':        lambda rng, n, w, f: _div_quotient(rng, n, w, _div_limit(w, f)),
+    'ovf_smallest': _div_smallest,
+}
+
+def div_bins(a, b, width, fbits):
+    """Coverage bins hit by each div operation: {bin: bool array}."""
+    a, b = np.asarray(a, np.int64), np.asarray(b, np.int64)
+    val, dbz, ovf = model.div(a, b, width, fbits)
+    valid = (dbz == 0) & (ovf == 0)
+    smallest = (a == -2**(width-1)) | (b == -2**(width-1))
+    au, bu = np.abs(a), np.where(b == 0, 1, np.abs(b))
+    quo, rem = au * 2**fbits // bu, au * 2**fbits % bu
+    lim = _div_limit(width, fbits)
+    return {
+        'simple':     valid & (rem == 0),
+        'sign_pp':    valid & (a > 0) & (b > 0),
+        'sign_pn':    valid & (a > 0) & (b < 0),
+        'sign_np':    valid & (a < 0) & (b > 0),
+        'sign_nn':    valid & (a < 0) & (b < 0),
+        'round_down': valid & (rem != 0) & (2*rem < bu),
+        'round_up':   valid & (2*rem > bu),
+        'tie_even':   valid & (2*rem == bu) & (quo % 2 == 0),
+        'tie_odd':    valid & (2*rem == bu) & (quo % 2 == 1),
+        'min':        valid & (np.abs(val) <= 1),
+        'max':        valid & (au // bu == lim - 1),  # largest quotients before overflow
+        'nonbin':     valid & (au % (bu // (bu & -bu)) != 0),  # quotient isn't a binary fraction
+        'dbz':        dbz == 1,
+        'ovf':        (ovf == 1) & ~smallest & (au // bu == lim),  # smallest quotients to overflow
+        'ovf_smallest': (ovf == 1) & smallest,
+    }
+
+
+# multiplication
+def _mul_valid(rng, n, width, fbits):
+    # pick |b| so the product can't overflow: uniform operands mostly do at wide WIDTH
+    top = 2**(width-1) - 1
+    au = rng.integers(1, top+1, n)
+    bu = rng.integers(0, np.minimum(top * 2**fbits // au, top) + 1)
+    return _signed(rng, au), _signed(rng, bu)
+
+def _mul_exact(rng, n, width, fbits):
+    # x * 2**i times y * 2**(fbits-i) has no fractional remainder: the result is x*y
+    top = 2**(width-1) - 1
+    i = rng.integers(0, fbits+1, n)
+    x = rng.integers(0, (top >> i) + 1)
+    y = rng.integers(0, np.minimum(top >> (fbits-i), top // np.maximum(x, 1)) + 1)
+    return _signed(rng, x << i), _signed(rng, y << (fbits-i))
+
+def _mul_tie(rng, n, width, fbits):
+    # odd x * 2**i times odd y * 2**(fbits-1-i) leaves exactly half an LSB: the result is x*y/2
+    if fbits < 1:
+        return _none()
+    top = 2**(width-1) - 1
+    i = rng.integers(0, fbits, n)
+    x = 2 * rng.integers(0, ((top >> i) + 1) // 2) + 1
+    y = 2 * rng.integers(0, (np.minimum(top >> (fbits-1-i), 2*top // x) + 1) // 2) + 1
+    return _signed(rng, x << i), _signed(rng, y << (fbits-1-i))
+
+def _mul_round(rng, n, width, fbits):
+    # with one fractional bit, every inexact product is a tie
+    return _mul_valid(rng, n, width, fbits) if fbits > 1 else _none()
+
+def _mul_min(rng, n, width, fbits):
+    # operands small enough that the product rounds to at most one LSB
+    au = rng.integers(1, min(3 * 2**(fbits-1), 2**(width-1) - 1) + 1, n)
+    bmax = np.maximum(3 * 2**(fbits-1) // au, 1)
+    return _signed(rng, au), _signed(rng, rng.integers(1, bmax+1))
+
+def _mul_near(rng, n, width, fbits, t):
+    """Operands with product magnitude close to t (raw result)."""
+    big = 2**(width-1)  # largest magnitude: only the most negative operand has it
+    t = min(max(t, 1), big**2 // 2**fbits)  # |a*b| is at most big**2: the nearest product to larger t
+    amin = -(-t * 2**fbits // big)  # smallest |a| that keeps |b| in range
+    # |a| adds up to |a|/2**(fbits+1) rounding error, so keep it small where we can
+    au = rng.integers(amin, max(amin, min(big, 2**(2*fbits+1))) + 1, n)
+    bu = np.minimum((t * 2**fbits + au // 2) // au, big)
+    return (np.where(au == big, -au, _signed(rng, au)),
+            np.where(bu == big, -bu, _signed(rng, bu)))
+
+MUL_GENS = {
+    'simple':     _mul_exact,
+    'sign_pp':    _mul_valid,
+    'sign_pn':    _mul_valid,
+    'sign_np':    _mul_valid,
+    'sign_nn':    _mul_valid,
+    'round_down': _mul_round,
+    'round_up':   _mul_round,
+    'tie_even':   _mul_tie,
+    'tie_odd':    _mul_tie,
+    'min':        _mul_min,
+    'max':        lambda rng, n, w, f: _mul_near(rng, n, w, f, 2**(w-1) - 1 - int(rng.integers(0, 2**f))),
+    'nonbin':     _mul_valid,
+    'ovf':        lambda rng, n, w, f: _mul_near(rng, n, w, f, 2**(w-1) + int(rng.integers(0, 2**f))),
+}
+
+def mul_bins(a, b, width, fbits):
+    """Coverage bins hit by each mul operation: {bin: bool array}."""
+    a, b = np.asarray(a, np.int64), np.asarray(b, np.int64)
+    _, ovf = model.mul(a, b, width, fbits)
+    valid = ovf == 0
+    quo, rem = a * b // 2**fbits, a * b % 2**fbits
+    r = model._round_even(quo, rem, 2**fbits)  # before overflow check
+    lo, hi, unit = -2**(width-1), 2**(width-1), 2**fbits
+    return {
+        'simple':     valid & (rem == 0),
+        'sign_pp':    valid & (a > 0) & (b > 0),
+        'sign_pn':    valid & (a > 0) & (b < 0),
+        'sign_np':    valid & (a < 0) & (b > 0),
+        'sign_nn':    valid & (a < 0) & (b < 0),
+        'round_down': valid & (rem != 0) & (2*rem < unit),
+        'round_up':   valid & (2*rem > unit),
+        'tie_even':   valid & (2*rem == unit) & (quo % 2 == 0),
+        'tie_odd':    valid & (2*rem == unit) & (quo % 2 == 1),
+        'min':        valid & (a != 0) & (b != 0) & (np.abs(r) <= 1),
+        'max':        valid & ((r >= hi - unit) | (r < lo + unit)),  # within one of the limits
+        'nonbin':     valid & (a % 2 == 1) & (b % 2 == 1),  # every fractional bit used, as for 0.2
+        'ovf':        ~valid & (r < hi + unit) & (r >= lo - unit),  # within one past the limits
+    }
+
+
+def _empty(bins, name, width, fbits):
+    """True unless some operand pair hits the bin: checked exhaustively up to EXHAUST_WIDTH."""
+    if width > EXHAUST_WIDTH:
+        return True  # too many pairs: rely on the generator
+    lo, hi = -2**(width-1), 2**(width-1)
+    a, b = (x.ravel() for x in np.meshgrid(np.arange(lo, hi), np.arange(lo, hi)))
+    return not bins(a, b, width, fbits)[name].any()
+
+def stimulus(gens, bins, width, fbits, hits, seed, batch=256, rounds=1000):
+    """Generate operands until every reachable bin is hit `hits` times.
+
+    Return (a, b, counts, unreachable): operand arrays, hits per bin, and
+    the bins no operands can reach with these parameters."""
+    rng = np.random.default_rng(seed)
+    names = list(gens)
+    counts = np.zeros(len(names), np.int64)
+    unreachable = set()
+    a_out, b_out = [], []
+    for _ in range(rounds):
+        todo = [i for i, name in enumerate(names) if counts[i] < hits and name not in unreachable]
+        if not todo:
+            break
+        for i in todo:
+            a, b = gens[names[i]](rng, batch, width, fbits)
+            if len(a) == 0:
+                assert _empty(bins, names[i], width, fbits), f"bin {names[i]} is reachable, but its generator gave no operands"
+                unreachable.add(names[i])
+                continue
+            hits_by_bin = bins(a, b, width, fbits)
+            hit = np.stack([hits_by_bin[name] for name in names], axis=1)
+            for row, ops in enumerate(hit):  # keep only operations hitting a bin still short
+                if (ops & (counts < hits)).any():
+                    a_out.append(a[row])
+                    b_out.append(b[row])
+                    counts += ops
+    for i, name in enumerate(names):  # never hit: unreachable if no operands can hit it
+        if counts[i] == 0 and width <= EXHAUST_WIDTH and _empty(bins, name, width, fbits):
+            unreachable.add(name)
+    return (np.array(a_out, np.int64), np.array(b_out, np.int64),
+            dict(zip(names, counts.tolist())), sorted(unreachable))
+
+def div_stimulus(width, fbits, hits, seed):
+    """Covering div operands: see stimulus()."""
+    return stimulus(DIV_GENS, div_bins, width, fbits, hits, seed)
+
+def mul_stimulus(width, fbits, hits, seed):
+    """Covering mul operands: see stimulus()."""
+    return stimulus(MUL_GENS, mul_bins, width, fbits, hits, seed)
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+## Project F Library - Maths Cycle-Accurate Models (NumPy)
+## (C)2023 Will Green, open source software released under the MIT License
+## Learn more at https://projectf.io/verilog-lib/
+
+# Register-level models of the maths cores: each loop iteration is one clock
+# edge, updating the same registers as the RTL state machine (accumulator and
+# quotient shifts, ROUND and SIGN states, early overflow exits) for a whole
+# array of operations at once. Every operation starts from IDLE on edge 0.
+#
+# Each model returns its result registers at 'done' (or 'valid' for sqrt) and
+# the latency in cycles as counted by stream.py: from the edge that samples
+# start to the edge where the test bench sees 'done'. Registers the RTL doesn't
+# write during an operation are returned as 0 (their reset value).
+#
+# Run this file to screen parameters against the golden model (model.py)
+# without a simulator:
+#
+#   python3 cycle.py                         # every bench, WIDTH 4 to 8, exhaustive
+#   python3 cycle.py div mul --widths 16 32 --ops 1000000
+
+import argparse
+import sys
+from collections import Counter
+
+import numpy as np
+
+import model
+
+def _mask(n):
+    return 2**n - 1
+
+def _divstep(acc, quo, b, n):
+    """Shift-subtract iteration of the dividers: (acc_next, quo_next), acc n+1 bits and quo n bits."""
+    sub = acc >= b
+    acc = np.where(sub, acc - b, acc) & _mask(n)  # acc - b fits in n bits when it's taken
+    return (acc << 1 | quo >> (n-1)) & _mask(n+1), (quo << 1 | sub) & _mask(n)
+
+def _latency(edge):
+    """Cycles seen by the test bench when done is set on this edge (start is sampled on edge 0)."""
+    return edge + 2
+
+def div(a, b, width, fbits):
+    """div.sv: (val, dbz, ovf, cycles) with val signed."""
+    a, b = model._ints(a, width), model._ints(b, width)
+    n, fbitsw, smallest = width - 1, max(fbits, 1), -2**(width-1)  # WIDTHU, FBITSW, SMALLEST
+    iters = n + fbits
+    val, zero = np.zeros_like(a), np.zeros(a.shape, bool)
+    cycles = np.zeros(a.shape, np.int64)
+
+    # IDLE, edge 0: start sampled, early exits for dbz and the smallest negative number
+    dbz = b == 0
+    ovf = ~dbz & ((a == smallest) | (b == smallest))
+    cycles[dbz | ovf] = _latency(0)
+    busy = ~dbz & ~ovf
+    au, bu = np.abs(a) & _mask(n), np.abs(b) & _mask(n)
+    bu = np.where(busy, bu, 1)  # lanes that exited early keep iterating harmlessly
+    sig_diff = (a < 0) != (b < 0)
+
+    # INIT, edge 1
+    acc, quo = au >> (n-1), au << 1 & _mask(n)
+
+    # CALC, edges 2 to ITER+1: overflow check on the integer bits at i == WIDTHU-1
+    for i in range(iters):
+        acc_next, quo_next = _divstep(acc, quo, bu, n)
+        if i == n-1:
+            exit = busy & (quo_next >> (n-fbitsw) != 0)
+            ovf = ovf | exit
+            cycles[exit] = _latency(2 + i)
+            busy = busy & ~exit
+        acc, quo = acc_next, quo_next
+
+    # ROUND, edge ITER+2: Gaussian rounding on the next quotient bit and the remainder
+    acc_next, quo_next = _divstep(acc, quo, bu, n)
+    up = (quo_next & 1 == 1) & ((quo & 1 == 1) | (acc_next >> 1 != 0))
+    quo = (quo + up) & _mask(n)
+
+    # SIGN, edge ITER+3: done
+    neg = sig_diff & (quo != 0)
+    val = np.where(busy, np.where(neg, -quo, quo), zero)
+    cycles[busy] = _latency(iters + 3)
+    return val, dbz.astype(int), ovf.astype(int), cycles
+
+def divu(a, b, width, fbits):
+    """divu.sv: (val, dbz, ovf, cycles)."""
+    a, b = model._ints(a, width), model._ints(b, width)
+    n, fbitsw = width, max(fbits, 1)
+    iters = n + fbits
+    cycles = np.zeros(a.shape, np.int64)
+    val, ovf = np.zeros_like(a), np.zeros(a.shape, bool)
+
+    # start, edge 0: catch divide by zero
+    dbz = b == 0
+    cycles[dbz] = _latency(0)
+    busy = ~dbz
+    b1 = np.where(busy, b, 1)
+    acc, quo = a >> (n-1), a << 1 & _mask(n)
+
+    # busy, edges 1 to ITER: done takes priority over the overflow check
+    for i in range(iters):
+        acc_next, quo_next = _divstep(acc, quo, b1, n)
+        if i == iters-1:
+            val = np.where(busy, quo_next, val)
+            cycles[busy] = _latency(1 + i)
+        elif i == n-1:
+            exit = busy & (quo_next >> (n-fbitsw) != 0)
+            ovf = ovf | exit
+            cycles[exit] = _latency(1 + i)
+            busy = busy & ~exit
+        acc, quo = acc_next, quo_next
+    return val, dbz.astype(int), ovf.astype(int), cycles
+
+def divu_int(a, b, width):
+    """divu_int.sv: (val, rem, dbz, cycles)."""
+    a, b = model._ints(a, width), model._ints(b, width)
+    n = width
+    cycles = np.zeros(a.shape, np.int64)
+
+    # start, edge 0: catch divide by zero
+    dbz = b == 0
+    cycles[dbz] = _latency(0)
+    busy = ~dbz
+    b1 = np.where(busy, b, 1)
+    acc, quo = a >> (n-1), a << 1 & _mask(n)
+
+    # busy, edges 1 to WIDTH: the last iteration writes the result, undoing the final shift of rem
+    for i in range(n):
+        acc, quo = _divstep(acc, quo, b1, n)
+    cycles[busy] = _latency(n)
+    return np.where(busy, quo, 0), np.where(busy, acc >> 1, 0), dbz.astype(int), cycles
+
+def mul(a, b, width, fbits):
+    """mul.sv: (val, ovf, cycles) with val signed; val holds the wrapped product on overflow."""
+    a, b = model._ints(a, width), model._ints(b, width)
+    half = 2**(fbits-1)  # HALF: needs FBITS >= 1
+
+    # IDLE, edge 0: register inputs; CALC, edge 1: full product
+    prod = a * b
+
+    # TRUNC, edge 2: keep the bits above the result to check for overflow after rounding
+    prod_t = prod >> fbits  # arithmetic shift, as prod[2*WIDTH-1:LSB] is signed
+    rbits = prod & _mask(fbits)
+    rnd = rbits >> (fbits-1) & 1 == 1
+    even = prod_t & 1 == 0
+
+    # ROUND, edge 3: round half to even, done
+    prod_r = prod_t + (rnd & ~(even & (rbits == half)))
+    ovf = (prod_r < -2**(width-1)) | (prod_r >= 2**(width-1))  # bits above the sign don't match it
+    low = prod_r & _mask(width)
+    val = np.where(low >> (width-1) == 1, low - 2**width, low)
+    return val, ovf.astype(int), np.full(a.shape, _latency(3), np.int64)
+
+def sqrt(rad, width, fbits):
+    """sqrt.sv: (root, rem, cycles), with cycles counted to 'valid'."""
+    rad = np.asarray(rad, dtype=np.int64 if width <= 60 else object)
+    n = width
+    iters = (width + fbits) >> 1
+
+    # start, edge 0: {ac, x} <= {0, rad, 2'b0}
+    ac, x, q = rad >> (n-2), rad << 2 & _mask(n), np.zeros_like(rad)
+
+    # busy, edges 1 to ITER: test subtraction sets one root bit and shifts in two radicand bits
+    for _ in range(iters):
+        test_res = (ac - (q << 2 | 1)) & _mask(n+2)
+        keep = test_res >> (n+1) == 0
+        ac = (np.where(keep, test_res, ac) & _mask(n)) << 2 | x >> (n-2)
+        x = x << 2 & _mask(n)
+        q = (q << 1 | keep) & _mask(n)
+    return q, ac >> 2, np.full(rad.shape, _latency(iters), np.int64)
+
+def sqrt_int(rad, width):
+    """sqrt_int.sv: (root, rem, cycles)."""
+    return sqrt(rad, width, 0)
+
+
+# screening: compare the cycle models with the golden model
+SCREENS = {  # bench: (cycle model, golden model, signed operands, operands, uses FBITS, flags)
+    'div':      (div, model.div, True, 2, True, 2),
+    'divu':     (divu, model.divu, False, 2, True, 2),
+    'divu_int': (divu_int, model.divu_int, False, 2, False, 1),
+    'mul':      (mul, model.mul, True, 2, True, 1),
+    'sqrt':     (sqrt, model.sqrt, False, 1, True, 0),
+    'sqrt_int': (sqrt_int, model.sqrt_int, False, 1, False, 0),
+}
+
+def _random(rng, lo, hi, n):
+    """n random integers lo <= x < hi: Python ints (an object array) if they don't fit int64."""
+    if -2**62 <= lo and hi <= 2**62:
+        return rng.integers(lo, hi, n)
+    x = np.zeros(n, object)
+    for _ in range(-(-(hi-lo).bit_length() // 32) + 1):  # a spare word keeps the modulo bias tiny
+        x = x * 2**32 + rng.integers(0, 2**32, n).astype(object)
+    return x % (hi-lo) + lo
+
+def screen(bench, width, fbits, ops, seed=0):
+    """Compare one configuration: (operations, mismatches by output index, latency Counter).
+
+    The first output (val or root) is only compared where the golden model's flags are all 0."""
+    fast, gold, signed, count, fixed, flags = SCREENS[bench]
+    lo, hi = (-2**(width-1), 2**(width-1)) if signed else (0, 2**width)
+    if (hi-lo)**count <= ops:  # exhaustive
+        operands = model.sweep(lo, hi) if count == 2 else (np.arange(lo, hi),)
+    else:
+        rng = np.random.default_rng(seed)
+        operands = tuple(_random(rng, lo, hi, ops) for _ in range(count))
+    params = (width, fbits) if fixed else (width,)
+    *results, cycles = fast(*operands, *params)
+    expect = gold(*operands, *params)
+    valid = np.ones(len(operands[0]), bool)
+    for flag in expect[len(expect)-flags:]:
+        valid &= np.asarray(flag) == 0
+    bad = {}
+    for i, (got, want) in enumerate(zip(results, expect)):
+        diff = np.asarray(got) != np.asarray(want)
+        if i == 0:
+            diff &= valid
+        if diff.any():
+            bad[i] = int(diff.sum())
+    return len(operands[0]), bad, Counter(cycles.tolist())
+
+def main():
+    parser = argparse.ArgumentParser(description='Screen maths parameters with cycle-accurate models.')
+    parser.add_argument('benches', nargs='*', default=list(SCREENS), help='cores to screen')
+    parser.add_argument('--widths', type=int, nargs='+', default=[4, 5, 6, 7, 8], help='WIDTH values')
+    parser.add_argument('--fbits', type=int, nargs='+', help='FBITS values (default: 0 to WIDTH-1)')
+    parser.add_argument('--ops', type=int, default=2**16, help='operations per configuration (exhaustive if fewer)')
+    parser.add_argument('--seed', type=int, default=0, help='random operand seed')
+    args = parser.parse_args()
+
+    failed = 0
+    for bench in args.benches:
+        fixed = SCREENS[bench][4]
+        for width in args.widths:
+            for fbits in ((args.fbits or range(width)) if fixed else [0]):
+                if fbits >= width or (bench == 'mul' and fbits < 1):
+                    continue
+                ops, bad, latency = screen(bench, width, fbits, args.ops, args.seed)
+                name = f'{bench} WIDTH={width}' + (f' FBITS={fbits}' if fixed else '')
+                hist = ', '.join(f'{c} cycles x{k}' for c, k in sorted(latency.items()))
+                unsupported = bench in ('sqrt', 'sqrt_int') and (width + fbits) % 2  # radicand bits in pairs
+                status = f'MISMATCH {bad}' if bad else 'match'
+                print(f'{name}: {ops} ops, {status}' + (' (unsupported)' if unsupported else '') + f'; {hist}')
+                failed += bool(bad) and not unsupported
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -2,68 +2,50 @@
 ## (C)2023 Will Green, open source software released under the MIT License
 ## Learn more at https://projectf.io/verilog-lib/
 
-import cocotb
-from cocotb.clock import Clock
-from cocotb.triggers import RisingEdge, Timer
-
-from FixedPoint import FXfamily, FXnum
+import random
 
-WIDTH=9  # must match Makefile
-FBITS=4  # must match Makefile
-fp_family = FXfamily(n_bits=FBITS, n_intbits=WIDTH-FBITS+1)  # need +1 because n_intbits includes sign
+import cocotb
 
-async def reset_dut(dut):
-    await RisingEdge(dut.clk)
-    dut.rst.value = 0
-    await RisingEdge(dut.clk)
-    dut.rst.value = 1
-    await RisingEdge(dut.clk)
-    dut.rst.value = 0
-    await RisingEdge(dut.clk)
+from bench import COVER_HITS, Driver, SHARD, SHARDS, STREAM_OPS, SWEEP, check_done, max_cycles, params, start_dut
+import cover
+import model
+from shrink import shrinker
+from stream import stream_model
+import waves
 
-async def test_dut_divide(dut, a, b, log=True):
-    cocotb.start_soon(Clock(dut.clk, 1, units="ns").start())
-    await reset_dut(dut)
+def check_divide(dut, a, b, val, dbz, ovf):
+    assert dut.dbz.value == dbz, f"dbz is not {dbz} for {a}/{b}!"
+    assert dut.ovf.value == ovf, f"ovf is not {ovf} for {a}/{b}!"
+    assert dut.valid.value == (not dbz and not ovf), f"valid is wrong for {a}/{b}!"
+    if (dut.valid.value):
+        assert dut.val.value.signed_integer == val, f"dut val doesn't match model val for {a}/{b}"
 
-    await RisingEdge(dut.clk)
-    dut.a.value = int(a * 2**FBITS)
-    dut.b.value = int(b * 2**FBITS)
-    dut.start.value = 1
+async def test_dut_divide(dut, a, b, log=False):
+    width, fbits = params(dut)
 
-    await RisingEdge(dut.clk)
-    dut.start.value = 0
+    await start_dut(dut)
 
-    # wait for calculation to complete
-    while not dut.done.value:
-        await RisingEdge(dut.clk)
+    a = int(a * 2**fbits)  # scale inputs to raw fixed-point values
+    b = int(b * 2**fbits)
+    await Driver(dut, max_cycles(dut)).run(a, b)
 
-    # model quotient: covert twice to ensure division is handled consistently
-    #                 https://github.com/rwpenney/spfpm/issues/14
-    model_val = fp_family(float(fp_family(a)) / float(fp_family(b)))
+    # model quotient from the raw values driven onto the DUT
+    model_val = int(model.div(a, b, width, fbits)[0])
 
-    # divide dut result by scaling factor
-    val = fp_family(dut.val.value.signed_integer/2**FBITS)
+    val = dut.val.value.signed_integer
 
-    # log numerical signals
-    if (log):
+    # log numerical signals on a mismatch (or always with log=True)
+    if log or val != model_val or not dut.valid.value:
         dut._log.info('dut a:     ' + dut.a.value.binstr)
         dut._log.info('dut b:     ' + dut.b.value.binstr)
         dut._log.info('dut val:   ' + dut.val.value.binstr)
-        dut._log.info('           ' + val.toDecimalString(precision=fp_family.fraction_bits))
-        dut._log.info('model val: ' + model_val.toBinaryString())
-        dut._log.info('           ' + model_val.toDecimalString(precision=fp_family.fraction_bits))
+        dut._log.info('           ' + f'{val/2**fbits:.{fbits}f}')
+        dut._log.info('model val: ' + f'{model_val % 2**width:0{width}b}')
+        dut._log.info('           ' + f'{model_val/2**fbits:.{fbits}f}')
 
     # check output signals on 'done'
-    assert dut.busy.value == 0, "busy is not 0!"
-    assert dut.done.value == 1, "done is not 1!"
-    assert dut.valid.value == 1, "valid is not 1!"
-    assert dut.dbz.value == 0, "dbz is not 0!"
-    assert dut.ovf.value == 0, "ovf is not 0!"
     assert val == model_val, "dut val doesn't match model val"
-
-    # check 'done' is high for one tick
-    await RisingEdge(dut.clk)
-    assert dut.done.value == 0, "done is not 0!"
+    await check_done(dut, valid=1, dbz=0, ovf=0)
 
 
 # simple division tests (no rounding required)
@@ -222,50 +204,124 @@ async def nonbin_3(dut):
     """Test 0.4/0.2"""
     await test_dut_divide(dut=dut, a=0.4, b=0.2)
 
-# test fails - model and DUT choose different sides of true value
-@cocotb.test(expect_fail=True)
+@cocotb.test()
 async def nonbin_4(dut):
     """Test 3.6/0.6"""
     await test_dut_divide(dut=dut, a=3.6, b=0.6)
 
-# test fails - model and DUT choose different sides of true value
-@cocotb.test(expect_fail=True)
+@cocotb.test()
 async def nonbin_5(dut):
     """Test 0.4/0.1"""
     await test_dut_divide(dut=dut, a=0.4, b=0.1)
 
 
+# zero quotients straight after a non-zero result: val mustn't hold the last result
+@cocotb.test()
+async def zero_1(dut):
+    """Test 13/4 then 0/2 [zero after non-zero]"""
+    _, fbits = params(dut)
+
+    await start_dut(dut)
+    driver = Driver(dut, max_cycles(dut))
+
+    await driver.run(int(13 * 2**fbits), int(4 * 2**fbits))
+    await check_done(dut, valid=1, dbz=0, ovf=0)
+    await driver.run(0, int(2 * 2**fbits))
+    assert dut.val.value == 0, "val is not 0!"
+    await check_done(dut, valid=1, dbz=0, ovf=0)
+
+@cocotb.test()
+async def zero_2(dut):
+    """Test -13/4 then 0.0625/-4 [rounds to zero after non-zero, signs differ]"""
+    _, fbits = params(dut)
+
+    await start_dut(dut)
+    driver = Driver(dut, max_cycles(dut))
+
+    await driver.run(int(-13 * 2**fbits), int(4 * 2**fbits))
+    await check_done(dut, valid=1, dbz=0, ovf=0)
+    await driver.run(int(0.0625 * 2**fbits), int(-4 * 2**fbits))
+    assert dut.val.value == 0, "val is not 0!"
+    await check_done(dut, valid=1, dbz=0, ovf=0)
+
+
+# streaming tests: one reset, then operations back-to-back
+@cocotb.test()
+async def stream_1(dut):
+    """Stream random operands"""
+    width, _ = params(dut)
+
+    await start_dut(dut)
+
+    lo, hi = -2**(width-1), 2**(width-1)
+    a = [random.randrange(lo, hi) for _ in range(STREAM_OPS)]
+    b = [random.randrange(lo, hi) for _ in range(STREAM_OPS)]
+    count = await stream_model(dut, (a, b), check_divide, signed=True, shrink=shrinker(dut))
+    dut._log.info(f'streamed {count} operations')
+
+@cocotb.test()
+async def stream_2(dut):
+    """Stream zero quotients after non-zero results"""
+    await start_dut(dut)
+
+    a, b = zip(*[(96, 32), (0, 32), (-96, 32), (1, 32), (-56, 16), (-1, 32), (13, 4), (2, 0), (0, -7)])
+    await stream_model(dut, (a, b), check_divide, signed=True)
+
+
+# constrained random: seeded operands until every coverage bin is hit COVER_HITS times
+@cocotb.test()
+async def cover_1(dut):
+    """Stream constrained-random operands to cover every bin"""
+    width, fbits = params(dut)
+
+    a, b, counts, unreachable = cover.div_stimulus(width, fbits, COVER_HITS, cocotb.RANDOM_SEED)
+
+    await start_dut(dut)
+    count = await stream_model(dut, (a, b), check_divide, signed=True, shrink=shrinker(dut))
+
+    dut._log.info(f'seed {cocotb.RANDOM_SEED}: {count} operations, bins: ' +
+                  ' '.join(f'{name}={n}' for name, n in counts.items()))
+    if unreachable:
+        dut._log.info('bins no operands reach with these parameters: ' + ' '.join(unreachable))
+    short = [name for name, n in counts.items() if n < COVER_HITS and name not in unreachable]
+    assert not short, f"bins hit fewer than {COVER_HITS} times: {' '.join(short)}"
+
+
+# exhaustive sweep: every operand pair, checked against a precomputed table
+@cocotb.test(skip=not SWEEP)
+async def sweep_1(dut):
+    """Sweep every operand pair (or one shard of them)"""
+    width, _ = params(dut)
+
+    a, b = model.sweep(-2**(width-1), 2**(width-1), SHARD, SHARDS)
+
+    await start_dut(dut)
+    count = await stream_model(dut, (a, b), check_divide, signed=True, shrink=shrinker(dut))
+    dut._log.info(f'swept {count} operand pairs')
+
+
+# replay one failed operation from reset, for waveform capture (see waves.py)
+@cocotb.test(skip=not waves.REPLAY)
+async def replay_1(dut):
+    """Replay the raw operands in REPLAY"""
+    a, b = waves.replay()
+
+    await start_dut(dut)
+    await stream_model(dut, ([a], [b]), check_divide, signed=True)
+
+
 # divide by zero and overflow tests
 @cocotb.test()
 async def dbz_1(dut):
     """Test 2/0 [div by zero]"""
-    cocotb.start_soon(Clock(dut.clk, 1, units="ns").start())
-    await reset_dut(dut)
+    _, fbits = params(dut)
+
+    await start_dut(dut)
 
-    await RisingEdge(dut.clk)
     a = 2
     b = 0
-    dut.a.value = int(a * 2**FBITS)
-    dut.b.value = int(b * 2**FBITS)
-    dut.start.value = 1
-
-    await RisingEdge(dut.clk)
-    dut.start.value = 0
-
-    # wait for calculation to complete
-    while not dut.done.value:
-        await RisingEdge(dut.clk)
-
-    # check output signals on 'done'
-    assert dut.busy.value == 0, "busy is not 0!"
-    assert dut.done.value == 1, "done is not 1!"
-    assert dut.valid.value == 0, "valid is not 0!"
-    assert dut.dbz.value == 1, "dbz is not 1!"
-    assert dut.ovf.value == 0, "ovf is not 0!"
-
-    # check 'done' is high for one tick
-    await RisingEdge(dut.clk)
-    assert dut.done.value == 0, "done is not 0!"
+    await Driver(dut, max_cycles(dut)).run(int(a * 2**fbits), int(b * 2**fbits))
+    await check_done(dut, valid=0, dbz=1, ovf=0)
 
 @cocotb.test()
 async def dbz_2(dut):
@@ -275,33 +331,14 @@ async def dbz_2(dut):
 @cocotb.test()
 async def ovf_1(dut):
     """Test 8/0.25 [overflow]"""
-    cocotb.start_soon(Clock(dut.clk, 1, units="ns").start())
-    await reset_dut(dut)
+    _, fbits = params(dut)
+
+    await start_dut(dut)
 
-    await RisingEdge(dut.clk)
     a = 8
     b = 0.25
-    dut.a.value = int(a * 2**FBITS)
-    dut.b.value = int(b * 2**FBITS)
-    dut.start.value = 1
-
-    await RisingEdge(dut.clk)
-    dut.start.value = 0
-
-    # wait for calculation to complete
-    while not dut.done.value:
-        await RisingEdge(dut.clk)
-
-    # check output signals on 'done'
-    assert dut.busy.value == 0, "busy is not 0!"
-    assert dut.done.value == 1, "done is not 1!"
-    assert dut.valid.value == 0, "valid is not 0"
-    assert dut.dbz.value == 0, "dbz is not 0!"
-    assert dut.ovf.value == 1, "ovf is not 1!"
-
-    # check 'done' is high for one tick
-    await RisingEdge(dut.clk)
-    assert dut.done.value == 0, "done is not 0!"
+    await Driver(dut, max_cycles(dut)).run(int(a * 2**fbits), int(b * 2**fbits))
+    await check_done(dut, valid=0, dbz=0, ovf=1)
 
 @cocotb.test()
 async def ovf_2(dut):
@@ -311,61 +348,23 @@ async def ovf_2(dut):
 @cocotb.test()
 async def ovf_3(dut):
     """Test -16/1 [overflow]"""
-    cocotb.start_soon(Clock(dut.clk, 1, units="ns").start())
-    await reset_dut(dut)
+    _, fbits = params(dut)
+
+    await start_dut(dut)
 
-    await RisingEdge(dut.clk)
     a = -16
     b = 1
-    dut.a.value = int(a * 2**FBITS)
-    dut.b.value = int(b * 2**FBITS)
-    dut.start.value = 1
-
-    await RisingEdge(dut.clk)
-    dut.start.value = 0
-
-    # wait for calculation to complete
-    while not dut.done.value:
-        await RisingEdge(dut.clk)
-
-    # check output signals on 'done'
-    assert dut.busy.value == 0, "busy is not 0!"
-    assert dut.done.value == 1, "done is not 1!"
-    assert dut.valid.value == 0, "valid is not 0"
-    assert dut.dbz.value == 0, "dbz is not 0!"
-    assert dut.ovf.value == 1, "ovf is not 1!"
-
-    # check 'done' is high for one tick
-    await RisingEdge(dut.clk)
-    assert dut.done.value == 0, "done is not 0!"
+    await Driver(dut, max_cycles(dut)).run(int(a * 2**fbits), int(b * 2**fbits))
+    await check_done(dut, valid=0, dbz=0, ovf=1)
 
 @cocotb.test()
 async def ovf_4(dut):
     """Test 1/-16 [overflow]"""
-    cocotb.start_soon(Clock(dut.clk, 1, units="ns").start())
-    await reset_dut(dut)
+    _, fbits = params(dut)
+
+    await start_dut(dut)
 
-    await RisingEdge(dut.clk)
     a = 1
     b = -16
-    dut.a.value = int(a * 2**FBITS)
-    dut.b.value = int(b * 2**FBITS)
-    dut.start.value = 1
-
-    await RisingEdge(dut.clk)
-    dut.start.value = 0
-
-    # wait for calculation to complete
-    while not dut.done.value:
-        await RisingEdge(dut.clk)
-
-    # check output signals on 'done'
-    assert dut.busy.value == 0, "busy is not 0!"
-    assert dut.done.value == 1, "done is not 1!"
-    assert dut.valid.value == 0, "valid is not 0"
-    assert dut.dbz.value == 0, "dbz is not 0!"
-    assert dut.ovf.value == 1, "ovf is not 1!"
-
-    # check 'done' is high for one tick
-    await RisingEdge(dut.clk)
-    assert dut.done.value == 0, "done is not 0!"
+    await Driver(dut, max_cycles(dut)).run(int(a * 2**fbits), int(b * 2**fbits))
+    await check_done(dut, valid=0, dbz=0, ovf=1)
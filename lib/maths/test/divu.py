@@ -2,71 +2,48 @@
 ## (C)2023 Will Green, open source software released under the MIT License
 ## Learn more at https://projectf.io/verilog-lib/
 
-import cocotb
-from cocotb.clock import Clock
-from cocotb.triggers import RisingEdge, Timer
-
-from FixedPoint import FXfamily, FXnum
-
-WIDTH=8  # must match Makefile
-FBITS=4  # must match Makefile
-fp_family = FXfamily(n_bits=FBITS, n_intbits=WIDTH-FBITS+1)  # need +1 because n_intbits includes sign
+import random
 
-async def reset_dut(dut):
-    await RisingEdge(dut.clk)
-    dut.rst.value = 0
-    await RisingEdge(dut.clk)
-    dut.rst.value = 1
-    await RisingEdge(dut.clk)
-    dut.rst.value = 0
-    await RisingEdge(dut.clk)
+import cocotb
 
-async def test_dut_divide(dut, a, b, log=True):
-    cocotb.start_soon(Clock(dut.clk, 1, units="ns").start())
-    await reset_dut(dut)
+from bench import Driver, SHARD, SHARDS, STREAM_OPS, SWEEP, check_done, max_cycles, params, start_dut
+import model
+from stream import stream_model
+import waves
 
-    await RisingEdge(dut.clk)
-    dut.a.value = int(a * 2**FBITS)
-    dut.b.value = int(b * 2**FBITS)
-    dut.start.value = 1
+def check_divide(dut, a, b, val, dbz, ovf):
+    assert dut.dbz.value == dbz, f"dbz is not {dbz} for {a}/{b}!"
+    assert dut.ovf.value == ovf, f"ovf is not {ovf} for {a}/{b}!"
+    assert dut.valid.value == (not dbz and not ovf), f"valid is wrong for {a}/{b}!"
+    if (dut.valid.value):
+        assert dut.val.value.integer == val, f"dut val doesn't match model val for {a}/{b}"
 
-    await RisingEdge(dut.clk)
-    dut.start.value = 0
+async def test_dut_divide(dut, a, b, log=False):
+    width, fbits = params(dut)
 
-    # wait for calculation to complete
-    while not dut.done.value:
-        await RisingEdge(dut.clk)
+    await start_dut(dut)
 
-    # model quotient: covert twice to ensure division is handled consistently
-    #                 https://github.com/rwpenney/spfpm/issues/14
-    model_val = fp_family(float(fp_family(a)) / float(fp_family(b)))
+    a = int(a * 2**fbits)  # scale inputs to raw fixed-point values
+    b = int(b * 2**fbits)
+    await Driver(dut, max_cycles(dut)).run(a, b)
 
-    # divide dut result by scaling factor
-    val = fp_family(dut.val.value.signed_integer/2**FBITS)
+    # model quotient from the raw values driven onto the DUT
+    model_val = int(model.divu(a, b, width, fbits)[0])
 
-    # divide dut result by scaling factor
-    val = fp_family(dut.val.value.integer/2**FBITS)
+    val = dut.val.value.integer
 
-    # log numberical signals
-    if (log):
+    # log numerical signals on a mismatch (or always with log=True)
+    if log or val != model_val or not dut.valid.value:
         dut._log.info('dut a:     ' + dut.a.value.binstr)
         dut._log.info('dut b:     ' + dut.b.value.binstr)
         dut._log.info('dut val:   ' + dut.val.value.binstr)
-        dut._log.info('           ' + val.toDecimalString(precision=fp_family.fraction_bits))
-        dut._log.info('model val: ' + model_val.toBinaryString())
-        dut._log.info('           ' + model_val.toDecimalString(precision=fp_family.fraction_bits))
+        dut._log.info('           ' + f'{val/2**fbits:.{fbits}f}')
+        dut._log.info('model val: ' + f'{model_val:0{width}b}')
+        dut._log.info('           ' + f'{model_val/2**fbits:.{fbits}f}')
 
     # check output signals on 'done'
-    assert dut.busy.value == 0, "busy is not 0!"
-    assert dut.done.value == 1, "done is not 1!"
-    assert dut.valid.value == 1, "valid is not 1!"
-    assert dut.dbz.value == 0, "dbz is not 0!"
-    assert dut.ovf.value == 0, "ovf is not 0!"
     assert val == model_val, "dut val doesn't match model val"
-
-    # check 'done' is high for one tick
-    await RisingEdge(dut.clk)
-    assert dut.done.value == 0, "done is not 0!"
+    await check_done(dut, valid=1, dbz=0, ovf=0)
 
 
 # simple division tests (no rounding required)
@@ -112,27 +89,27 @@ async def round_2(dut):
     """Test 7.0625/2"""
     await test_dut_divide(dut=dut, a=7.0625, b=2)
 
-@cocotb.test(expect_fail=True)  # divu truncates, use div if you want rounding
+@cocotb.test()  # divu truncates, use div if you want rounding
 async def round_3(dut):
     """Test 15.9375/2"""
     await test_dut_divide(dut=dut, a=15.9375, b=2)
 
-@cocotb.test(expect_fail=True)
+@cocotb.test()
 async def round_4(dut):
     """Test 14.9375/2"""
     await test_dut_divide(dut=dut, a=14.9375, b=2)
 
-@cocotb.test(expect_fail=True)
+@cocotb.test()
 async def round_5(dut):
     """Test 13/7"""
     await test_dut_divide(dut=dut, a=13, b=7)
 
-@cocotb.test(expect_fail=True)
+@cocotb.test()
 async def round_6(dut):
     """Test 8.1875/4"""
     await test_dut_divide(dut=dut, a=8.1875, b=4)
 
-@cocotb.test(expect_fail=True)
+@cocotb.test()
 async def round_7(dut):
     """Test 12.3125/8"""
     await test_dut_divide(dut=dut, a=12.3125, b=8)
@@ -182,50 +159,66 @@ async def nonbin_3(dut):
     """Test 0.4/0.2"""
     await test_dut_divide(dut=dut, a=0.4, b=0.2)
 
-# test fails - model and DUT choose different sides of true value
-@cocotb.test(expect_fail=True)
+@cocotb.test()
 async def nonbin_4(dut):
     """Test 3.6/0.6"""
     await test_dut_divide(dut=dut, a=3.6, b=0.6)
 
-# test fails - model and DUT choose different sides of true value
-@cocotb.test(expect_fail=True)
+@cocotb.test()
 async def nonbin_5(dut):
     """Test 0.4/0.1"""
     await test_dut_divide(dut=dut, a=0.4, b=0.1)
 
 
+# streaming tests: one reset, then operations back-to-back
+@cocotb.test()
+async def stream_1(dut):
+    """Stream random operands"""
+    width, _ = params(dut)
+
+    await start_dut(dut)
+
+    a = [random.randrange(2**width) for _ in range(STREAM_OPS)]
+    b = [random.randrange(2**width) for _ in range(STREAM_OPS)]
+    count = await stream_model(dut, (a, b), check_divide)
+    dut._log.info(f'streamed {count} operations')
+
+
+# exhaustive sweep: every operand pair, checked against a precomputed table
+@cocotb.test(skip=not SWEEP)
+async def sweep_1(dut):
+    """Sweep every operand pair (or one shard of them)"""
+    width, _ = params(dut)
+
+    a, b = model.sweep(0, 2**width, SHARD, SHARDS)
+
+    await start_dut(dut)
+    count = await stream_model(dut, (a, b), check_divide)
+    dut._log.info(f'swept {count} operand pairs')
+
+
+# replay one failed operation from reset, for waveform capture (see waves.py)
+@cocotb.test(skip=not waves.REPLAY)
+async def replay_1(dut):
+    """Replay the raw operands in REPLAY"""
+    a, b = waves.replay()
+
+    await start_dut(dut)
+    await stream_model(dut, ([a], [b]), check_divide)
+
+
 # divide by zero and overflow tests
 @cocotb.test()
 async def dbz_1(dut):
     """Test 2/0 [div by zero]"""
-    cocotb.start_soon(Clock(dut.clk, 1, units="ns").start())
-    await reset_dut(dut)
+    _, fbits = params(dut)
+
+    await start_dut(dut)
 
-    await RisingEdge(dut.clk)
     a = 2
     b = 0
-    dut.a.value = int(a * 2**FBITS)
-    dut.b.value = int(b * 2**FBITS)
-    dut.start.value = 1
-
-    await RisingEdge(dut.clk)
-    dut.start.value = 0
-
-    # wait for calculation to complete
-    while not dut.done.value:
-        await RisingEdge(dut.clk)
-
-    # check output signals on 'done'
-    assert dut.busy.value == 0, "busy is not 0!"
-    assert dut.done.value == 1, "done is not 1!"
-    assert dut.valid.value == 0, "valid is not 0!"
-    assert dut.dbz.value == 1, "dbz is not 1!"
-    assert dut.ovf.value == 0, "ovf is not 0!"
-
-    # check 'done' is high for one tick
-    await RisingEdge(dut.clk)
-    assert dut.done.value == 0, "done is not 0!"
+    await Driver(dut, max_cycles(dut)).run(int(a * 2**fbits), int(b * 2**fbits))
+    await check_done(dut, valid=0, dbz=1, ovf=0)
 
 @cocotb.test()
 async def dbz_2(dut):
@@ -235,33 +228,14 @@ async def dbz_2(dut):
 @cocotb.test()
 async def ovf_1(dut):
     """Test 8/0.25 [overflow]"""
-    cocotb.start_soon(Clock(dut.clk, 1, units="ns").start())
-    await reset_dut(dut)
+    _, fbits = params(dut)
+
+    await start_dut(dut)
 
-    await RisingEdge(dut.clk)
     a = 8
     b = 0.25
-    dut.a.value = int(a * 2**FBITS)
-    dut.b.value = int(b * 2**FBITS)
-    dut.start.value = 1
-
-    await RisingEdge(dut.clk)
-    dut.start.value = 0
-
-    # wait for calculation to complete
-    while not dut.done.value:
-        await RisingEdge(dut.clk)
-
-    # check output signals on 'done'
-    assert dut.busy.value == 0, "busy is not 0!"
-    assert dut.done.value == 1, "done is not 1!"
-    assert dut.valid.value == 0, "valid is not 0"
-    assert dut.dbz.value == 0, "dbz is not 0!"
-    assert dut.ovf.value == 1, "ovf is not 1!"
-
-    # check 'done' is high for one tick
-    await RisingEdge(dut.clk)
-    assert dut.done.value == 0, "done is not 0!"
+    await Driver(dut, max_cycles(dut)).run(int(a * 2**fbits), int(b * 2**fbits))
+    await check_done(dut, valid=0, dbz=0, ovf=1)
 
 @cocotb.test()
 async def ovf_2(dut):
@@ -2,59 +2,45 @@
 ## (C)2023 Will Green, open source software released under the MIT License
 ## Learn more at https://projectf.io/verilog-lib/
 
+import random
+
 import cocotb
-from cocotb.clock import Clock
-from cocotb.triggers import RisingEdge, Timer
-
-async def reset_dut(dut):
-    await RisingEdge(dut.clk)
-    dut.rst.value = 0
-    await RisingEdge(dut.clk)
-    dut.rst.value = 1
-    await RisingEdge(dut.clk)
-    dut.rst.value = 0
-    await RisingEdge(dut.clk)
-
-async def test_dut_divide(dut, a, b, log=True):
-    cocotb.start_soon(Clock(dut.clk, 1, units="ns").start())
-    await reset_dut(dut)
-
-    await RisingEdge(dut.clk)
-    dut.a.value = a
-    dut.b.value = b
-    dut.start.value = 1
-
-    await RisingEdge(dut.clk)
-    dut.start.value = 0
-
-    # wait for calculation to complete
-    while not dut.done.value:
-        await RisingEdge(dut.clk)
+
+from bench import Driver, SHARD, SHARDS, STREAM_OPS, SWEEP, check_done, max_cycles, params, start_dut
+import model
+from stream import stream_model
+import waves
+
+def check_divide(dut, a, b, val, rem, dbz):
+    assert dut.dbz.value == dbz, f"dbz is not {dbz} for {a}/{b}!"
+    assert dut.valid.value == (not dbz), f"valid is wrong for {a}/{b}!"
+    if (dut.valid.value):
+        assert dut.val.value == val, f"dut val doesn't match model val for {a}/{b}"
+        assert dut.rem.value == rem, f"dut rem doesn't match model rem for {a}/{b}"
+
+async def test_dut_divide(dut, a, b, log=False):
+    width, _ = params(dut)
+
+    await start_dut(dut)
+
+    await Driver(dut, max_cycles(dut)).run(a, b)
 
     # model division
-    model_c = a // b
-    model_r = a % b
+    model_c, model_r, _ = (int(x) for x in model.divu_int(a, b, width))
 
-    # log numberical signals (note width formatting of model answers)
-    if (log):
+    # log numerical signals on a mismatch (or always with log=True)
+    if log or dut.val.value != model_c or dut.rem.value != model_r or not dut.valid.value:
         dut._log.info('dut a:     ' + dut.a.value.binstr)
         dut._log.info('dut b:     ' + dut.b.value.binstr)
         dut._log.info('dut val:   ' + dut.val.value.binstr)
         dut._log.info('dut rem:   ' + dut.rem.value.binstr)
-        dut._log.info('model val: ' + '{0:08b}'.format(model_c))
-        dut._log.info('model rem: ' + '{0:08b}'.format(model_r))
+        dut._log.info('model val: ' + f'{model_c:0{width}b}')
+        dut._log.info('model rem: ' + f'{model_r:0{width}b}')
 
     # check output signals on 'done'
-    assert dut.busy.value == 0, "busy is not 0!"
-    assert dut.done.value == 1, "done is not 1!"
-    assert dut.valid.value == 1, "valid is not 1!"
-    assert dut.dbz.value == 0, "dbz is not 0!"
     assert dut.val.value == model_c, "dut val doesn't match model val"
     assert dut.rem.value == model_r, "dut rem doesn't match model rem"
-
-    # check 'done' is high for one tick
-    await RisingEdge(dut.clk)
-    assert dut.done.value == 0, "done is not 0!"
+    await check_done(dut, valid=1, dbz=0)
 
 
 # simple division tests (no remainder)
@@ -123,35 +109,53 @@ async def edge_4(dut):
     await test_dut_divide(dut=dut, a=254, b=255)
 
 
+# streaming tests: one reset, then operations back-to-back
+@cocotb.test()
+async def stream_1(dut):
+    """Stream random operands"""
+    width, _ = params(dut)
+
+    await start_dut(dut)
+
+    a = [random.randrange(2**width) for _ in range(STREAM_OPS)]
+    b = [random.randrange(2**width) for _ in range(STREAM_OPS)]
+    count = await stream_model(dut, (a, b), check_divide)
+    dut._log.info(f'streamed {count} operations')
+
+
+# exhaustive sweep: every operand pair, checked against a precomputed table
+@cocotb.test(skip=not SWEEP)
+async def sweep_1(dut):
+    """Sweep every operand pair (or one shard of them)"""
+    width, _ = params(dut)
+
+    a, b = model.sweep(0, 2**width, SHARD, SHARDS)
+
+    await start_dut(dut)
+    count = await stream_model(dut, (a, b), check_divide)
+    dut._log.info(f'swept {count} operand pairs')
+
+
+# replay one failed operation from reset, for waveform capture (see waves.py)
+@cocotb.test(skip=not waves.REPLAY)
+async def replay_1(dut):
+    """Replay the raw operands in REPLAY"""
+    a, b = waves.replay()
+
+    await start_dut(dut)
+    await stream_model(dut, ([a], [b]), check_divide)
+
+
 # divide by zero tests
 @cocotb.test()
 async def dbz_1(dut):
     """Test 2/0 [div by zero]"""
-    cocotb.start_soon(Clock(dut.clk, 1, units="ns").start())
-    await reset_dut(dut)
+    await start_dut(dut)
 
-    await RisingEdge(dut.clk)
     a = 2
     b = 0
-    dut.a.value = a
-    dut.b.value = b
-    dut.start.value = 1
-
-    await RisingEdge(dut.clk)
-    dut.start.value = 0
-    # wait for calculation to complete
-    while not dut.done.value:
-        await RisingEdge(dut.clk)
-
-    # check output signals on 'done'
-    assert dut.busy.value == 0, "busy is not 0!"
-    assert dut.done.value == 1, "done is not 1!"
-    assert dut.valid.value == 0, "valid is not 0!"
-    assert dut.dbz.value == 1, "dbz is not 1!"
-
-    # check 'done' is high for one tick
-    await RisingEdge(dut.clk)
-    assert dut.done.value == 0, "done is not 0!"
+    await Driver(dut, max_cycles(dut)).run(a, b)
+    await check_done(dut, valid=0, dbz=1)
 
 @cocotb.test()
 async def dbz_2(dut):
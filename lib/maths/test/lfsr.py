@@ -0,0 +1,151 @@
+## Project F Library - lfsr Test Bench (cocotb)
+## (C)2023 Will Green, open source software released under the MIT License
+## Learn more at https://projectf.io/verilog-lib/
+
+# The clock runs in the Verilog wrapper (lfsr_tb.sv), and the DUT is sampled
+# mid-cycle. The period test lets the simulator run freely between sparse
+# checkpoints, comparing each one with the jump-ahead model. Because the LFSR
+# is linear, any fault in the feedback shows up at the next checkpoint.
+
+import hashlib
+import heapq
+import os
+import random
+
+import cocotb
+from cocotb.triggers import RisingEdge, Timer
+
+import model
+
+CHECKPOINTS = int(os.environ.get('CHECKPOINTS', 1000))  # DUT samples in the period test
+PERIOD_LEN = int(os.environ.get('PERIOD_LEN', 24))  # simulate whole periods up to this LEN
+STEP_CYCLES = 1000  # cycles checked one by one
+
+def params(dut):
+    """Read module parameters from the DUT: (LEN, TAPS)."""
+    return int(dut.LEN.value), int(dut.TAPS.value)
+
+async def reset_dut(dut, seed):
+    """Load seed (zero selects the default) and leave en low, sampling mid-cycle."""
+    dut.en.value = 0
+    dut.seed.value = seed
+    dut.rst.value = 1
+    await RisingEdge(dut.clk)
+    await RisingEdge(dut.clk)
+    dut.rst.value = 0
+    await Timer(1, units='ns')  # half a cycle: register outputs have settled
+
+async def run(dut, cycles):
+    """Let the DUT run for whole cycles from mid-cycle."""
+    await Timer(2 * cycles, units='ns')
+
+def checkpoints(length, taps, end, count):
+    """Yield about count increasing steps below end, with gaps hashed from the parameters.
+
+    Irregular gaps mean a fault that repeats with some period can't hide between samples."""
+    mean = max(end // count, 1)
+    pos, i = 0, 0
+    while True:
+        h = hashlib.blake2b(f'{length}:{taps}:{i}'.encode(), digest_size=8).digest()
+        pos += 1 + int.from_bytes(h, 'little') % (2 * mean)
+        if pos >= end:
+            return
+        yield pos
+        i += 1
+
+
+# seed tests
+@cocotb.test()
+async def seed_1(dut):
+    """Test zero seed loads the default (all ones)"""
+    length, _ = params(dut)
+
+    await reset_dut(dut, 0)
+    assert dut.sreg.value == 2**length - 1, "zero seed didn't load all ones!"
+
+@cocotb.test()
+async def seed_2(dut):
+    """Test a random seed loads as given"""
+    length, _ = params(dut)
+
+    seed = random.randrange(1, 2**length)
+    await reset_dut(dut, seed)
+    assert dut.sreg.value == seed, f"seed {seed} didn't load!"
+
+
+# enable tests
+@cocotb.test()
+async def enable_1(dut):
+    """Test sreg holds while en is low"""
+    length, _ = params(dut)
+
+    seed = random.randrange(1, 2**length)
+    await reset_dut(dut, seed)
+    await run(dut, 8)
+    assert dut.sreg.value == seed, "sreg changed with en low!"
+
+@cocotb.test()
+async def enable_2(dut):
+    """Test rst takes priority over en"""
+    length, taps = params(dut)
+
+    await reset_dut(dut, 0)
+    dut.en.value = 1
+    await run(dut, 5)
+    dut.rst.value = 1
+    await run(dut, 1)
+    assert dut.sreg.value == 2**length - 1, "rst didn't override en!"
+    dut.rst.value = 0
+    await run(dut, 1)
+    assert dut.sreg.value == model.Lfsr(length, taps).step(2**length - 1), "no step after rst!"
+
+
+# step tests: every cycle against the one-step model
+@cocotb.test()
+async def step_1(dut):
+    """Test the first cycles one by one from a random seed"""
+    length, taps = params(dut)
+    lfsr = model.Lfsr(length, taps)
+
+    state = random.randrange(1, 2**length)
+    await reset_dut(dut, state)
+    dut.en.value = 1
+    for cycle in range(STEP_CYCLES):
+        await run(dut, 1)
+        state = lfsr.step(state)
+        assert dut.sreg.value == state, f"sreg doesn't match model after {cycle+1} cycles!"
+
+
+# period test: sparse checkpoints across the whole sequence
+@cocotb.test()
+async def period_1(dut):
+    """Test maximal period from the default seed at sparse checkpoints"""
+    length, taps = params(dut)
+    lfsr = model.Lfsr(length, taps)
+
+    start = 2**length - 1  # default seed
+    period, divisors = lfsr.period_points()
+    assert lfsr.maximal(start), f"taps {taps:#x} don't give a maximal period for LEN={length}!"
+
+    # check the period's end and its divisors (where a shorter sequence would repeat) on the DUT too
+    end = period if length <= PERIOD_LEN else 2**PERIOD_LEN
+    points = heapq.merge(checkpoints(length, taps, end, CHECKPOINTS), sorted(d for d in divisors if d < end),
+                         [period] if period == end else [])
+
+    await reset_dut(dut, 0)
+    dut.en.value = 1
+    state, now, count = start, 0, 0
+    for pos in points:
+        if pos == now:
+            continue
+        await run(dut, pos - now)
+        state = lfsr.jump(state, pos - now)
+        now = pos
+        count += 1
+        assert dut.sreg.value == state, f"sreg doesn't match model after {pos} cycles!"
+    if period == end:
+        assert dut.sreg.value == start, f"sreg didn't return to the seed after {period} cycles!"
+        dut._log.info(f'LEN={length} TAPS={taps:#x}: period {period}, checked at {count} points')
+    else:
+        dut._log.info(f'LEN={length} TAPS={taps:#x}: period {period} (model), simulated {end} cycles, '
+                      f'checked at {count} points')
@@ -0,0 +1,26 @@
+// Project F Library - lfsr cocotb Test Bench Wrapper
+// (C)2023 Will Green, open source hardware released under the MIT License
+// Learn more at https://projectf.io/verilog-lib/
+
+`default_nettype none
+`timescale 1ns / 1ps
+
+// Generates the clock in Verilog, so cocotb can skip millions of cycles with
+// a single Timer rather than waking Python twice per cycle.
+
+module lfsr_tb #(
+    parameter LEN=8,                   // shift register length
+    parameter TAPS=8'b10111000         // XOR taps
+    ) (
+    output      logic clk,             // clock (2 ns period)
+    input  wire logic rst,             // reset
+    input  wire logic en,              // enable
+    input  wire logic [LEN-1:0] seed,  // seed (uses default seed if zero)
+    output      logic [LEN-1:0] sreg   // lfsr output
+    );
+
+    initial clk = 0;
+    always #1 clk = ~clk;
+
+    lfsr #(.LEN(LEN), .TAPS(TAPS)) lfsr_inst (.*);
+endmodule
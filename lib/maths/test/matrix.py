@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+## Project F Library - Maths Parameter Matrix Runner
+## (C)2023 Will Green, open source software released under the MIT License
+## Learn more at https://projectf.io/verilog-lib/
+
+# Runs the stream and coverage tests (plus the exhaustive sweep for narrow
+# widths) of each maths bench across a matrix of WIDTH and FBITS values. Each
+# configuration compiles once into a build directory named for its parameters;
+# later runs reuse it until the Verilog changes. Results are merged into
+# results.xml.
+#
+#   python3 matrix.py --widths 8 12 16 --sim verilator div mul
+#   python3 matrix.py --widths 16 32 --fbits 0 8 15  # subset of FBITS
+#   python3 matrix.py lfsr --widths 16 20 24  # lfsr periods by LEN
+#   python3 matrix.py sine_table --widths 6 8 12  # ROM_WIDTH, at each of SINE_DEPTHS
+
+import argparse
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import model
+from regress import BENCHES, RESULTS, capture, merge, run
+
+WIDTHS = [8, 9, 12, 16, 24, 32]
+FBITS_MIN = {'div': 0, 'divu': 0, 'mul': 1, 'sqrt': 0}  # mul needs at least one bit to round
+PAIRED = ('sqrt', 'sqrt_int')  # take radicand bits in pairs, so WIDTH+FBITS must be even
+SINE_DEPTHS = [16, 64, 256, 1024]  # sine_table ROM_DEPTH for each ROM_WIDTH
+
+def configs(bench, widths, fbits):
+    """List (name, width, params) for each configuration of a bench."""
+    for width in widths:
+        if bench == 'lfsr':  # WIDTH sets LEN, with maximal-length taps
+            if width in model.LFSR_TAPS:
+                yield f'{bench}_l{width}', width, f'LEN={width} TAPS={model.LFSR_TAPS[width]}'
+            continue
+        if bench == 'sine_table':  # WIDTH sets ROM_WIDTH
+            for depth in SINE_DEPTHS:
+                yield f'{bench}_d{depth}_w{width}', width, f'ROM_DEPTH={depth} ROM_WIDTH={width}'
+            continue
+        if bench in ('divu_int', 'sqrt_int'):  # integer only
+            if bench in PAIRED and width % 2:
+                continue
+            yield f'{bench}_w{width}', width, f'WIDTH={width}'
+            continue
+        for f in (fbits if fbits else range(width)):
+            if bench in PAIRED and (width + f) % 2:
+                continue
+            if FBITS_MIN[bench] <= f < width:
+                yield f'{bench}_w{width}_f{f}', width, f'WIDTH={width} FBITS={f}'
+
+def main():
+    parser = argparse.ArgumentParser(description='Run maths test benches over a WIDTH/FBITS matrix.')
+    parser.add_argument('benches', nargs='*', default=BENCHES, help='test benches to run')
+    parser.add_argument('--widths', type=int, nargs='+', default=WIDTHS, help='WIDTH values')
+    parser.add_argument('--fbits', type=int, nargs='+', help='FBITS values (default: 0 to WIDTH-1)')
+    parser.add_argument('--ops', type=int, default=1000, help='stream operations per configuration')
+    parser.add_argument('--sweep-width', type=int, default=8, help='sweep exhaustively up to this WIDTH')
+    parser.add_argument('--sim', default=os.environ.get('SIM', 'icarus'), help='icarus or verilator')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count(), help='concurrent simulations')
+    args = parser.parse_args()
+
+    todo = []
+    for bench in args.benches:
+        for name, width, params in configs(bench, args.widths, args.fbits):
+            sweep = width <= args.sweep_width
+            tests = ['stream_1'] + (['cover_1'] if bench in ('div', 'mul') else []) + (['sweep_1'] if sweep else [])
+            env = {'TESTCASE': ','.join(tests),
+                   'SWEEP': str(int(sweep)), 'STREAM_OPS': str(args.ops)}
+            if bench in ('lfsr', 'sine_table'):  # all tests: each covers the whole sequence or circle
+                env = {}
+            todo.append((name, bench, env, args.sim, params))
+
+    with ThreadPoolExecutor(max_workers=args.jobs) as pool:
+        codes = dict(pool.map(lambda job: run(*job), todo))
+
+    bad = [name for name, code in codes.items() if code != 0]
+    for name in bad:
+        print(f'{name}: make failed, see {name}.log')
+    capture(todo, args.sim)
+    tests, failures, skipped = merge(codes)
+    print(f'{RESULTS}: CONFIGS={len(todo)} TESTS={tests} PASS={tests-failures-skipped} FAIL={failures} SKIP={skipped}')
+    return 1 if bad or failures else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
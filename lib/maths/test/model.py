@@ -0,0 +1,187 @@
+## Project F Library - Maths Golden Model (NumPy)
+## (C)2023 Will Green, open source software released under the MIT License
+## Learn more at https://projectf.io/verilog-lib/
+
+# Expected results for the maths cores, computed on whole arrays of raw
+# (scaled) integers at once. Operands are the integers driven onto the DUT
+# ports: signed for div and mul, unsigned for divu, divu_int, and sqrt.
+#
+# Each model returns a tuple of arrays matching the DUT outputs. Where a
+# result isn't valid (dbz or ovf) the returned val is 0.
+
+import math
+
+import numpy as np
+
+def _ints(x, width):
+    """Array of raw integers wide enough for intermediate results."""
+    # int64 holds a 32-bit product; wider cores fall back to Python ints
+    # (object arrays, so stick to operators rather than ufuncs like divmod)
+    return np.asarray(x, dtype=np.int64 if width <= 32 else object)
+
+def _round_even(quo, rem, div):
+    """Round quo half to even given remainder rem of divisor div."""
+    up = (2*rem > div) | ((2*rem == div) & (quo % 2 == 1))
+    return quo + up
+
+def div(a, b, width, fbits):
+    """Signed fixed-point division with Gaussian rounding: (val, dbz, ovf)."""
+    a, b = _ints(a, width), _ints(b, width)
+    smallest = -2**(width-1)
+    dbz = b == 0
+    au, bu = np.abs(a), np.where(dbz, 1, np.abs(b))
+    ovf = ~dbz & ((a == smallest) | (b == smallest) |
+        (au // bu >= 2**(width-1-max(fbits, 1))))  # integer part too wide (FBITSW in div.sv)
+    quo, rem = au * 2**fbits // bu, au * 2**fbits % bu
+    quo = _round_even(quo, rem, bu)
+    val = np.where((a < 0) != (b < 0), -quo, quo)
+    return np.where(dbz | ovf, 0, val), dbz.astype(int), ovf.astype(int)
+
+def divu(a, b, width, fbits):
+    """Unsigned fixed-point division rounding towards zero: (val, dbz, ovf)."""
+    a, b = _ints(a, width), _ints(b, width)
+    dbz = b == 0
+    bu = np.where(dbz, 1, b)
+    ovf = ~dbz & (a // bu >= 2**(width-fbits))  # integer part too wide (never with FBITS=0: done comes first in divu.sv)
+    val = a * 2**fbits // bu
+    return np.where(dbz | ovf, 0, val), dbz.astype(int), ovf.astype(int)
+
+def divu_int(a, b, width):
+    """Unsigned integer division with remainder: (val, rem, dbz)."""
+    a, b = _ints(a, width), _ints(b, width)
+    dbz = b == 0
+    bu = np.where(dbz, 1, b)
+    val, rem = a // bu, a % bu
+    return np.where(dbz, 0, val), np.where(dbz, 0, rem), dbz.astype(int)
+
+def mul(a, b, width, fbits):
+    """Signed fixed-point multiplication with Gaussian rounding: (val, ovf)."""
+    a, b = _ints(a, width), _ints(b, width)
+    quo, rem = a * b // 2**fbits, a * b % 2**fbits  # floor division, so rem >= 0
+    val = _round_even(quo, rem, 2**fbits)
+    ovf = (val < -2**(width-1)) | (val >= 2**(width-1))
+    return np.where(ovf, 0, val), ovf.astype(int)
+
+def sqrt(rad, width, fbits):
+    """Unsigned fixed-point square root rounding down: (root, rem)."""
+    # radicand gains fbits fractional bits: rem = x - root**2
+    x = np.asarray(rad, dtype=np.int64 if width+fbits <= 62 else object) * 2**fbits
+    if x.dtype == object:
+        root = np.frompyfunc(math.isqrt, 1, 1)(x)
+    else:  # float estimate, then correct the last bit of any rounding error
+        root = np.sqrt(x.astype(np.float64)).astype(np.int64)
+        root -= root*root > x
+        root += (root+1)*(root+1) <= x
+    return root, x - root*root
+
+def sqrt_int(rad, width):
+    """Unsigned integer square root: (root, rem)."""
+    return sqrt(rad, width, 0)
+
+def vectors(model, operands, *params):
+    """Rows of (*operands, *results) as Python ints, ready to drive and check a DUT."""
+    operands = [np.asarray(x) for x in operands]
+    results = model(*operands, *params)
+    return zip(*(x.tolist() for x in operands), *(r.tolist() for r in results))
+
+def sweep(lo, hi, shard=0, shards=1):
+    """Every operand pair (a, b) with lo <= a, b < hi as two flat arrays.
+
+    With shards > 1, return only the given shard: a contiguous slice of the sweep."""
+    n = (hi-lo)**2
+    a, b = np.divmod(np.arange(n*shard // shards, n*(shard+1) // shards), hi-lo)
+    return a + lo, b + lo
+
+
+# Galois LFSR (lfsr.sv): each step is linear over GF(2), so the model keeps
+# the columns of the one-step transition matrix and its repeated squares.
+# Advancing any number of steps then costs O(LEN * log(steps)) without
+# storing the sequence.
+
+LFSR_TAPS = {  # maximal-length taps for lfsr.sv (Galois, shifting right)
+     2: 0x3,         3: 0x6,         4: 0xC,         5: 0x14,
+     6: 0x30,        7: 0x60,        8: 0xB8,        9: 0x110,
+    10: 0x240,      11: 0x500,      12: 0x829,      13: 0x100D,
+    14: 0x2015,     15: 0x6000,     16: 0xD008,     17: 0x12000,
+    18: 0x20400,    19: 0x40023,    20: 0x90000,    21: 0x140000,
+    22: 0x300000,   23: 0x420000,   24: 0xE10000,   25: 0x1200000,
+    26: 0x2000023,  27: 0x4000013,  28: 0x9000000,  29: 0x14000000,
+    30: 0x20000029, 31: 0x48000000, 32: 0x80200003,
+}
+
+def _gf2_apply(cols, x):
+    """Multiply bit vector x by the GF(2) matrix with the given columns."""
+    y, i = 0, 0
+    while x:
+        if x & 1:
+            y ^= cols[i]
+        x >>= 1
+        i += 1
+    return y
+
+def _prime_factors(n):
+    """Distinct prime factors of n by trial division (fine for LEN up to ~40)."""
+    factors, p = [], 2
+    while p*p <= n:
+        if n % p == 0:
+            factors.append(p)
+            while n % p == 0:
+                n //= p
+        p += 1
+    return factors + ([n] if n > 1 else [])
+
+class Lfsr:
+    """Galois LFSR matching lfsr.sv, advanced by any number of steps at once."""
+
+    def __init__(self, length, taps):
+        self.length, self.taps = length, taps
+        self.powers = [[self.step(1 << i) for i in range(length)]]  # columns of M**(2**k)
+
+    def step(self, state):
+        """State after one clock with en high."""
+        return (state >> 1) ^ (self.taps if state & 1 else 0)
+
+    def jump(self, state, steps):
+        """State after steps clocks with en high."""
+        k = 0
+        while steps:
+            if k == len(self.powers):
+                self.powers.append([_gf2_apply(self.powers[-1], c) for c in self.powers[-1]])
+            if steps & 1:
+                state = _gf2_apply(self.powers[k], state)
+            steps >>= 1
+            k += 1
+        return state
+
+    def period_points(self):
+        """Steps where a maximal-length sequence must (2**LEN-1) and mustn't (its divisors) repeat."""
+        n = 2**self.length - 1
+        return n, [n // p for p in _prime_factors(n)]
+
+    def maximal(self, state):
+        """True if state first recurs after 2**LEN-1 steps."""
+        n, divisors = self.period_points()
+        return self.jump(state, n) == state and all(self.jump(state, d) != state for d in divisors)
+
+
+# Sine table (sine_table.sv): a ROM holds the first quadrant, sin(0) up to
+# just below sin(90), as unsigned fractions of ROM_WIDTH bits. The other
+# quadrants fold onto it by symmetry; sin(90) and sin(270) are exact.
+
+def sine_rom(depth, width):
+    """ROM contents for sine_table.sv: depth entries from 0 to just below 90 degrees."""
+    angle = np.arange(depth) * (np.pi/2) / depth
+    return np.minimum(np.rint(np.sin(angle) * 2**width), 2**width - 1).astype(np.int64)
+
+def sine_table(ids, rom, width):
+    """Signed sine_table.sv output for each table id, given the ROM contents."""
+    ids, depth = np.asarray(ids, np.int64), len(rom)
+    quad, k = ids // depth, ids % depth
+    mirror = quad % 2 == 1  # quadrants II and IV run backwards through the ROM
+    mag = np.where(mirror & (k == 0), 2**width, rom[np.where(mirror, (depth - k) % depth, k)])
+    return np.where(quad >= 2, -mag, mag)
+
+def sine_error(ids, data, depth, width):
+    """Error of signed output data against the exact sine, in LSBs."""
+    angle = np.asarray(ids) * (np.pi/2) / depth
+    return np.asarray(data) - np.sin(angle) * 2**width
@@ -10,12 +10,14 @@ VERILOG_SOURCES += $(PWD)/../${DUT}.sv
 TOPLEVEL = ${DUT}
 MODULE = ${DUT}
 
-# pass Verilog module parameters to Icarus Verilog
-COMPILE_ARGS += -P${DUT}.WIDTH=9 -P${DUT}.FBITS=4
+# Verilog module parameters (passed to the simulator by lib/params.mk)
+PARAMS = WIDTH=9 FBITS=4
 
 # each test Makefile needs its own build dir and results file
 COCOTB_RESULTS_FILE = results_${DUT}.xml
-SIM_BUILD = sim_build_${DUT}
+SIM_BUILD = sim_build_${DUT}_${SIM}
+
+include ../../params.mk
 
 # include cocotb's make rules to take care of the simulator setup
 include $(shell cocotb-config --makefiles)/Makefile.sim
@@ -2,66 +2,49 @@
 ## (C)2023 Will Green, open source software released under the MIT License
 ## Learn more at https://projectf.io/verilog-lib/
 
-import cocotb
-from cocotb.clock import Clock
-from cocotb.triggers import RisingEdge, Timer
-
-from FixedPoint import FXfamily, FXnum
+import random
 
-WIDTH=9  # must match Makefile
-FBITS=4  # must match Makefile
-fp_family = FXfamily(n_bits=FBITS, n_intbits=WIDTH-FBITS+1)  # need +1 because n_intbits includes sign
+import cocotb
 
-async def reset_dut(dut):
-    await RisingEdge(dut.clk)
-    dut.rst.value = 0
-    await RisingEdge(dut.clk)
-    dut.rst.value = 1
-    await RisingEdge(dut.clk)
-    dut.rst.value = 0
-    await RisingEdge(dut.clk)
+from bench import COVER_HITS, Driver, SHARD, SHARDS, STREAM_OPS, SWEEP, check_done, max_cycles, params, start_dut
+import cover
+import model
+from shrink import shrinker
+from stream import stream_model
+import waves
 
-async def test_dut_multiply(dut, a, b, log=True):
-    cocotb.start_soon(Clock(dut.clk, 1, units="ns").start())
-    await reset_dut(dut)
+def check_multiply(dut, a, b, val, ovf):
+    assert dut.ovf.value == ovf, f"ovf is not {ovf} for {a}*{b}!"
+    assert dut.valid.value == (not ovf), f"valid is wrong for {a}*{b}!"
+    if (dut.valid.value):
+        assert dut.val.value.signed_integer == val, f"dut val doesn't match model val for {a}*{b}"
 
-    await RisingEdge(dut.clk)
-    dut.a.value = int(a * 2**FBITS)
-    dut.b.value = int(b * 2**FBITS)
-    dut.start.value = 1
+async def test_dut_multiply(dut, a, b, log=False):
+    width, fbits = params(dut)
 
-    await RisingEdge(dut.clk)
-    dut.start.value = 0
+    await start_dut(dut)
 
-    # wait for calculation to complete
-    while not dut.done.value:
-        await RisingEdge(dut.clk)
+    a = int(a * 2**fbits)  # scale inputs to raw fixed-point values
+    b = int(b * 2**fbits)
+    await Driver(dut, max_cycles(dut)).run(a, b)
 
-    # model product
-    model_c = fp_family(float(fp_family(a)) * float(fp_family(b)))
+    # model product from the raw values driven onto the DUT
+    model_c = int(model.mul(a, b, width, fbits)[0])
 
-    # divide dut result by scaling factor
-    val = fp_family(dut.val.value.signed_integer/2**FBITS)
+    val = dut.val.value.signed_integer
 
-    # log numberical signals
-    if (log):
+    # log numerical signals on a mismatch (or always with log=True)
+    if log or val != model_c or not dut.valid.value:
         dut._log.info('dut a:     ' + dut.a.value.binstr)
         dut._log.info('dut b:     ' + dut.b.value.binstr)
         dut._log.info('dut val:   ' + dut.val.value.binstr)
-        dut._log.info('           ' + val.toDecimalString(precision=fp_family.fraction_bits))
-        dut._log.info('model val: ' + model_c.toBinaryString())
-        dut._log.info('           ' + model_c.toDecimalString(precision=fp_family.fraction_bits))
+        dut._log.info('           ' + f'{val/2**fbits:.{fbits}f}')
+        dut._log.info('model val: ' + f'{model_c % 2**width:0{width}b}')
+        dut._log.info('           ' + f'{model_c/2**fbits:.{fbits}f}')
 
     # check output signals on 'done'
-    assert dut.busy.value == 0, "busy is not 0!"
-    assert dut.done.value == 1, "done is not 1!"
-    assert dut.valid.value == 1, "valid is not 1!"
-    assert dut.ovf.value == 0, "ovf is not 0!"
     assert val == model_c, "dut val doesn't match model val"
-
-    # check 'done' is high for one tick
-    await RisingEdge(dut.clk)
-    assert dut.done.value == 0, "done is not 0!"
+    await check_done(dut, valid=1, ovf=0)
 
 
 # simple tests
@@ -194,106 +177,146 @@ async def nonbin_3(dut):
     """Test 0.4/0.2"""
     await test_dut_multiply(dut=dut, a=0.4, b=0.2)
 
-# test fails - model and DUT choose different sides of true value
-@cocotb.test(expect_fail=True)
+@cocotb.test()
 async def nonbin_4(dut):
     """Test 3.6*0.6"""
     await test_dut_multiply(dut=dut, a=3.6, b=0.6)
 
-# test fails - model and DUT choose different sides of true value
-@cocotb.test(expect_fail=True)
+@cocotb.test()
 async def nonbin_5(dut):
     """Test 0.4*0.1"""
     await test_dut_multiply(dut=dut, a=0.4, b=0.1)
 
 
+# zero products with differing input signs are valid, not overflow
+@cocotb.test()
+async def zero_1(dut):
+    """Test 0*-3 [zero, signs differ]"""
+    await test_dut_multiply(dut=dut, a=0, b=-3)
+
+@cocotb.test()
+async def zero_2(dut):
+    """Test 0.0625*-0.0625 [rounds to zero, signs differ]"""
+    await test_dut_multiply(dut=dut, a=0.0625, b=-0.0625)
+
+
+# rounding that carries into the sign bit: 87*47 is 255.5625 raw (WIDTH=9 FBITS=4)
+@cocotb.test()
+async def carry_1(dut):
+    """Test 5.4375*2.9375 [rounds up to overflow]"""
+    _, fbits = params(dut)
+
+    await start_dut(dut)
+
+    a = 5.4375
+    b = 2.9375
+    await Driver(dut, max_cycles(dut)).run(int(a * 2**fbits), int(b * 2**fbits))
+    await check_done(dut, valid=0, ovf=1)
+
+@cocotb.test()
+async def carry_2(dut):
+    """Test -5.4375*2.9375 [rounds to min]"""
+    await test_dut_multiply(dut=dut, a=-5.4375, b=2.9375)
+
+
+# streaming tests: one reset, then operations back-to-back
+@cocotb.test()
+async def stream_1(dut):
+    """Stream random operands"""
+    width, _ = params(dut)
+
+    await start_dut(dut)
+
+    lo, hi = -2**(width-1), 2**(width-1)
+    a = [random.randrange(lo, hi) for _ in range(STREAM_OPS)]
+    b = [random.randrange(lo, hi) for _ in range(STREAM_OPS)]
+    count = await stream_model(dut, (a, b), check_multiply, signed=True, shrink=shrinker(dut))
+    dut._log.info(f'streamed {count} operations')
+
+@cocotb.test()
+async def stream_2(dut):
+    """Stream zero products and rounding carries"""
+    await start_dut(dut)
+
+    a, b = zip(*[(48, 0), (-48, 0), (0, -48), (-1, 1), (63, 65), (-63, 65), (40, 33), (-40, 33)])
+    await stream_model(dut, (a, b), check_multiply, signed=True)
+
+
+# constrained random: seeded operands until every coverage bin is hit COVER_HITS times
+@cocotb.test()
+async def cover_1(dut):
+    """Stream constrained-random operands to cover every bin"""
+    width, fbits = params(dut)
+
+    a, b, counts, unreachable = cover.mul_stimulus(width, fbits, COVER_HITS, cocotb.RANDOM_SEED)
+
+    await start_dut(dut)
+    count = await stream_model(dut, (a, b), check_multiply, signed=True, shrink=shrinker(dut))
+
+    dut._log.info(f'seed {cocotb.RANDOM_SEED}: {count} operations, bins: ' +
+                  ' '.join(f'{name}={n}' for name, n in counts.items()))
+    if unreachable:
+        dut._log.info('bins no operands reach with these parameters: ' + ' '.join(unreachable))
+    short = [name for name, n in counts.items() if n < COVER_HITS and name not in unreachable]
+    assert not short, f"bins hit fewer than {COVER_HITS} times: {' '.join(short)}"
+
+
+# exhaustive sweep: every operand pair, checked against a precomputed table
+@cocotb.test(skip=not SWEEP)
+async def sweep_1(dut):
+    """Sweep every operand pair (or one shard of them)"""
+    width, _ = params(dut)
+
+    a, b = model.sweep(-2**(width-1), 2**(width-1), SHARD, SHARDS)
+
+    await start_dut(dut)
+    count = await stream_model(dut, (a, b), check_multiply, signed=True, shrink=shrinker(dut))
+    dut._log.info(f'swept {count} operand pairs')
+
+
+# replay one failed operation from reset, for waveform capture (see waves.py)
+@cocotb.test(skip=not waves.REPLAY)
+async def replay_1(dut):
+    """Replay the raw operands in REPLAY"""
+    a, b = waves.replay()
+
+    await start_dut(dut)
+    await stream_model(dut, ([a], [b]), check_multiply, signed=True)
+
+
 # overflow tests
 @cocotb.test()
 async def ovf_1(dut):
     """Test 8*8 [overflow]"""
-    cocotb.start_soon(Clock(dut.clk, 1, units="ns").start())
-    await reset_dut(dut)
+    _, fbits = params(dut)
+
+    await start_dut(dut)
 
-    await RisingEdge(dut.clk)
     a = 8
     b = 8
-    dut.a.value = int(a * 2**FBITS)
-    dut.b.value = int(b * 2**FBITS)
-    dut.start.value = 1
-
-    await RisingEdge(dut.clk)
-    dut.start.value = 0
-
-    # wait for calculation to complete
-    while not dut.done.value:
-        await RisingEdge(dut.clk)
-
-    # check output signals on 'done'
-    assert dut.busy.value == 0, "busy is not 0!"
-    assert dut.done.value == 1, "done is not 1!"
-    assert dut.valid.value == 0, "valid is not 0"
-    assert dut.ovf.value == 1, "ovf is not 1!"
-
-    # check 'done' is high for one tick
-    await RisingEdge(dut.clk)
-    assert dut.done.value == 0, "done is not 0!"
+    await Driver(dut, max_cycles(dut)).run(int(a * 2**fbits), int(b * 2**fbits))
+    await check_done(dut, valid=0, ovf=1)
 
 @cocotb.test()
 async def ovf_2(dut):
     """Test 5*4 [overflow]"""
-    cocotb.start_soon(Clock(dut.clk, 1, units="ns").start())
-    await reset_dut(dut)
+    _, fbits = params(dut)
+
+    await start_dut(dut)
 
-    await RisingEdge(dut.clk)
     a = 5
     b = 4
-    dut.a.value = int(a * 2**FBITS)
-    dut.b.value = int(b * 2**FBITS)
-    dut.start.value = 1
-
-    await RisingEdge(dut.clk)
-    dut.start.value = 0
-
-    # wait for calculation to complete
-    while not dut.done.value:
-        await RisingEdge(dut.clk)
-
-    # check output signals on 'done'
-    assert dut.busy.value == 0, "busy is not 0!"
-    assert dut.done.value == 1, "done is not 1!"
-    assert dut.valid.value == 0, "valid is not 0"
-    assert dut.ovf.value == 1, "ovf is not 1!"
-
-    # check 'done' is high for one tick
-    await RisingEdge(dut.clk)
-    assert dut.done.value == 0, "done is not 0!"
+    await Driver(dut, max_cycles(dut)).run(int(a * 2**fbits), int(b * 2**fbits))
+    await check_done(dut, valid=0, ovf=1)
 
 @cocotb.test()
 async def ovf_3(dut):
     """Test -7*3 [overflow]"""
-    cocotb.start_soon(Clock(dut.clk, 1, units="ns").start())
-    await reset_dut(dut)
+    _, fbits = params(dut)
+
+    await start_dut(dut)
 
-    await RisingEdge(dut.clk)
     a = -7
     b = 3
-    dut.a.value = int(a * 2**FBITS)
-    dut.b.value = int(b * 2**FBITS)
-    dut.start.value = 1
-
-    await RisingEdge(dut.clk)
-    dut.start.value = 0
-
-    # wait for calculation to complete
-    while not dut.done.value:
-        await RisingEdge(dut.clk)
-
-    # check output signals on 'done'
-    assert dut.busy.value == 0, "busy is not 0!"
-    assert dut.done.value == 1, "done is not 1!"
-    assert dut.valid.value == 0, "valid is not 0"
-    assert dut.ovf.value == 1, "ovf is not 1!"
-
-    # check 'done' is high for one tick
-    await RisingEdge(dut.clk)
-    assert dut.done.value == 0, "done is not 0!"
+    await Driver(dut, max_cycles(dut)).run(int(a * 2**fbits), int(b * 2**fbits))
+    await check_done(dut, valid=0, ovf=1)
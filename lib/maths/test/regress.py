@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+## Project F Library - Maths Test Regression Runner
+## (C)2023 Will Green, open source software released under the MIT License
+## Learn more at https://projectf.io/verilog-lib/
+
+# Runs the maths test benches concurrently, optionally splitting exhaustive
+# sweeps into shards across worker processes. Each job gets its own build
+# directory, results file, and log; results are merged into results.xml.
+# Jobs whose inputs are unchanged since they passed reuse their cached results
+# (see cache.py). A job with failed operations replays the last one afterwards
+# with waveforms (see waves.py).
+#
+#   python3 regress.py              # all benches in parallel
+#   python3 regress.py --sweep -s 8 div mul  # plus sweeps, 8 shards each
+
+import argparse
+import os
+import subprocess
+import sys
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+
+import cache
+import waves
+
+BENCHES = ['div', 'divu', 'divu_int', 'lfsr', 'mul', 'sine_table', 'sqrt', 'sqrt_int']
+RESULTS = 'results.xml'
+NO_SWEEP = ['lfsr', 'sine_table']  # benches without an exhaustive sweep test
+
+def jobs(benches, sweep, shards):
+    """List (name, bench, env) for each simulation to run."""
+    for bench in benches:
+        yield bench, bench, {'SWEEP': '0'}
+        if sweep and bench not in NO_SWEEP:
+            for shard in range(shards):
+                yield f'{bench}_sweep{shard}', bench, {
+                    'TESTCASE': 'sweep_1', 'SWEEP': '1',
+                    'SHARD': str(shard), 'SHARDS': str(shards)}
+
+def run(name, bench, env, sim, params=None):
+    """Run one simulation with its own build dir and results file, unless its inputs are cached."""
+    results = f'results_{name}.xml'
+    if os.path.exists(waves.report_path(name)):
+        os.remove(waves.report_path(name))  # failures of an earlier run
+    k = cache.key(bench, sim, params, env)
+    if cache.lookup(k, results):
+        with open(f'{name}.log', 'w') as log:
+            log.write(f'inputs unchanged since it passed, reused cached results ({k})\n')
+        return name, 0
+    if os.path.exists(results):
+        os.remove(results)  # a failed build mustn't leave old results
+    cmd = ['make', '-f', f'{bench}.mk', f'SIM={sim}',
+           f'SIM_BUILD=sim_build_{name}_{sim}', f'COCOTB_RESULTS_FILE={results}']
+    if params:  # override module parameters in the test Makefile
+        cmd.append(f'PARAMS={params}')
+    with open(f'{name}.log', 'w') as log:
+        proc = subprocess.run(cmd, env={**os.environ, **env}, stdout=log, stderr=subprocess.STDOUT)
+    if proc.returncode == 0:
+        cache.store(k, results)
+    return name, proc.returncode
+
+def capture(todo, sim):
+    """Replay the last failed operation of each job with waveforms (see waves.py), one at a time."""
+    for name, bench, *_ in todo:
+        waves.capture(name, bench, sim)
+
+def merge(names, path=RESULTS):
+    """Merge per-job results files into one report: return (tests, failures, skipped)."""
+    merged = ET.Element('testsuites', name='results')
+    tests = failures = skipped = 0
+    for name in names:
+        try:
+            root = ET.parse(f'results_{name}.xml').getroot()
+        except (OSError, ET.ParseError):
+            continue  # reported as a failed job
+        for suite in root.iter('testsuite'):
+            suite.set('name', name)
+            for case in suite.iter('testcase'):
+                tests += 1
+                failures += case.find('failure') is not None or case.find('error') is not None
+                skipped += case.find('skipped') is not None
+            merged.append(suite)
+    ET.ElementTree(merged).write(path)
+    return tests, failures, skipped
+
+def main():
+    parser = argparse.ArgumentParser(description='Run maths test benches in parallel.')
+    parser.add_argument('benches', nargs='*', default=BENCHES, help='test benches to run')
+    parser.add_argument('--sim', default=os.environ.get('SIM', 'icarus'), help='icarus or verilator')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count(), help='concurrent simulations')
+    parser.add_argument('--sweep', action='store_true', help='run exhaustive operand sweeps')
+    parser.add_argument('-s', '--shards', type=int, default=1, help='shards per sweep')
+    args = parser.parse_args()
+
+    todo = list(jobs(args.benches, args.sweep, args.shards))
+    with ThreadPoolExecutor(max_workers=args.jobs) as pool:
+        codes = dict(pool.map(lambda job: run(*job, args.sim), todo))
+
+    bad = [name for name, code in codes.items() if code != 0]
+    for name in bad:
+        print(f'{name}: make failed, see {name}.log')
+    capture(todo, args.sim)
+    tests, failures, skipped = merge(codes)
+    print(f'{RESULTS}: TESTS={tests} PASS={tests-failures-skipped} FAIL={failures} SKIP={skipped}')
+    return 1 if bad or failures else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
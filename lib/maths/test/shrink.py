@@ -0,0 +1,117 @@
+## Project F Library - Failing Operand Shrinker (cocotb)
+## (C)2023 Will Green, open source software released under the MIT License
+## Learn more at https://projectf.io/verilog-lib/
+
+# When a streamed div or mul operation fails, the stream driver hands its
+# operands to a Shrinker. It tries simpler operands one at a time on the same
+# DUT (zero and one, positive signs, fewer fractional bits, fewer set bits,
+# smaller magnitudes) and keeps any that still fail, until nothing simpler
+# fails or SHRINK_STEPS operations have run. The smallest failing operands are
+# logged as a directed test, ready to paste into the bench, and written to
+# shrunk_<core>.txt.
+
+import os
+
+from bench import params
+import cycle
+import model
+
+SHRINK_STEPS = int(os.environ.get('SHRINK_STEPS', 200))  # operations tried while shrinking (0 disables)
+DIRECTED = {  # core: bench helper and check for directed tests, and the operator they print
+    'div': ('test_dut_divide', 'check_divide', '/'),
+    'mul': ('test_dut_multiply', 'check_multiply', '*'),
+}
+
+def _rank(x):
+    """Simpler operands rank lower: smaller magnitude, then positive."""
+    return abs(x), x < 0
+
+def simpler(x, lo, hi):
+    """Operands in [lo, hi) simpler than x, simplest first."""
+    mag, sign = abs(x), -1 if x < 0 else 1
+    out = [0, 1, -1, -x]
+    out += [sign * (mag >> k) for k in range(mag.bit_length(), 0, -1)]     # much smaller
+    out += [sign * (mag >> k << k) for k in range(mag.bit_length(), 0, -1)]  # fewer low bits
+    out += [sign * (mag & ~(1 << i)) for i in reversed(range(mag.bit_length())) if mag >> i & 1]
+    out += [sign * (mag - 1)]
+    seen, keep = set(), []
+    for c in out:
+        if lo <= c < hi and _rank(c) < _rank(x) and c not in seen:
+            seen.add(c)
+            keep.append(c)
+    return keep
+
+class Shrinker:
+    """Shrinks failing (a, b) operands of div or mul and formats a directed test."""
+
+    def __init__(self, core, width, fbits, helper, check, op, steps=SHRINK_STEPS):
+        self.core, self.width, self.fbits = core, width, fbits
+        self.gold, self.fast = getattr(model, core), getattr(cycle, core)
+        self.helper, self.check, self.op = helper, check, op  # e.g. test_dut_divide, check_divide, '/'
+        self.lo, self.hi = -2**(width-1), 2**(width-1)
+        self.steps = steps
+
+    def expect(self, operands):
+        """Expected results row and latency for raw operands."""
+        row = tuple(int(x) for x in self.gold(*operands, self.width, self.fbits))
+        return row, int(self.fast(*operands, self.width, self.fbits)[-1])
+
+    async def run(self, dut, operands, fails):
+        """Shrink operands with fails(operands), a coroutine returning the failure message or None.
+
+        Returns the smallest failing operands found."""
+        if self.steps <= 0:
+            return list(operands)
+        best, reason, tries = list(operands), None, 0
+        progress = True
+        while progress and tries < self.steps:
+            progress = False
+            for i in range(len(best)):
+                for c in simpler(best[i], self.lo, self.hi):
+                    if tries >= self.steps:
+                        break
+                    trial = best[:i] + [c] + best[i+1:]
+                    tries += 1
+                    message = await fails(trial)
+                    if message:
+                        best, reason, progress = trial, message, True
+                        break
+        if reason is None:
+            reason = 'only the original operands fail'
+        text = self.directed(best, timing='cycle model' in reason)
+        dut._log.error(f'shrunk {self.op.join(map(str, operands))} to {self.op.join(map(str, best))} '
+                       f'(raw) in {tries} operations: {reason}')
+        dut._log.error('directed test:\n' + text)
+        with open(f'shrunk_{self.core}.txt', 'a') as f:
+            f.write(text + '\n')
+        return best
+
+    def _value(self, raw):
+        """Raw fixed-point operand as a literal for the directed test helpers."""
+        if raw % 2**self.fbits == 0:
+            return str(raw // 2**self.fbits)
+        return repr(raw / 2**self.fbits)
+
+    def directed(self, operands, timing=False):
+        """Directed test for the operands at the current parameters (timing: failed on latency)."""
+        (val, *flags), _ = self.expect(operands)
+        params = f'WIDTH={self.width} FBITS={self.fbits}'
+        if not any(flags) and not timing:  # valid result: use the bench's directed test helper
+            a, b = (self._value(x) for x in operands)
+            return '\n'.join([
+                '@cocotb.test()',
+                'async def shrunk_1(dut):',
+                f'    """Test {a}{self.op}{b} [shrunk, {params}]"""',
+                f'    await {self.helper}(dut=dut, a={a}, b={b})'])
+        a, b = operands  # dbz, ovf, or latency: stream the raw operands, checking cycles exactly
+        return '\n'.join([
+            '@cocotb.test()',
+            'async def shrunk_1(dut):',
+            f'    """Test {a}{self.op}{b} raw [shrunk, {params}]"""',
+            '    await start_dut(dut)',
+            f'    await stream_model(dut, ([{a}], [{b}]), {self.check}, signed=True)'])
+
+def shrinker(dut):
+    """Shrinks failing streamed operands of a div or mul DUT to a directed test."""
+    width, fbits = params(dut)
+    return Shrinker(dut._name, width, fbits, *DIRECTED[dut._name])
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+## Project F Library - Maths Simulator Benchmark
+## (C)2023 Will Green, open source software released under the MIT License
+## Learn more at https://projectf.io/verilog-lib/
+
+# Streams fixed workloads (the stream test with the same number of operations
+# for div and mul at several widths) through Icarus Verilog and Verilator, and
+# reports operations per second, simulated cycles per second, and how test
+# time splits between the Python test bench and the simulator. For the split,
+# each workload's cycles are simulated again by simonly.py, with the DUT
+# calculating but no test code between edges. Only test time counts; compiled
+# models are reused between runs.
+#
+# Each run is appended to a JSON history file, one entry per simulator. A
+# workload is flagged as a regression if its operations per second fall more
+# than THRESHOLD below the median of its last few runs with the same
+# simulator, host, and size; the script then exits 1. Runs always simulate:
+# the results cache isn't used.
+#
+#   python3 simbench.py                      # 100k ops: div and mul at WIDTH 9, 16, 32
+#   python3 simbench.py --ops 10000 --sim verilator div
+#   python3 simbench.py --threshold 0.2 --no-record
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import xml.etree.ElementTree as ET
+
+import cache
+
+SIMS = {'icarus': 'iverilog', 'verilator': 'verilator'}  # simulator: command
+WORKLOADS = {  # name: (bench, params)
+    'div_w9':  ('div', 'WIDTH=9 FBITS=4'),
+    'div_w16': ('div', 'WIDTH=16 FBITS=8'),
+    'div_w32': ('div', 'WIDTH=32 FBITS=16'),
+    'mul_w9':  ('mul', 'WIDTH=9 FBITS=4'),
+    'mul_w16': ('mul', 'WIDTH=16 FBITS=8'),
+    'mul_w32': ('mul', 'WIDTH=32 FBITS=16'),
+}
+HISTORY = 'perf_history.json'  # kept by make clean
+THRESHOLD = 0.1  # flag slowdowns of more than 10%
+WINDOW = 5  # compare with the median of this many previous runs
+CLOCK_NS = 1  # test bench clock period
+
+def simulate(name, bench, params, sim, testcase, env, module=None):
+    """Run one test in its workload's build dir: (test seconds, simulated ns) or None if it failed."""
+    results = f'results_bench_{name}_{sim}_{testcase}.xml'
+    if os.path.exists(results):
+        os.remove(results)
+    cmd = ['make', '-f', f'{bench}.mk', f'SIM={sim}', f'PARAMS={params}',
+           f'SIM_BUILD=sim_build_bench_{name}_{sim}', f'COCOTB_RESULTS_FILE={results}', f'TESTCASE={testcase}']
+    if module:
+        cmd.append(f'MODULE={module}')
+    with open(f'bench_{name}_{sim}_{testcase}.log', 'w') as log:
+        proc = subprocess.run(cmd, env={**os.environ, **env}, stdout=log, stderr=subprocess.STDOUT)
+    if proc.returncode or not cache.passed(results):
+        return None
+    case = ET.parse(results).getroot().find('.//testcase')
+    return float(case.get('time')), float(case.get('sim_time_ns'))
+
+def measure(name, sim, ops):
+    """Measure one workload on one simulator: dict of rates and time split, or None if a run failed."""
+    bench, params = WORKLOADS[name]
+    stream = simulate(name, bench, params, sim, 'stream_1', {'STREAM_OPS': str(ops), 'SWEEP': '0'})
+    if stream is None:
+        return None
+    seconds, sim_ns = stream
+    cycles = int(sim_ns / CLOCK_NS)
+    base = simulate(name, bench, params, sim, 'simonly_1', {'SIM_CYCLES': str(cycles)}, module='simonly')
+    if base is None:
+        return None
+    sim_seconds = min(base[0], seconds)
+    return {
+        'seconds': round(seconds, 3),
+        'cycles': cycles,
+        'ops_per_sec': round(ops / seconds, 1),
+        'cycles_per_sec': round(cycles / seconds, 1),
+        'sim_seconds': round(sim_seconds, 3),  # simulator and clock
+        'python_seconds': round(seconds - sim_seconds, 3),  # test bench code
+    }
+
+def load(path):
+    """Previous runs from a history file, oldest first."""
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return []
+
+def baseline(history, run, name):
+    """Median ops/s of the workload's last WINDOW comparable runs, or None."""
+    rates = [past['results'][name]['ops_per_sec'] for past in history
+             if (past['sim'], past['host'], past['ops']) == (run['sim'], run['host'], run['ops'])
+             and name in past['results']]
+    return statistics.median(rates[-WINDOW:]) if rates else None
+
+def commit():
+    """Short hash of the checked-out commit, with + if the tree has changes."""
+    try:
+        head = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True)
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--', '..'], capture_output=True, text=True)
+    except OSError:
+        return None
+    return head.stdout.strip() + ('+' if dirty.stdout.strip() else '') if head.returncode == 0 else None
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark maths test bench throughput and track regressions.')
+    parser.add_argument('workloads', nargs='*', default=list(WORKLOADS),
+                        help='workloads, or benches to run all their widths (div, mul)')
+    parser.add_argument('--ops', type=int, default=100000, help='operations per workload')
+    parser.add_argument('--sim', action='append', choices=list(SIMS),
+                        help='simulator to run (repeat for more; default: all installed)')
+    parser.add_argument('--history', default=HISTORY, help='JSON history file')
+    parser.add_argument('--threshold', type=float, default=THRESHOLD, help='slowdown to flag, e.g. 0.1 for 10%%')
+    parser.add_argument('--no-record', action='store_true', help="don't append this run to the history")
+    args = parser.parse_args()
+
+    names = [name for want in args.workloads for name in WORKLOADS if want in (name, WORKLOADS[name][0])]
+    if not names:
+        parser.error(f'choose from {", ".join(WORKLOADS)}, div, or mul')
+    sims = args.sim or [sim for sim, cmd in SIMS.items() if shutil.which(cmd)]
+    if not sims:
+        sys.exit('no supported simulator found')
+    history = load(args.history)
+    date, head = datetime.datetime.now().isoformat(timespec='seconds'), commit()
+    runs = {sim: {
+        'date': date,
+        'commit': head,
+        'host': platform.node(),
+        'sim': sim,
+        'versions': list(cache.tool_versions(sim)),
+        'ops': args.ops,
+        'results': {},
+    } for sim in sims}
+
+    print(f'{"workload":<10}{"sim":<11}{"ops/s":>12}{"cycles/s":>14}{"python":>9}{"sim":>7}{"baseline":>12}')
+    failed, slower = [], []
+    for name in names:
+        for sim, run in runs.items():
+            result = measure(name, sim, args.ops)
+            if result is None:
+                failed.append(f'{name} ({sim})')
+                print(f'{name:<10}{sim:<11}{"failed":>12}')
+                continue
+            run['results'][name] = result
+            share = result['python_seconds'] / result['seconds']
+            base = baseline(history, run, name)
+            line = (f'{name:<10}{sim:<11}{result["ops_per_sec"]:>12,.0f}{result["cycles_per_sec"]:>14,.0f}'
+                    f'{share:>9.0%}{1-share:>7.0%}')
+            if base:
+                change = result['ops_per_sec'] / base - 1
+                line += f'{change:>+12.1%}'
+                if change < -args.threshold:
+                    slower.append(f'{name} ({sim})')
+                    line += '  REGRESSION'
+            print(line)
+
+    if len(sims) > 1:  # side by side: last simulator against the first
+        first, last = runs[sims[0]]['results'], runs[sims[-1]]['results']
+        ratios = [f'{name} {last[name]["ops_per_sec"] / first[name]["ops_per_sec"]:.1f}x'
+                  for name in names if name in first and name in last]
+        print(f'{sims[-1]}/{sims[0]} ops/s: {", ".join(ratios) or "n/a"}')
+    if not args.no_record and any(run['results'] for run in runs.values()):
+        with open(args.history, 'w') as f:
+            json.dump(history + [run for run in runs.values() if run['results']], f, indent=1)
+    for name in failed:
+        print(f'{name}: make failed, see bench_{name.split()[0]}_*.log')
+    if slower:
+        print(f'slower than the median of the last {WINDOW} runs by more than {args.threshold:.0%}: {", ".join(slower)}')
+    return 1 if failed or slower else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
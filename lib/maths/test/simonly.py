@@ -0,0 +1,32 @@
+## Project F Library - Simulator-Only Workload (cocotb)
+## (C)2023 Will Green, open source software released under the MIT License
+## Learn more at https://projectf.io/verilog-lib/
+
+# Baseline for simbench.py: runs a div or mul DUT for SIM_CYCLES with start held
+# high, so it calculates back-to-back, but no test code runs between edges.
+# The time taken is the simulator and clock alone; the stream test's extra
+# time for the same cycles is the Python test bench (driving, checking, models).
+
+import os
+
+import cocotb
+from cocotb.clock import Clock
+from cocotb.triggers import RisingEdge, Timer, with_timeout
+
+SIM_CYCLES = int(os.environ.get('SIM_CYCLES', 100000))  # clock cycles to simulate
+
+@cocotb.test()
+async def simonly_1(dut):
+    """Run the DUT back-to-back for SIM_CYCLES without test code"""
+    cocotb.start_soon(Clock(dut.clk, 1, units="ns").start())
+    dut.a.value = 1
+    dut.b.value = 1
+    dut.start.value = 0
+    dut.rst.value = 1
+    await RisingEdge(dut.clk)
+    await RisingEdge(dut.clk)
+    dut.rst.value = 0
+    dut.start.value = 1
+
+    await Timer(SIM_CYCLES, units='ns')
+    await with_timeout(RisingEdge(dut.done), 1000, 'ns')  # still calculating
@@ -0,0 +1,34 @@
+## Project F Library - sine_table cocotb Test Bench Makefile
+## (C)2023 Will Green, open source software released under the MIT License
+## Learn more at https://projectf.io/verilog-lib/
+
+SIM ?= icarus
+TOPLEVEL_LANG ?= verilog
+
+DUT = sine_table
+VERILOG_SOURCES += $(PWD)/../${DUT}.sv $(PWD)/../../memory/rom_async.sv
+TOPLEVEL = ${DUT}
+MODULE = ${DUT}
+
+# Verilog module parameters (passed to the simulator by lib/params.mk)
+PARAMS = ROM_DEPTH=64 ROM_WIDTH=8
+
+# each test Makefile needs its own build dir and results file
+COCOTB_RESULTS_FILE = results_${DUT}.xml
+SIM_BUILD = sim_build_${DUT}_${SIM}
+
+# generate the ROM for the parameters (which may be overridden) with sinerom.py
+ROM_DEPTH := $(patsubst ROM_DEPTH=%,%,$(filter ROM_DEPTH=%,$(PARAMS)))
+ROM_WIDTH := $(patsubst ROM_WIDTH=%,%,$(filter ROM_WIDTH=%,$(PARAMS)))
+ROM_FILE := $(PWD)/$(SIM_BUILD)/sine_table_$(ROM_DEPTH)x$(ROM_WIDTH).mem
+override PARAMS += ROM_FILE=\"$(ROM_FILE)\"
+
+CUSTOM_SIM_DEPS += $(ROM_FILE)
+
+include ../../params.mk
+
+# include cocotb's make rules to take care of the simulator setup
+include $(shell cocotb-config --makefiles)/Makefile.sim
+
+$(ROM_FILE): sinerom.py model.py
+	python3 sinerom.py $(ROM_DEPTH) $(ROM_WIDTH) -o $@
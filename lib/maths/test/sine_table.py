@@ -0,0 +1,91 @@
+## Project F Library - sine_table Test Bench (cocotb)
+## (C)2023 Will Green, open source software released under the MIT License
+## Learn more at https://projectf.io/verilog-lib/
+
+# sine_table is combinational: each test sets id, waits a nanosecond, and
+# reads data. The ROM file is generated for the Makefile PARAMS by sinerom.py.
+
+import os
+
+import cocotb
+import numpy as np
+from cocotb.triggers import Timer
+
+import model
+
+RES_DIR = os.path.join(os.path.dirname(__file__), '..', 'res')  # shipped ROM files
+
+def params(dut):
+    """Read module parameters from the DUT: (ROM_DEPTH, ROM_WIDTH)."""
+    return int(dut.ROM_DEPTH.value), int(dut.ROM_WIDTH.value)
+
+async def lookup(dut, i):
+    """Signed table output for id i."""
+    dut.id.value = i
+    await Timer(1, units='ns')
+    return dut.data.value.signed_integer
+
+def read_mem(path):
+    """Entries of a $readmemh file, ignoring comments."""
+    with open(path) as f:
+        return [int(line.split('//')[0], 16) for line in f if line.split('//')[0].strip()]
+
+
+# quadrant tests: symmetry of the DUT output alone, without the model
+@cocotb.test()
+async def quadrant_1(dut):
+    """Test quadrant boundaries: 0, +-1.0 at 90 and 270 degrees, 0 at 180"""
+    depth, width = params(dut)
+
+    assert await lookup(dut, 0) == 0, "sin(0) isn't 0!"
+    assert await lookup(dut, depth) == 2**width, "sin(90) isn't +1.0!"
+    assert await lookup(dut, 2*depth) == 0, "sin(180) isn't 0!"
+    assert await lookup(dut, 3*depth) == -2**width, "sin(270) isn't -1.0!"
+
+@cocotb.test()
+async def quadrant_2(dut):
+    """Test quadrants II, III, and IV mirror quadrant I"""
+    depth, _ = params(dut)
+
+    for k in range(1, depth):
+        first = await lookup(dut, k)
+        assert await lookup(dut, 2*depth - k) == first, f"quadrant II doesn't mirror I at id {2*depth-k}!"
+        assert await lookup(dut, 2*depth + k) == -first, f"quadrant III doesn't negate I at id {2*depth+k}!"
+        assert await lookup(dut, 4*depth - k) == -first, f"quadrant IV doesn't mirror III at id {4*depth-k}!"
+
+
+# full circle: every id in one simulation against the model
+@cocotb.test()
+async def circle_1(dut):
+    """Test every id against the model and the exact sine"""
+    depth, width = params(dut)
+
+    ids = np.arange(4*depth)
+    data = np.array([await lookup(dut, i) for i in ids.tolist()])
+    expect = model.sine_table(ids, model.sine_rom(depth, width), width)
+
+    bad = np.flatnonzero(data != expect)
+    for i in bad[:16].tolist():
+        dut._log.error(f'id {i}: dut {data[i]} model {expect[i]}')
+    assert len(bad) == 0, f"{len(bad)} of {len(ids)} ids don't match model!"
+
+    # error against the exact sine in LSBs: rounding gives up to 0.5, clipping below +1.0 up to 1
+    err = model.sine_error(ids, data, depth, width)
+    worst = int(np.abs(err).argmax())
+    dut._log.info(f'ROM_DEPTH={depth} ROM_WIDTH={width} ({depth*width} bits): '
+                  f'max error {abs(err[worst]):.3f} LSB at id {worst}, rms {np.sqrt(np.mean(err**2)):.3f} LSB, '
+                  f'bias {err.mean():+.4f} LSB')
+    assert np.abs(err).max() < 1, f"error at id {worst} is 1 LSB or more!"
+
+
+# shipped ROM files
+@cocotb.test()
+async def rom_1(dut):
+    """Test the shipped ROM file for these parameters matches the generator"""
+    depth, width = params(dut)
+
+    path = os.path.join(RES_DIR, f'sine_table_{depth}x{width}.mem')
+    if not os.path.exists(path):
+        dut._log.info(f'no shipped ROM for ROM_DEPTH={depth} ROM_WIDTH={width}')
+        return
+    assert read_mem(path) == model.sine_rom(depth, width).tolist(), f"{path} doesn't match sinerom.py!"
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+## Project F Library - Sine Table ROM Generator
+## (C)2023 Will Green, open source software released under the MIT License
+## Learn more at https://projectf.io/verilog-lib/
+
+# Writes the quadrant ROM for sine_table.sv as a $readmemh file for any
+# ROM_DEPTH and ROM_WIDTH, using the same values as res/sine_table_64x8.mem.
+# With --stats it lists the error of each table size instead, so you can pick
+# the smallest ROM that meets an accuracy target.
+#
+#   python3 sinerom.py 64 8 -o ../res/sine_table_64x8.mem
+#   python3 sinerom.py --stats --depths 16 32 64 128 --widths 6 8 10 --target 0.01
+
+import argparse
+import sys
+
+import numpy as np
+
+import model
+
+def mem_lines(depth, width):
+    """Lines of the ROM file: one hex entry per line with its angle and sine."""
+    rom = model.sine_rom(depth, width)
+    angle = np.arange(depth) * (np.pi/2) / depth
+    digits, places = -(-width // 4), max(3, len(str(depth-1)))
+    yield '// Generated by sinerom.py from Project F'
+    yield '// Learn more at https://projectf.io/verilog-lib/'
+    for i, (value, a) in enumerate(zip(rom.tolist(), angle.tolist())):
+        yield f'{value:0{digits}X}  // {i:0{places}}: sin({a:.4f}) = {np.sin(a):.4f}'
+
+def stats(depth, width):
+    """Worst-case error over the full circle as fractions of 1.0: (sample, angle).
+
+    sample is the error at each table angle; angle adds the step to the next
+    entry, the error when a continuous angle is truncated to a table id."""
+    rom = model.sine_rom(depth, width)
+    ids = np.arange(4*depth)
+    data = model.sine_table(ids, rom, width)
+    sample = np.abs(model.sine_error(ids, data, depth, width)).max() / 2**width
+    after = np.abs(model.sine_error(ids + 1, data, depth, width)).max() / 2**width
+    return sample, max(sample, after)
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate sine_table.sv ROM files.')
+    parser.add_argument('depth', type=int, nargs='?', default=64, help='ROM_DEPTH: entries for 0 to 90 degrees')
+    parser.add_argument('width', type=int, nargs='?', default=8, help='ROM_WIDTH: bits per entry')
+    parser.add_argument('-o', '--output', help='ROM file to write (default: stdout)')
+    parser.add_argument('--stats', action='store_true', help='list error by table size instead')
+    parser.add_argument('--depths', type=int, nargs='+', default=[16, 32, 64, 128, 256, 512, 1024])
+    parser.add_argument('--widths', type=int, nargs='+', default=[6, 8, 10, 12, 16])
+    parser.add_argument('--target', type=float, help='only list sizes with angle error up to this')
+    args = parser.parse_args()
+
+    if args.stats:
+        sizes = sorted((d*w, d, w) for d in args.depths for w in args.widths)
+        print(f'{"DEPTH":>6} {"WIDTH":>6} {"BITS":>8} {"SAMPLE":>10} {"ANGLE":>10}')
+        for bits, depth, width in sizes:
+            sample, angle = stats(depth, width)
+            if args.target is None or angle <= args.target:
+                print(f'{depth:>6} {width:>6} {bits:>8} {sample:>10.6f} {angle:>10.6f}')
+        return 0
+
+    if args.depth & (args.depth-1) or args.depth < 2:
+        parser.error('depth must be a power of two')  # sine_table.sv folds quadrants on address bits
+    out = open(args.output, 'w') if args.output else sys.stdout
+    out.write('\n'.join(mem_lines(args.depth, args.width)) + '\n')
+    if args.output:
+        out.close()
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,141 @@
+## Project F Library - sqrt Test Bench (cocotb)
+## (C)2023 Will Green, open source software released under the MIT License
+## Learn more at https://projectf.io/verilog-lib/
+
+import random
+
+import cocotb
+import numpy as np
+from cocotb.triggers import RisingEdge
+
+from bench import Driver, SHARD, SHARDS, STREAM_OPS, SWEEP, max_cycles, params, start_dut
+import model
+from stream import stream_model
+import waves
+
+# stream and sweep work with any parameters where WIDTH+FBITS is even (the core takes radicand bits in pairs)
+def check_root(dut, rad, root, rem):
+    assert dut.valid.value == 1, f"valid is not 1 for sqrt({rad})!"
+    assert dut.root.value == root, f"dut root doesn't match model root for sqrt({rad})"
+    assert dut.rem.value == rem, f"dut rem doesn't match model rem for sqrt({rad})"
+
+async def test_dut_sqrt(dut, rad, log=False):
+    width, fbits = params(dut)
+
+    await start_dut(dut, reset=False)
+
+    await RisingEdge(dut.clk)
+    rad = int(rad * 2**fbits)  # scale input to raw fixed-point value
+    await Driver(dut, max_cycles(dut), inputs=('rad',)).run(rad)
+
+    # model root and remainder from the raw value driven onto the DUT
+    model_root, model_rem = (int(x) for x in model.sqrt(rad, width, fbits))
+
+    root = dut.root.value.integer
+
+    # log numerical signals on a mismatch (or always with log=True)
+    if log or root != model_root or dut.rem.value != model_rem:
+        dut._log.info('dut rad:     ' + dut.rad.value.binstr)
+        dut._log.info('dut root:    ' + dut.root.value.binstr)
+        dut._log.info('             ' + f'{root/2**fbits:.{fbits}f}')
+        dut._log.info('dut rem:     ' + dut.rem.value.binstr)
+        dut._log.info('model root:  ' + f'{model_root:0{width}b}')
+        dut._log.info('             ' + f'{model_root/2**fbits:.{fbits}f}')
+        dut._log.info('model rem:   ' + f'{model_rem:0{width}b}')
+
+    # check output signals on 'valid'
+    assert dut.busy.value == 0, "busy is not 0!"
+    assert dut.valid.value == 1, "valid is not 1!"
+    assert root == model_root, "dut root doesn't match model root"
+    assert dut.rem.value == model_rem, "dut rem doesn't match model rem"
+
+    # check 'valid' holds until the next start
+    await RisingEdge(dut.clk)
+    assert dut.valid.value == 1, "valid is not 1!"
+
+
+# perfect squares
+@cocotb.test()
+async def square_1(dut):
+    """Test sqrt(0)"""
+    await test_dut_sqrt(dut=dut, rad=0)
+
+@cocotb.test()
+async def square_2(dut):
+    """Test sqrt(1)"""
+    await test_dut_sqrt(dut=dut, rad=1)
+
+@cocotb.test()
+async def square_3(dut):
+    """Test sqrt(0.25)"""
+    await test_dut_sqrt(dut=dut, rad=0.25)
+
+@cocotb.test()
+async def square_4(dut):
+    """Test sqrt(232.5625)"""
+    await test_dut_sqrt(dut=dut, rad=232.5625)
+
+
+# irrational roots (rounded down)
+@cocotb.test()
+async def irr_1(dut):
+    """Test sqrt(2)"""
+    await test_dut_sqrt(dut=dut, rad=2)
+
+@cocotb.test()
+async def irr_2(dut):
+    """Test sqrt(0.5)"""
+    await test_dut_sqrt(dut=dut, rad=0.5)
+
+@cocotb.test()
+async def irr_3(dut):
+    """Test sqrt(90.125)"""
+    await test_dut_sqrt(dut=dut, rad=90.125)
+
+
+# min and max edge tests
+@cocotb.test()
+async def min_1(dut):
+    """Test sqrt(0.00390625)"""
+    await test_dut_sqrt(dut=dut, rad=0.00390625)
+
+@cocotb.test()
+async def max_1(dut):
+    """Test sqrt(255.99609375)"""
+    await test_dut_sqrt(dut=dut, rad=255.99609375)
+
+
+# streaming tests: operations back-to-back
+@cocotb.test()
+async def stream_1(dut):
+    """Stream random radicands"""
+    width, _ = params(dut)
+
+    await start_dut(dut, reset=False)
+
+    rad = [random.randrange(2**width) for _ in range(STREAM_OPS)]
+    count = await stream_model(dut, (rad,), check_root, inputs=('rad',))
+    dut._log.info(f'streamed {count} operations')
+
+
+# exhaustive sweep: every radicand, checked against a precomputed table
+@cocotb.test(skip=not SWEEP)
+async def sweep_1(dut):
+    """Sweep every radicand (or one shard of them)"""
+    width, _ = params(dut)
+
+    rad = np.array_split(np.arange(2**width), SHARDS)[SHARD]
+
+    await start_dut(dut, reset=False)
+    count = await stream_model(dut, (rad,), check_root, inputs=('rad',))
+    dut._log.info(f'swept {count} radicands')
+
+
+# replay one failed operation, for waveform capture (see waves.py)
+@cocotb.test(skip=not waves.REPLAY)
+async def replay_1(dut):
+    """Replay the raw radicand in REPLAY"""
+    rad, = waves.replay()
+
+    await start_dut(dut, reset=False)
+    await stream_model(dut, ([rad],), check_root, inputs=('rad',))
@@ -0,0 +1,94 @@
+## Project F Library - Streaming Test Bench Driver (cocotb)
+## (C)2023 Will Green, open source software released under the MIT License
+## Learn more at https://projectf.io/verilog-lib/
+
+# Drives maths cores with a start/done handshake (div, divu, divu_int, mul), or
+# start/valid for cores without done (sqrt, sqrt_int), through the bench.py
+# driver. The caller starts the clock and resets the DUT once, then streams
+# operands: start is raised again on the cycle after done, so each operation
+# costs only the DUT's own latency rather than a reset and several idle cycles.
+#
+# Each operation's latency, from the clock edge that samples start to done, is
+# counted into a histogram and checked against the DUT's cycle budget: an
+# operation that overruns fails at once rather than hanging the simulation.
+# Given the expected latencies from the cycle-accurate models (cycle.py), each
+# operation must also take exactly that many cycles.
+#
+# A failed operation is added to the run's failure report, so it can be
+# replayed alone with waveforms (waves.py).
+#
+# stream_model streams lists of operands through a core, taking the expected
+# results from the golden model (model.py) and the latencies from the cycle
+# model (cycle.py) of the same name.
+
+from collections import Counter
+
+from bench import Driver, max_cycles
+import cycle
+import model
+from txlog import TxLog
+import waves
+
+def params_str(dut):
+    """Module parameters of a maths DUT, e.g. 'WIDTH=9 FBITS=4'."""
+    return ' '.join(f'{p}={int(getattr(dut, p).value)}' for p in ('WIDTH', 'FBITS') if hasattr(dut, p))
+
+async def stream_dut(dut, ops, check, budget, signed=False, inputs=('a', 'b'), cycles=None, shrink=None):
+    """Drive (*inputs, *expected) rows back-to-back, calling check(dut, *inputs, *expected) on each 'done'.
+
+    Each operation must finish within budget cycles, or in exactly the cycles given for it. On a
+    mismatch, a Shrinker (shrink.py) reduces the failing operands before the test fails."""
+    txlog = TxLog(dut, (*inputs, 'val', 'root', 'rem'), ('valid', 'dbz', 'ovf'), signed=signed)
+    driver = Driver(dut, budget, inputs)
+    expect = iter(cycles) if cycles is not None else None
+    latency = Counter()
+
+    async def drive(op):
+        """Start one operation and wait for it to complete: return its latency."""
+        taken = await driver.run(*op[:len(inputs)])
+        latency[taken] += 1
+        return taken
+
+    def verify(op, taken, want):
+        """Check output signals on 'done' (next operation starts this cycle)."""
+        txlog.record()
+        assert dut.busy.value == 0, "busy is not 0!"
+        if want is not None:
+            assert taken == want, f"took {taken} cycles, cycle model expects {want}!"
+        check(dut, *op)
+
+    async def fails(operands):
+        """Failure message for one operation with expected results from the shrinker, or None."""
+        row, want = shrink.expect(operands)
+        op = (*operands, *row)
+        try:
+            verify(op, await drive(op), want)
+        except AssertionError as e:
+            return str(e).splitlines()[0]
+        return None
+
+    for op in ops:
+        taken = await drive(op)
+        try:
+            verify(op, taken, next(expect) if expect is not None else None)
+        except AssertionError as e:
+            txlog.mismatch()  # only failures are formatted
+            operands = op[:len(inputs)]
+            if shrink is not None:
+                operands = await shrink.run(dut, operands, fails)
+            waves.report(dut, operands, params_str(dut), 'first failure: ' + str(e).splitlines()[0])
+            raise
+
+    dut._log.info(txlog.summary())
+    dut._log.info(f'latency {params_str(dut)} (budget {budget}): ' +
+                  ', '.join(f'{cycles} cycles x{n}' for cycles, n in sorted(latency.items())))
+    return txlog.total
+
+async def stream_model(dut, operands, check, **kwargs):
+    """Stream operand lists, e.g. (a, b), through the DUT, expecting the results and latencies of its models.
+
+    Keyword arguments (signed, inputs, shrink) are passed on to stream_dut: returns its count."""
+    core, p = dut._name, [int(getattr(dut, n).value) for n in ('WIDTH', 'FBITS') if hasattr(dut, n)]
+    ops = model.vectors(getattr(model, core), operands, *p)
+    cycles = getattr(cycle, core)(*operands, *p)[-1].tolist()
+    return await stream_dut(dut, ops, check, max_cycles(dut), cycles=cycles, **kwargs)
@@ -0,0 +1,67 @@
+## Project F Library - Transaction Log for Test Benches (cocotb)
+## (C)2023 Will Green, open source software released under the MIT License
+## Learn more at https://projectf.io/verilog-lib/
+
+# Records the signals of each transaction as raw integers in a fixed-size ring
+# buffer and counts outcomes. Nothing is formatted while checks pass; when one
+# fails, the last LOG_DEPTH transactions are printed in binary and decimal.
+# Recorded signals can be up to 64 bits wide.
+
+import os
+from array import array
+
+LOG_DEPTH = int(os.environ.get('LOG_DEPTH', 16))  # transactions shown on a mismatch
+
+class TxLog:
+    """Ring buffer of DUT transactions with counts by outcome."""
+
+    def __init__(self, dut, signals, flags, depth=LOG_DEPTH, signed=False):
+        self.dut = dut
+        self.names = [name for name in signals if hasattr(dut, name)]
+        self.handles = [getattr(dut, name) for name in self.names]
+        self.widths = [len(handle) for handle in self.handles]
+        self.flags = [name for name in flags if hasattr(dut, name)]
+        self.flag_handles = [getattr(dut, name) for name in self.flags]
+        self.signed = signed
+        self.depth = depth
+        self.stride = len(self.handles) + 1  # signals then flag bits
+        self.ring = array('Q', bytes(8 * self.stride * depth))
+        self.counts = dict.fromkeys(self.flags + ['mismatch'], 0)
+        self.total = 0
+
+    def record(self):
+        """Store the current DUT signals as the next transaction."""
+        base = (self.total % self.depth) * self.stride
+        for i, handle in enumerate(self.handles):
+            self.ring[base + i] = handle.value.integer
+        bits = 0
+        for i, handle in enumerate(self.flag_handles):
+            if handle.value:
+                bits |= 1 << i
+                self.counts[self.flags[i]] += 1
+        self.ring[base + self.stride - 1] = bits
+        self.total += 1
+
+    def mismatch(self):
+        """Count a failed check on the latest transaction and log the window before it."""
+        self.counts['mismatch'] += 1
+        self.dut._log.error(f'mismatch on transaction {self.total-1}, last {min(self.total, self.depth)}:')
+        for n in range(max(0, self.total - self.depth), self.total):
+            self.dut._log.error(self.format(n) + (' <- mismatch' if n == self.total-1 else ''))
+        self.dut._log.error(self.summary())
+
+    def format(self, n):
+        """Format transaction n (which must still be in the ring)."""
+        base = (n % self.depth) * self.stride
+        fields = []
+        for i, (name, width) in enumerate(zip(self.names, self.widths)):
+            raw = self.ring[base + i]
+            dec = raw - (1 << width) if self.signed and raw >> (width-1) else raw
+            fields.append(f'{name}={raw:0{width}b} ({dec})')
+        bits = self.ring[base + self.stride - 1]
+        fields += [flag for i, flag in enumerate(self.flags) if bits >> i & 1]
+        return f'{n:>8}: ' + ' '.join(fields)
+
+    def summary(self):
+        """Counts of transactions by outcome."""
+        return f'{self.total} transactions: ' + ' '.join(f'{k}={v}' for k, v in self.counts.items())
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+## Project F Library - On-Demand Waveform Capture (cocotb)
+## (C)2023 Will Green, open source software released under the MIT License
+## Learn more at https://projectf.io/verilog-lib/
+
+# Benches run without waveform dumps: writing every signal change of a sweep
+# costs more than simulating it. When a streamed operation fails, stream_dut
+# appends its operands (after shrinking, for div and mul) and the module
+# parameters to a failure report, failed_<run>.txt, where <run> comes from the
+# results file: failed_div.txt, failed_div_sweep3.txt. capture() then simulates
+# only the last failed operation again, from reset, in a separate build with
+# cocotb's FST dumping on (make WAVES=1, see lib/params.mk), and moves the dump
+# beside the report as failed_<run>.fst, with a GTKWave view, failed_<run>.gtkw,
+# made from the bench's .gtkw.
+# cache.py and regress.py capture after a failed run; for an earlier report:
+#
+#   python3 waves.py div                          # replay failed_div.txt
+#   python3 waves.py div_sweep3 --bench div --sim verilator
+
+import argparse
+import os
+import re
+import shutil
+import subprocess
+import sys
+
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+REPLAY = os.environ.get('REPLAY')  # operands of one operation to replay, e.g. '3,-7'
+KEEP = ('SIM', 'TOPLEVEL_LANG')  # make variables passed on to a replay; others are set for it
+
+def replay():
+    """Operands to replay as a tuple of ints."""
+    return tuple(int(x) for x in REPLAY.split(','))
+
+def run_name(results=None):
+    """Name of a run from its results file: results_div_sweep3.xml is div_sweep3."""
+    results = os.path.basename(results or os.environ.get('COCOTB_RESULTS_FILE', 'results.xml'))
+    return re.sub(r'^results_?|\.xml$', '', results) or 'run'
+
+def report_path(name):
+    return os.path.join(TEST_DIR, f'failed_{name}.txt')
+
+def report(dut, operands, params, reason):
+    """Add a failed operation to this run's failure report (not while replaying one)."""
+    if REPLAY:
+        return
+    name = run_name()
+    with open(report_path(name), 'a') as f:
+        f.write(f"{','.join(str(int(x)) for x in operands)} {params}  # {reason}\n")
+    dut._log.error(f'operands in failed_{name}.txt: python3 waves.py {name} replays them with waveforms')
+
+def last_failure(name):
+    """(operands, params) of the last operation in a failure report, or None."""
+    try:
+        with open(report_path(name)) as f:
+            lines = [line.split('#')[0].split() for line in f if line.strip()]
+    except OSError:
+        return None
+    return (lines[-1][0], ' '.join(lines[-1][1:])) if lines else None
+
+def view(bench, dump, path):
+    """Write a GTKWave view of dump from the bench's own .gtkw."""
+    with open(os.path.join(TEST_DIR, f'{bench}.gtkw')) as f:
+        text = f.read()
+    text = re.sub(r'^\[dumpfile\].*$', f'[dumpfile] "{os.path.basename(dump)}"', text, flags=re.M)
+    text = re.sub(r'^\[savefile\].*$', f'[savefile] "{os.path.basename(path)}"', text, flags=re.M)
+    with open(path, 'w') as f:
+        f.write(text)
+
+def capture(name, bench=None, sim=None, args=()):
+    """Replay the last failed operation of run name with waveforms: return the .gtkw path, or None.
+
+    args are make variables of the failed run; module parameters come from the report."""
+    bench = bench or name
+    sim = sim or os.environ.get('SIM', 'icarus')
+    failure = last_failure(name)
+    if failure is None:
+        return None
+    with open(os.path.join(TEST_DIR, f'{bench}.py')) as f:
+        replays = 'async def replay_1' in f.read()
+    if not replays or not os.path.exists(os.path.join(TEST_DIR, f'{bench}.gtkw')):
+        print(f'{name}: {bench} has no replay test or .gtkw view, see failed_{name}.txt')
+        return None
+
+    operands, params = failure
+    build = f'sim_build_{bench}_{sim}_waves'  # given on the command line, so we know where the dump goes
+    wrote = os.path.join(TEST_DIR, build, f'{bench}.fst')
+    dump = os.path.join(TEST_DIR, f'failed_{name}.fst')
+    gtkw = os.path.join(TEST_DIR, f'failed_{name}.gtkw')
+    for path in (wrote, dump):
+        if os.path.exists(path):
+            os.remove(path)
+    cmd = ['make', '-f', f'{bench}.mk', f'SIM={sim}', 'WAVES=1', f'SIM_BUILD={build}', 'TESTCASE=replay_1',
+           f'COCOTB_RESULTS_FILE=results_{name}_replay.xml']
+    cmd += [arg for arg in args if arg.split('=')[0] in KEEP]
+    if params:
+        cmd.append(f'PARAMS={params}')
+    with open(os.path.join(TEST_DIR, f'failed_{name}.log'), 'w') as log:
+        subprocess.run(cmd, cwd=TEST_DIR, env={**os.environ, 'REPLAY': operands},
+                       stdout=log, stderr=subprocess.STDOUT)
+    if not os.path.exists(wrote) or not os.path.getsize(wrote):
+        print(f'{name}: replaying {operands} wrote no waveforms, see failed_{name}.log')
+        return None
+    shutil.move(wrote, dump)
+    view(bench, dump, gtkw)
+    print(f'{name}: replayed {operands} ({params}) from reset with waveforms: gtkwave {os.path.relpath(gtkw)}')
+    return gtkw
+
+def main():
+    parser = argparse.ArgumentParser(description='Replay the last failed operation of a run with waveforms.')
+    parser.add_argument('name', help='run with a failure report, e.g. div for failed_div.txt')
+    parser.add_argument('--bench', help='test bench of the run (default: name)')
+    parser.add_argument('--sim', default=os.environ.get('SIM', 'icarus'), help='icarus or verilator')
+    args = parser.parse_args()
+    if last_failure(args.name) is None:
+        print(f'no failed operations in failed_{args.name}.txt', file=sys.stderr)
+        return 1
+    return 0 if capture(args.name, args.bench, args.sim) else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,32 @@
+## Project F Library - cocotb Simulator Parameters Makefile
+## (C)2023 Will Green, open source software released under the MIT License
+## Learn more at https://projectf.io/verilog-lib/
+
+# Shared by the cocotb test benches in lib and demos: include by relative path from a
+# test bench Makefile after setting PARAMS, TOPLEVEL, and SIM_BUILD (include ../../params.mk).
+# PARAMS lists Verilog module parameters, e.g. PARAMS = WIDTH=9 FBITS=4
+
+# pass Verilog module parameters in each simulator's format
+ifeq ($(SIM),icarus)
+    COMPILE_ARGS += $(addprefix -P$(TOPLEVEL).,$(PARAMS))
+else ifeq ($(SIM),verilator)
+    COMPILE_ARGS += $(addprefix -G,$(PARAMS))
+    COMPILE_ARGS += -O3 --x-assign fast --x-initial fast --noassert -Wno-fatal
+else
+    $(error params.mk doesn't support SIM=$(SIM), use icarus or verilator)
+endif
+
+# dump waveforms (WAVES=1) to $(SIM_BUILD)/$(TOPLEVEL).fst, with a separate build so normal runs stay fast:
+# Icarus with cocotb's own dump module (Makefile.icarus), Verilator with its trace of the whole model
+ifeq ($(WAVES),1)
+    SIM_BUILD := $(SIM_BUILD)_waves
+    ifeq ($(SIM),verilator)
+        COMPILE_ARGS += --trace-fst --trace-structs
+        SIM_ARGS += --trace --trace-file $(SIM_BUILD)/$(TOPLEVEL).fst
+    endif
+endif
+
+# reuse the compiled model until the sources or parameters change
+PARAMS_FILE = $(SIM_BUILD)/params.txt
+$(shell mkdir -p $(SIM_BUILD); echo '$(PARAMS)' | cmp -s - $(PARAMS_FILE) || echo '$(PARAMS)' > $(PARAMS_FILE))
+CUSTOM_COMPILE_DEPS += $(PARAMS_FILE)
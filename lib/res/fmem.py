@@ -0,0 +1,609 @@
+#!/usr/bin/env python3
+## Project F Library - Resource Converter for $readmemh Files
+## (C)2023 Will Green, open source software released under the MIT License
+## Learn more at https://projectf.io/verilog-lib/
+
+# Converts PNG images, BDF and Unifont hex fonts, and palette lists into
+# $readmemh (.mem) files at any bit depth, and decodes .mem files back to PNG.
+# Images stream through memory-mapped buffers a block of rows at a time, so a
+# 1080p framebuffer is never in memory whole. The check command decodes
+# existing .mem files to PNG and converts them back, reporting any file whose
+# values don't survive the round trip. An image with one value per line needs
+# its width: from --widths, or a size in its name such as _160x120. Lookup
+# tables (table in the name, or --kind table) are checked one value wide.
+#
+#   python3 fmem.py image photo.png --bits 4 --palette palettes/sweetie16_4b.mem -o photo.mem
+#   python3 fmem.py image photo.png --bits 12 --rgb -o photo_12b.mem
+#   python3 fmem.py font unifont.hex --first 0x20 --last 0x7F -o font_ascii_8x16.mem
+#   python3 fmem.py palette sweetie-16.hex --bits 4 -o palettes/sweetie16_4b.mem
+#   python3 fmem.py decode test/test_box_160x120.mem --palette test/test_palette.mem -o box.png
+#   python3 fmem.py check fonts/*.mem palettes/*.mem test/*.mem
+#   python3 fmem.py check --widths 'david*.mem=160' ../../graphics/framebuffers/res/david/*.mem
+
+import argparse
+import fnmatch
+import os
+import re
+import struct
+import sys
+import tempfile
+import unicodedata
+import zlib
+
+import numpy as np
+
+BLOCK = 64  # image rows converted at a time
+SHEET = 16  # glyphs per row of a font sheet image
+HEADER = ['// Generated by fmem.py from Project F', '// Learn more at https://projectf.io/verilog-lib/']
+
+def header(title):
+    return HEADER if title is None else [f'// Project F Library - {title}', HEADER[1]]
+
+def scale(values, src, dst):
+    """Rescale values of src bits to dst bits, rounding to nearest."""
+    values = np.asarray(values, np.int64)
+    if src == dst:
+        return values
+    top = (1 << src) - 1
+    return (values * ((1 << dst) - 1) + top // 2) // max(top, 1)
+
+
+# PNG: non-interlaced, any colour type and bit depth (16-bit samples keep their high byte)
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+CHANNELS = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}  # by colour type: grey, RGB, indexed, grey+alpha, RGBA
+
+def _chunks(f):
+    while True:
+        head = f.read(8)
+        if len(head) < 8:
+            return
+        length, kind = struct.unpack('>I4s', head)
+        data = f.read(length)
+        f.read(4)  # CRC: zlib checks the image data
+        yield kind, data
+
+def _unfilter(kind, row, prev, bpp):
+    """Undo a PNG row filter: row and prev are uint8 arrays."""
+    if kind == 0:
+        return row
+    if kind == 1:
+        lanes = np.zeros(-(-len(row) // bpp) * bpp, np.uint8)
+        lanes[:len(row)] = row
+        return np.cumsum(lanes.reshape(-1, bpp), axis=0, dtype=np.uint8).ravel()[:len(row)]
+    if kind == 2:
+        return row + prev
+    if kind not in (3, 4):
+        raise ValueError(f'unknown PNG filter {kind}')
+    out, up = row.tolist(), prev.tolist()  # average and Paeth depend on the reconstructed left byte
+    for i in range(len(out)):
+        a, c = (out[i-bpp], up[i-bpp]) if i >= bpp else (0, 0)
+        b = up[i]
+        if kind == 3:
+            out[i] = (out[i] + ((a + b) >> 1)) & 0xFF
+        else:
+            p = a + b - c
+            pa, pb, pc = abs(p - a), abs(p - b), abs(p - c)
+            out[i] = (out[i] + (a if pa <= pb and pa <= pc else b if pb <= pc else c)) & 0xFF
+    return np.array(out, np.uint8)
+
+def _unpack(row, width, channels, depth):
+    if depth == 16:
+        return row[0::2].reshape(width, channels)
+    if depth == 8:
+        return row.reshape(width, channels)
+    shifts = np.arange(8 - depth, -1, -depth)  # samples per byte, left-most in the high bits
+    return ((row[:, None] >> shifts) & ((1 << depth) - 1)).ravel()[:width].reshape(width, 1)
+
+def read_png(path):
+    """Open a PNG: return (width, height, palette, rows), where rows yields (width, channels) uint8 arrays.
+
+    Indexed images yield palette indices as one channel, with palette an (n, 3) array; otherwise palette is None."""
+    f = open(path, 'rb')
+    if f.read(8) != PNG_SIGNATURE:
+        raise ValueError(f'{path} is not a PNG')
+    chunks = _chunks(f)
+    palette, first = None, None
+    for kind, data in chunks:
+        if kind == b'IHDR':
+            width, height, depth, colour, _, _, interlace = struct.unpack('>IIBBBBB', data)
+            if interlace:
+                raise ValueError(f'{path}: interlaced PNGs are not supported')
+        elif kind == b'PLTE':
+            palette = np.frombuffer(data, np.uint8).reshape(-1, 3)
+        elif kind == b'IDAT':
+            first = data
+            break
+    channels = CHANNELS[colour]
+    stride = (width * channels * depth + 7) // 8
+    bpp = max(1, channels * depth // 8)
+
+    def rows():
+        inflate = zlib.decompressobj()
+        pending, prev = b'', np.zeros(stride, np.uint8)
+        data, done = first, 0
+        while done < height:
+            if data is None:
+                raise ValueError(f'{path}: image data ends after {done} of {height} rows')
+            pending += inflate.decompress(data)
+            while len(pending) > stride and done < height:
+                raw = np.frombuffer(pending, np.uint8, stride, 1)
+                prev = _unfilter(pending[0], raw, prev, bpp)
+                pending = pending[stride+1:]
+                done += 1
+                yield _unpack(prev, width, channels, depth)
+            data = next((d for k, d in chunks if k == b'IDAT'), None)
+        f.close()
+    return width, height, palette if colour == 3 else None, rows()
+
+def _chunk(kind, data):
+    return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+
+def write_png(path, width, height, rows, channels=3, palette=None):
+    """Write 8-bit rows of (width, channels) to a PNG; with palette, rows are indices into its (n, 3) colours."""
+    colour = 3 if palette is not None else {1: 0, 3: 2}[channels]
+    with open(path, 'wb') as f:
+        f.write(PNG_SIGNATURE)
+        f.write(_chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, colour, 0, 0, 0)))
+        if palette is not None:
+            f.write(_chunk(b'PLTE', np.asarray(palette, np.uint8).tobytes()))
+        deflate = zlib.compressobj(9)
+        for row in rows:
+            data = deflate.compress(b'\x00' + np.ascontiguousarray(row, np.uint8).tobytes())
+            if data:
+                f.write(_chunk(b'IDAT', data))
+        f.write(_chunk(b'IDAT', deflate.flush()))
+        f.write(_chunk(b'IEND', b''))
+
+
+# $readmemh files
+
+def read_mem(path):
+    """Values of a .mem file in a memory-mapped array, with the count of values on each line.
+
+    Comments (// and /* */) are skipped; @address sets where the following values go."""
+    buf = tempfile.TemporaryFile()
+    lines, addr, end = [], 0, 0
+    comment = False
+    with open(path) as f:
+        for line in f:
+            if comment:
+                if '*/' not in line:
+                    continue
+                line, comment = line.split('*/', 1)[1], False
+            line = re.sub(r'/\*.*?\*/', ' ', line.split('//')[0])
+            if '/*' in line:
+                line, comment = line.split('/*')[0], True
+            words = line.replace('_', '').split()
+            count = 0
+            while words:
+                if words[0].startswith('@'):
+                    addr = int(words.pop(0)[1:], 16)
+                    continue
+                run = next((i for i, w in enumerate(words) if w.startswith('@')), len(words))
+                if addr > end:  # skipped addresses read as zero
+                    buf.seek(end * 8)
+                    buf.write(bytes((addr - end) * 8))
+                buf.seek(addr * 8)
+                buf.write(np.array([int(w, 16) for w in words[:run]], '<u8').tobytes())
+                addr += run
+                end = max(end, addr)
+                count += run
+                del words[:run]
+            if count:
+                lines.append(count)
+    if end == 0:
+        return np.zeros(0, np.uint64), lines
+    buf.flush()
+    return np.memmap(buf, '<u8', 'r', shape=(end,)), lines
+
+def mem_line(values, digits):
+    return ' '.join(f'{v:0{digits}X}' for v in np.asarray(values).tolist())
+
+def guess_kind(path):
+    """font, palette, table, or image, from the file's name and folder."""
+    name, folder = os.path.basename(path).lower(), os.path.basename(os.path.dirname(os.path.abspath(path)))
+    if 'font' in name or folder == 'fonts':
+        return 'font'
+    if 'palette' in name or folder == 'palettes':
+        return 'palette'
+    if 'table' in name:
+        return 'table'
+    return 'image'
+
+def image_width(path, widths):
+    """Width of a .mem image from the first {glob: width} pattern its file name matches, or None."""
+    name = os.path.basename(path)
+    return next((width for pattern, width in widths.items() if fnmatch.fnmatch(name, pattern)), None)
+
+
+# images: one image row per line
+
+def image_values(pixels, bits, rgb=False, palette=None):
+    """Values of so many bits for a block of 8-bit (rows, width, channels) pixels.
+
+    Grey by default; with rgb, bits/3 per channel; with palette, the index of the nearest (n, 3) 8-bit colour."""
+    if palette is not None:
+        colours = np.asarray(palette, np.int64)
+        rgb8 = pixels.astype(np.int64) if pixels.shape[-1] == 3 else np.repeat(pixels.astype(np.int64), 3, -1)
+        return ((rgb8[..., None, :] - colours) ** 2).sum(-1).argmin(-1)
+    if rgb:
+        per = bits // 3
+        c = scale(pixels if pixels.shape[-1] == 3 else np.repeat(pixels, 3, -1), 8, per)
+        return c[..., 0] << 2*per | c[..., 1] << per | c[..., 2]
+    if pixels.shape[-1] == 3:  # luma (BT.601)
+        pixels = (299 * pixels[..., :1].astype(np.int64) + 587 * pixels[..., 1:2] + 114 * pixels[..., 2:] + 500) // 1000
+    return scale(pixels[..., 0], 8, bits)
+
+def png_to_mem(src, dst, bits, rgb=False, palette=None, title=None):
+    """Convert a PNG to a .mem image, streaming it through a memory-mapped buffer: return (width, height).
+
+    An indexed PNG keeps its own indices unless rgb or palette is given."""
+    if rgb and bits % 3:
+        raise ValueError(f'--rgb needs bits divisible by 3, not {bits}')
+    width, height, indexed, rows = read_png(src)
+    indices = indexed is not None and palette is None and not rgb
+    with tempfile.TemporaryFile() as buf:
+        pixels = None
+        for y, row in enumerate(rows):
+            if indexed is not None and not indices:
+                row = indexed[row[:, 0]]
+            if pixels is None:  # grey or RGB, dropping alpha
+                pixels = np.memmap(buf, np.uint8, 'w+', shape=(height, width, 3 if row.shape[1] >= 3 else 1))
+            pixels[y] = row[:, :pixels.shape[2]]
+
+        with open(dst, 'w') as out:
+            for line in header(title):
+                out.write(line + '\n')
+            out.write(f'// {width}x{height} image with {bits} bits per pixel\n')
+            for y in range(0, height, BLOCK):
+                block = np.asarray(pixels[y:y+BLOCK])
+                values = block[..., 0].astype(np.int64) if indices else image_values(block, bits, rgb, palette)
+                if values.max(initial=0) >= 1 << bits:
+                    raise ValueError(f'{src}: index {int(values.max())} needs more than {bits} bits')
+                out.writelines(mem_line(row, -(-bits // 4)) + '\n' for row in values)
+        del pixels
+    return width, height
+
+def mem_to_png(src, dst, width=None, bits=None, rgb=False, palette=None):
+    """Decode a .mem image to PNG, row by row: return (width, height, bits).
+
+    Values are grey levels by default; with rgb, packed channels; with palette, indices into (n, 3) 8-bit colours.
+    Without width, an image is as wide as its first line, or with one value per line, the size in its name (_160x120)."""
+    values, lines = read_mem(src)
+    if not width:
+        width = lines[0] if lines else 0
+        if width < 2 and len(values) > 1:
+            size = re.search(r'(?<![0-9])([0-9]+)x[0-9]+(?![0-9])', os.path.basename(src))
+            if not size:
+                raise ValueError(f'{src} has one value per line: give the image --width or --widths')
+            width = int(size.group(1))
+    if not len(values) or len(values) % width:
+        raise ValueError(f'{src}: {len(values)} values is not a whole number of {width}-pixel rows')
+    height = len(values) // width
+    bits = bits or max(1, int(values.max()).bit_length())
+
+    def rows():
+        for y in range(height):
+            row = np.asarray(values[y*width:(y+1)*width]).astype(np.int64)
+            if palette is not None:
+                if row.max() >= len(palette):
+                    raise ValueError(f'{src}: index {int(row.max())} in row {y} is beyond the {len(palette)}-colour palette')
+                yield row
+            elif rgb:
+                per, mask = bits // 3, (1 << bits // 3) - 1
+                yield scale(np.stack([row >> 2*per & mask, row >> per & mask, row & mask], -1), per, 8)
+            else:
+                yield scale(row, bits, 8)
+    write_png(dst, width, height, rows(), 3 if rgb else 1, palette)
+    return width, height, bits
+
+
+# fonts: one glyph per line, one value per row of pixels, left-most pixel in the MSB
+
+def _place(rows, glyph_width, width):
+    """Glyph rows of glyph_width pixels, left-aligned in cells width pixels wide."""
+    rows = np.asarray(rows, np.int64)
+    return rows << (width - glyph_width) if glyph_width <= width else rows >> (glyph_width - width)
+
+def read_hex(path, width, height):
+    """Glyphs of a GNU Unifont .hex file: {code point: rows}."""
+    glyphs = {}
+    with open(path) as f:
+        for line in f:
+            if ':' not in line:
+                continue
+            code, bitmap = line.strip().split(':')
+            digits = len(bitmap) // height
+            rows = [int(bitmap[i:i+digits], 16) for i in range(0, digits * height, digits)]
+            glyphs[int(code, 16)] = _place(rows, 4 * digits, width)
+    return glyphs
+
+def read_bdf(path, width, height):
+    """Glyphs of a BDF font: {code point: rows}, placed in cells by the font bounding box."""
+    glyphs, box, code, bitmap = {}, None, None, None
+    with open(path, encoding='latin-1') as f:
+        for line in f:
+            words = line.split()
+            if not words:
+                continue
+            if words[0] == 'FONTBOUNDINGBOX':
+                box = [int(w) for w in words[1:5]]
+            elif words[0] == 'ENCODING':
+                code = int(words[1])
+            elif words[0] == 'BBX':
+                bbx = [int(w) for w in words[1:5]]
+            elif words[0] == 'BITMAP':
+                bitmap = []
+            elif words[0] == 'ENDCHAR':
+                w, h, x, y = bbx
+                rows = np.zeros(height, np.int64)
+                top = (box[1] + box[3]) - (h + y)  # font ascent above the glyph
+                for i, row in enumerate(bitmap):
+                    if 0 <= top + i < height and code >= 0:
+                        digits = len(row)
+                        rows[top + i] = _place(int(row, 16) >> (4 * digits - w), w + x - box[2], width)
+                glyphs[code] = rows
+                bitmap = None
+            elif bitmap is not None:
+                bitmap.append(words[0])
+    return glyphs
+
+def read_sheet(path, width, height, first):
+    """Glyphs of a font sheet image: SHEET cells of width x height per row, pixels set where bright."""
+    w, h, indexed, rows = read_png(path)
+    pixels = np.zeros((h, w), bool)
+    for y, row in enumerate(rows):
+        if indexed is not None:
+            row = indexed[row[:, 0]]
+        pixels[y] = row[:, :3].max(-1) >= 128
+    glyphs, weights = {}, 1 << np.arange(width - 1, -1, -1)
+    for i in range((h // height) * SHEET):
+        cy, cx = divmod(i, SHEET)
+        cell = pixels[cy*height:(cy+1)*height, cx*width:(cx+1)*width]
+        if cell.shape == (height, width):
+            glyphs[first + i] = (cell * weights).sum(-1)
+    return glyphs
+
+def write_font(dst, glyphs, width, height, first, last, title=None):
+    """Write glyphs from first to last as a .mem font; missing glyphs are blank."""
+    digits = -(-width // 4)
+    count = last - first + 1
+    with open(dst, 'w') as out:
+        for line in header(title):
+            out.write(line + '\n')
+        out.write(f'\n// Includes {count} characters from U+{first:04X} to U+{last:04X}\n')
+        out.write(f'// Requires {count} x {width} x {height} = {count*width*height:,} bits\n')
+        out.write('// Left-most pixel on each line is MSB\n\n')
+        for code in range(first, last + 1):
+            rows = glyphs.get(code, np.zeros(height, np.int64))
+            name = unicodedata.name(chr(code), '')
+            out.write(f'{mem_line(rows, digits)}  // U+{code:04X}{" - " + name.title() if name else ""}\n')
+
+def font_to_png(src, dst, width=None, height=None):
+    """Decode a .mem font to a sheet of SHEET glyphs per row: return (glyphs, width, height)."""
+    values, lines = read_mem(src)
+    height = height or lines[0]
+    width = width or max(8, -(-int(values.max(initial=0)).bit_length() // 4) * 4)
+    glyphs = np.asarray(values).astype(np.int64).reshape(-1, height)
+    bits = (glyphs[..., None] >> np.arange(width - 1, -1, -1)) & 1  # (glyph, row, column)
+    sheet_rows = -(-len(glyphs) // SHEET)
+    sheet = np.zeros((sheet_rows * SHEET, height, width), np.uint8)
+    sheet[:len(glyphs)] = bits * 255
+    image = sheet.reshape(sheet_rows, SHEET, height, width).transpose(0, 2, 1, 3).reshape(sheet_rows * height, -1)
+    write_png(dst, image.shape[1], image.shape[0], image, 1)
+    return len(glyphs), width, height
+
+
+# palettes: one packed colour per entry, bits per channel
+
+def read_palette(path, swatch=1):
+    """Colours of a palette list as an (n, 3) 8-bit array.
+
+    Reads PNG swatch strips (one colour every swatch pixels), GIMP .gpl files, and hex lists such as Lospec .hex."""
+    if path.lower().endswith('.png'):
+        width, height, indexed, rows = read_png(path)
+        for y, row in enumerate(rows):
+            if y == swatch // 2:
+                row = indexed[row[:, 0]] if indexed is not None else row
+                return np.asarray(row[swatch // 2::swatch, :3] if row.shape[1] >= 3 else
+                                  np.repeat(row[swatch // 2::swatch, :1], 3, -1), np.int64)
+    colours = []
+    with open(path) as f:
+        gpl = path.lower().endswith('.gpl')
+        for line in f:
+            if gpl:
+                words = line.split()
+                if len(words) >= 3 and all(w.isdigit() for w in words[:3]):
+                    colours.append([int(w) for w in words[:3]])
+            else:
+                for rgb in re.findall(r'(?<![0-9A-Fa-f])#?([0-9A-Fa-f]{6})(?![0-9A-Fa-f])', line.split(';')[0]):
+                    colours.append([int(rgb[i:i+2], 16) for i in (0, 2, 4)])
+    return np.array(colours, np.int64).reshape(-1, 3)
+
+def quantize(colours, bits):
+    """8-bit channels to bits, rounding to the nearest step of 2^(8-bits) like the palettes in this folder."""
+    step = 8 - bits
+    return np.minimum((np.asarray(colours, np.int64) + (1 << step >> 1)) >> step, (1 << bits) - 1)
+
+def unquantize(channels, bits):
+    """Channels of bits to 8-bit, staying within the step quantize() rounds back from (so white is F7 at 4 bits)."""
+    step = 8 - bits
+    channels = np.asarray(channels, np.int64)
+    return channels << step | channels * max((1 << step >> 1) - 1, 0) // max((1 << bits) - 1, 1)
+
+def palette_values(colours, bits):
+    """Pack 8-bit colours at bits per channel."""
+    c = quantize(colours, bits)
+    return c[:, 0] << 2*bits | c[:, 1] << bits | c[:, 2]
+
+def read_mem_palette(path, bits=None):
+    """Colours of a .mem palette as an (n, 3) 8-bit array, with the bits per channel (default: 4 or 8 by size)."""
+    values, _ = read_mem(path)
+    values = np.asarray(values).astype(np.int64)
+    bits = bits or (4 if values.max(initial=0) < 1 << 12 else 8)
+    mask = (1 << bits) - 1
+    return unquantize(np.stack([values >> 2*bits & mask, values >> bits & mask, values & mask], -1), bits), bits
+
+def write_palette(dst, colours, bits, lines=False, title=None):
+    """Write colours as a .mem palette at bits per channel: on one line, or one per line with its index."""
+    values = palette_values(colours, bits)
+    digits = -(-3 * bits // 4)
+    with open(dst, 'w') as out:
+        for line in header(title):
+            out.write(line + '\n')
+        out.write(f'// {len(values)} colours with {bits} bits per channel\n\n')
+        if lines:
+            out.writelines(f'{v:0{digits}X}  // {i:X}\n' for i, v in enumerate(values.tolist()))
+        else:
+            out.write(mem_line(values, digits) + '\n')
+
+def palette_to_png(src, dst, bits=None, swatch=16):
+    """Decode a .mem palette to a strip of swatch x swatch squares: return (colours, bits)."""
+    colours, bits = read_mem_palette(src, bits)
+    row = np.repeat(colours, swatch, 0)
+    write_png(dst, len(row), swatch, (row for _ in range(swatch)), 3)
+    return len(colours), bits
+
+
+# round trip: .mem to PNG and back
+
+def check(path, kind, png, width=None, bits=None, rgb=False, palette=None, swatch=16):
+    """Decode a .mem file to png and convert it back: return a description, raising ValueError on a mismatch.
+
+    A table is checked as an image one value wide; an image with one value per line needs its width."""
+    before, lines = read_mem(path)
+    if not len(before):
+        return 'no values, only comments'
+    with tempfile.TemporaryDirectory() as tmp:
+        again = os.path.join(tmp, 'again.mem')
+        if kind in ('image', 'table'):
+            table = kind == 'table'
+            if table and max(lines) > 1:
+                raise ValueError(f'a table has one value per line, not {max(lines)}')
+            width, height, bits = mem_to_png(path, png, 1 if table else width, bits, rgb, palette)
+            if palette is None and not rgb and int(before.max()) >= 1 << bits:
+                raise ValueError(f'values out of range for {bits}-bit {kind}')
+            png_to_mem(png, again, bits, rgb, palette)
+            what = f'{height}-value table, {bits}-bit' if table else f'{width}x{height} image, {bits}-bit'
+        elif kind == 'font':
+            count, width, height = font_to_png(path, png, width)
+            glyphs = read_sheet(png, width, height, 0)
+            write_font(again, glyphs, width, height, 0, count - 1)
+            what = f'{count} glyphs of {width}x{height}'
+        else:
+            count, bits = palette_to_png(path, png, bits, swatch)
+            write_palette(again, read_palette(png, swatch), bits)
+            what = f'{count} colours, {bits} bits per channel'
+        after, _ = read_mem(again)
+        if len(after) != len(before):
+            raise ValueError(f'{what}: {len(after)} values after round trip, expected {len(before)}')
+        for i in range(0, len(before), BLOCK * 1024):
+            bad = np.flatnonzero(np.asarray(before[i:i+BLOCK*1024]) != np.asarray(after[i:i+BLOCK*1024]))
+            if len(bad):
+                j = i + int(bad[0])
+                raise ValueError(f'{what}: value {j} is {int(after[j]):X} after round trip, expected {int(before[j]):X}')
+        del before, after
+    return what
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Convert images, fonts, and palettes to and from $readmemh files.')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    image = commands.add_parser('image', help='convert a PNG image to .mem')
+    image.add_argument('src', help='PNG image')
+    image.add_argument('--bits', type=int, required=True, help='bits per pixel')
+    image.add_argument('--rgb', action='store_true', help='pack bits/3 per colour channel (default: grey)')
+    image.add_argument('--palette', help='.mem palette: write the index of the nearest colour')
+    image.add_argument('--palette-bits', type=int, help='palette bits per channel (default: 4 or 8 by size)')
+
+    font = commands.add_parser('font', help='convert a BDF, Unifont .hex, or PNG sheet font to .mem')
+    font.add_argument('src', help='.bdf, .hex, or PNG sheet of 16 glyphs per row')
+    font.add_argument('--width', type=int, default=8, help='glyph width in pixels (default: 8)')
+    font.add_argument('--height', type=int, default=16, help='glyph height in pixels (default: 16)')
+    font.add_argument('--first', type=lambda s: int(s, 0), default=0, help='first code point (default: 0)')
+    font.add_argument('--last', type=lambda s: int(s, 0), default=0xFF, help='last code point (default: 0xFF)')
+
+    palette = commands.add_parser('palette', help='convert a palette list to .mem')
+    palette.add_argument('src', help='hex list (such as Lospec .hex), GIMP .gpl, or PNG swatch strip')
+    palette.add_argument('--bits', type=int, default=4, help='bits per channel (default: 4)')
+    palette.add_argument('--lines', action='store_true', help='one colour per line (default: all on one line)')
+    palette.add_argument('--swatch', type=int, default=1, help='PNG swatch size in pixels (default: 1)')
+
+    for name, help in (('decode', 'decode a .mem file to PNG'), ('check', 'round-trip .mem files through PNG')):
+        cmd = commands.add_parser(name, help=help)
+        cmd.add_argument('src', nargs='+' if name == 'check' else None, help='.mem files')
+        cmd.add_argument('--kind', choices=['image', 'font', 'palette', 'table'], help='default: from file name and folder')
+        cmd.add_argument('--width', type=int, help='image or glyph width (default: values on the first line)')
+        cmd.add_argument('--widths', action='append', default=[], metavar='GLOB=WIDTH',
+                         help='width of images whose file name matches GLOB (repeatable; default: size in the name)')
+        cmd.add_argument('--bits', type=int, help='image bits per pixel or palette bits per channel')
+        cmd.add_argument('--rgb', action='store_true', help='image values pack bits/3 per colour channel')
+        cmd.add_argument('--palette', help='.mem palette: image values are colour indices')
+        cmd.add_argument('--swatch', type=int, default=16, help='palette swatch size in pixels (default: 16)')
+    commands.choices['check'].add_argument('--png', help='folder to keep decoded images in')
+
+    for cmd in ('image', 'font', 'palette', 'decode'):
+        commands.choices[cmd].add_argument('-o', '--output', required=True, help='file to write')
+    for cmd in ('image', 'font', 'palette'):
+        commands.choices[cmd].add_argument('--title', help='first comment line: Project F Library - TITLE')
+    args = parser.parse_args()
+
+    colours = None
+    widths = {}
+    for entry in getattr(args, 'widths', []):
+        pattern, _, width = entry.rpartition('=')
+        if not pattern or not width.isdigit():
+            parser.error(f'--widths takes GLOB=WIDTH, not {entry}')
+        widths[pattern] = int(width)
+    if getattr(args, 'palette', None) and args.command != 'palette':
+        colours, _ = read_mem_palette(args.palette, getattr(args, 'palette_bits', None))
+
+    if args.command == 'image':
+        width, height = png_to_mem(args.src, args.output, args.bits, args.rgb, colours, args.title)
+        print(f'{args.output}: {width}x{height} image, {args.bits}-bit')
+    elif args.command == 'font':
+        ext = os.path.splitext(args.src)[1].lower()
+        if ext == '.png':
+            glyphs = read_sheet(args.src, args.width, args.height, args.first)
+        else:
+            glyphs = (read_bdf if ext == '.bdf' else read_hex)(args.src, args.width, args.height)
+        write_font(args.output, glyphs, args.width, args.height, args.first, args.last, args.title)
+        found = sum(code in glyphs for code in range(args.first, args.last + 1))
+        print(f'{args.output}: {found} of {args.last - args.first + 1} glyphs, {args.width}x{args.height}')
+    elif args.command == 'palette':
+        palette = read_palette(args.src, args.swatch)
+        write_palette(args.output, palette, args.bits, args.lines, args.title)
+        print(f'{args.output}: {len(palette)} colours, {args.bits} bits per channel')
+    elif args.command == 'decode':
+        kind = args.kind or guess_kind(args.src)
+        if kind in ('image', 'table'):
+            width = 1 if kind == 'table' else args.width or image_width(args.src, widths)
+            width, height, bits = mem_to_png(args.src, args.output, width, args.bits, args.rgb, colours)
+            print(f'{args.output}: {width}x{height} {kind}, {bits}-bit')
+        elif kind == 'font':
+            count, width, height = font_to_png(args.src, args.output, args.width)
+            print(f'{args.output}: {count} glyphs of {width}x{height}')
+        else:
+            count, bits = palette_to_png(args.src, args.output, args.bits, args.swatch)
+            print(f'{args.output}: {count} colours, {bits} bits per channel')
+    else:
+        failed = 0
+        with tempfile.TemporaryDirectory() as tmp:
+            for path in args.src:
+                name = os.path.splitext(os.path.basename(path))[0] + '.png'
+                png = os.path.join(args.png or tmp, name)
+                kind = args.kind or guess_kind(path)
+                width = args.width or (image_width(path, widths) if kind == 'image' else None)
+                try:
+                    what = check(path, kind, png, width, args.bits, args.rgb, colours, args.swatch)
+                    print(f'ok    {path}: {what}')
+                except ValueError as e:
+                    print(f'FAIL  {path}: {e}')
+                    failed += 1
+        print(f'{len(args.src) - failed} of {len(args.src)} files survive the round trip')
+        sys.exit(1 if failed else 0)
+
+if __name__ == '__main__':
+    main()
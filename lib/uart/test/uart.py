@@ -0,0 +1,128 @@
+## Project F Library - UART Loopback Test Bench (cocotb)
+## (C)2023 Will Green, open source software released under the MIT License
+## Learn more at https://projectf.io/verilog-lib/
+
+# Streams random bytes from uart_tx to uart_rx through the wrapper (uart_tb.sv),
+# where each has its own clock and baud generator. The bench wakes on UART
+# events rather than clock edges: it loads the next byte as the transmitter
+# reaches the stop bit, reads each byte the receiver completes, and samples
+# the serial line with timers at the centre of each bit to check the
+# transmitter on its own. Running the receiver's clock faster or slower than
+# the transmitter's injects clock mismatch, as between two boards.
+
+import os
+import random
+import time
+
+import cocotb
+from cocotb.triggers import FallingEdge, RisingEdge, Timer
+from cocotb.utils import get_sim_time
+
+BYTES = int(os.environ.get('BYTES', 2000))  # random bytes per baud rate and clock mismatch
+TOLERANCE = float(os.environ.get('TOLERANCE', 0.03))  # clock mismatch that must be error free
+MISMATCH = [m / 100 for m in range(-6, 7)]  # receive clock mismatch sweep
+CLK_PS = 10000  # transmit clock period (100 MHz)
+
+def rates(dut):
+    """Baud counter increment for each rate in the wrapper."""
+    return [int(dut.baud[i].baud_tx.CNT_INC.value) for i in range(int(dut.RATES.value))]
+
+def bit_ps(dut, rate):
+    """Transmit bit period in picoseconds."""
+    return CLK_PS * 2**(int(dut.CNT_W.value) + 4) / rates(dut)[rate]
+
+async def reset_dut(dut, rate, mismatch=0.0):
+    """Select the baud rate and clocks, then reset both domains."""
+    dut.tx_period.value = CLK_PS
+    dut.rx_period.value = round(CLK_PS / (1 + mismatch))  # positive mismatch: faster receive clock
+    dut.rate.value = rate
+    dut.tx_start.value = 0
+    dut.tx_data.value = 0
+    dut.rst.value = 1
+    await Timer(4 * CLK_PS, units='ps')
+    dut.rst.value = 0
+    await Timer(4 * CLK_PS, units='ps')
+
+async def send(dut, payload):
+    """Transmit bytes back-to-back, loading each as the last reaches its stop bit."""
+    dut.tx_data.value = payload[0]
+    dut.tx_start.value = 1
+    for byte in payload[1:]:
+        await RisingEdge(dut.tx_next)
+        dut.tx_data.value = byte
+    await RisingEdge(dut.tx_next)
+    dut.tx_start.value = 0
+
+async def receive(dut, out):
+    """Record each byte the receiver completes."""
+    while True:
+        await RisingEdge(dut.rx_done)
+        out.append(int(dut.rx_data.value))
+
+async def monitor(dut, period, out):
+    """Decode the serial line by sampling at bit centres, recording None for a framing error."""
+    serial = dut.serial
+    while True:
+        await FallingEdge(serial)
+        start = get_sim_time('ps')
+        bits = []
+        for i in range(10):  # start, eight data bits, and stop
+            centre = round(start + (i + 0.5) * period)
+            await Timer(centre - get_sim_time('ps'), units='ps')
+            bits.append(int(serial.value))
+        if bits[0] == 0 and bits[9] == 1:
+            out.append(sum(b << i for i, b in enumerate(bits[1:9])))
+        else:
+            out.append(None)
+
+def errors(sent, got):
+    """Bytes received wrong, plus bytes missing or extra."""
+    return sum(a != b for a, b in zip(sent, got)) + abs(len(sent) - len(got))
+
+async def loopback(dut, rate, mismatch, count):
+    """Stream count random bytes at a baud rate and clock mismatch: return (tx errors, rx errors)."""
+    await reset_dut(dut, rate, mismatch)
+    period = bit_ps(dut, rate)
+    payload = [random.getrandbits(8) for _ in range(count)]
+    line, received = [], []
+    tasks = [cocotb.start_soon(monitor(dut, period, line)), cocotb.start_soon(receive(dut, received))]
+
+    wall, sim = time.perf_counter(), get_sim_time('ps')
+    await send(dut, payload)
+    await Timer(round(3 * 10 * period), units='ps')  # let the last byte through
+    wall, sim = time.perf_counter() - wall, (get_sim_time('ps') - sim) * 1e-12
+    for task in tasks:
+        task.kill()
+
+    tx, rx = errors(payload, line), errors(payload, received)
+    baud = 1e12 / period
+    dut._log.info(f'{baud:,.0f} baud, receive clock {mismatch:+.0%}: {count} bytes, '
+                  f'{tx} transmit and {rx} receive errors (error rate {rx / count:.2e}); '
+                  f'{count / wall:,.0f} bytes/s ({count / sim / (baud / 10):.1%} of line rate)')
+    return tx, rx
+
+
+# matched clocks at each baud rate
+@cocotb.test()
+async def loopback_1(dut):
+    """Test loopback of random bytes at every baud rate"""
+    for rate in range(len(rates(dut))):
+        tx, rx = await loopback(dut, rate, 0.0, BYTES)
+        assert tx == 0 and rx == 0, f"{tx} transmit and {rx} receive errors at rate {rate}!"
+
+
+# receive clock faster and slower than transmit
+@cocotb.test()
+async def mismatch_1(dut):
+    """Test loopback with receive clock mismatch, error free within TOLERANCE"""
+    margin = {}
+    for rate in range(len(rates(dut))):
+        for mismatch in MISMATCH:
+            tx, rx = await loopback(dut, rate, mismatch, BYTES // 4)
+            assert tx == 0, f"{tx} transmit errors at rate {rate}!"
+            if abs(mismatch) <= TOLERANCE:
+                assert rx == 0, f"{rx} receive errors at rate {rate} with {mismatch:+.0%} clock mismatch!"
+            if rx == 0:
+                margin.setdefault(rate, []).append(mismatch)
+    for rate, ok in margin.items():
+        dut._log.info(f'rate {rate}: error free from {min(ok):+.0%} to {max(ok):+.0%} receive clock mismatch')
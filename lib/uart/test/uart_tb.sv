@@ -0,0 +1,90 @@
+// Project F Library - UART Loopback cocotb Test Bench Wrapper
+// (C)2023 Will Green, open source hardware released under the MIT License
+// Learn more at https://projectf.io/verilog-lib/
+
+`default_nettype none
+`timescale 1ns / 1ps
+
+// Transmitter and receiver in separate clock domains, looped back through
+// data, with clocks generated in Verilog so cocotb only wakes on UART events.
+// The clock periods are inputs, so a test can run the receiver's clock
+// faster or slower than the transmitter's. Each side has a baud generator
+// for each of RATES baud rates, and rate selects which drives the UART.
+
+module uart_tb #(
+    parameter CNT_W=16,             // baud counter width
+    parameter RATES=4,              // number of baud rates: BAUD doubling for each
+    parameter BAUD=921_600,         // slowest baud rate
+    parameter CLK_HZ=100_000_000    // clock frequency the bench runs (CLK_PS in uart.py)
+    ) (
+    input  wire logic [31:0] tx_period,  // transmit clock period (ps)
+    input  wire logic [31:0] rx_period,  // receive clock period (ps)
+    input  wire logic [$clog2(RATES > 1 ? RATES : 2)-1:0] rate,  // baud rate index
+    input  wire logic rst,               // reset (both domains)
+    input  wire logic tx_start,          // start transmission
+    input  wire logic [7:0] tx_data,     // data to transmit
+    output      logic tx_busy,           // busy with transmission
+    output      logic tx_next,           // ready for next data in
+    output      logic serial,            // serial data: transmit out, receive in
+    output      logic [7:0] rx_data,     // data received
+    output      logic rx_done            // data receive complete
+    );
+
+    // baud counter increment for rate i: BAUD * 2^i * 16 * 2^CNT_W / CLK_HZ, rounded,
+    // and at most the largest increment (CLK_HZ/16 baud); by default 921,600,
+    // 1,843,200, 3,686,400, and 6,250,000 baud with a 100 MHz clock
+    function automatic [CNT_W-1:0] cnt_inc(input integer i);
+        logic [63:0] inc;
+        inc = BAUD;
+        inc = ((inc << (i + 4 + CNT_W)) + CLK_HZ/2) / CLK_HZ;
+        cnt_inc = (inc >> CNT_W) != 0 ? {CNT_W{1'b1}} : inc[CNT_W-1:0];
+    endfunction
+
+    logic clk_tx, clk_rx;
+    initial begin
+        clk_tx = 0;
+        clk_rx = 0;
+    end
+    always begin  // wait for the bench to set the period
+        wait (tx_period > 0);
+        #(tx_period / 2000.0) clk_tx = ~clk_tx;
+    end
+    always begin
+        wait (rx_period > 0);
+        #(rx_period / 2000.0) clk_rx = ~clk_rx;
+    end
+
+    logic [RATES-1:0] stb_baud, stb_sample;
+    genvar i;
+    generate for (i = 0; i < RATES; i = i + 1) begin : baud
+        /* verilator lint_off PINCONNECTEMPTY */
+        localparam [CNT_W-1:0] CNT_INC = cnt_inc(i);
+        uart_baud #(.CNT_W(CNT_W), .CNT_INC(CNT_INC)) baud_tx (
+            .clk(clk_tx), .rst, .stb_baud(stb_baud[i]), .stb_sample()
+        );
+        uart_baud #(.CNT_W(CNT_W), .CNT_INC(CNT_INC)) baud_rx (
+            .clk(clk_rx), .rst, .stb_baud(), .stb_sample(stb_sample[i])
+        );
+        /* verilator lint_on PINCONNECTEMPTY */
+    end endgenerate
+
+    uart_tx uart_tx_inst (
+        .clk(clk_tx),
+        .rst,
+        .stb_baud(stb_baud[rate]),
+        .tx_start,
+        .data_in(tx_data),
+        .data_out(serial),
+        .tx_busy,
+        .tx_next
+    );
+
+    uart_rx uart_rx_inst (
+        .clk(clk_rx),
+        .rst,
+        .stb_sample(stb_sample[rate]),
+        .data_in(serial),
+        .data_out(rx_data),
+        .rx_done
+    );
+endmodule